@@ -0,0 +1,275 @@
+import os
+import json
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+import streamlit as st
+from supabase import create_client, Client
+
+# ==============================================================================
+# 1. CLIENTE ÚNICO
+# ==============================================================================
+
+logger = logging.getLogger("acceso_datos")
+
+def _get_credential(nombre: str) -> Optional[str]:
+    """Variables de entorno primero (cron / scripts); luego secrets.toml."""
+    if os.environ.get(nombre):
+        return os.environ[nombre]
+    try:
+        return st.secrets.get(nombre)
+    except Exception:
+        return None
+
+@st.cache_resource
+def get_client() -> Optional[Client]:
+    """
+    Un solo cliente (y su pool HTTP) por proceso, compartido por todas las páginas.
+    Con DATA_BACKEND=local se usa la base SQLite de backend_local (sin red, datos sintéticos).
+    """
+    if (_get_credential("DATA_BACKEND") or "").lower() == "local":
+        from backend_local import get_local_client
+        ruta = _get_credential("LOCAL_DB_PATH") or os.path.join("data", "backend_local.sqlite")
+        return get_local_client(ruta, n_empleados=int(_get_credential("LOCAL_DB_EMPLEADOS") or 2000))
+    url, key = _get_credential("SUPABASE_URL"), _get_credential("SUPABASE_KEY")
+    return create_client(url, key) if url and key else None
+
+# ==============================================================================
+# 2. PROYECCIONES POR TABLA
+# ==============================================================================
+
+# Lecturas que alimentan al modelo: variables del modelo, contrato y fechas (backfill).
+# Cubre también a las demás lecturas de 'consolidado', que son subconjuntos de esta.
+COLUMNAS_MODELO = [
+    "EmployeeNumber", "Age", "BusinessTravel", "Department", "DistanceFromHome", "Education",
+    "EducationField", "EnvironmentSatisfaction", "Gender", "JobInvolvement", "JobLevel", "JobRole",
+    "JobSatisfaction", "MaritalStatus", "MonthlyIncome", "NumCompaniesWorked", "OverTime",
+    "PercentSalaryHike", "PerformanceRating", "RelationshipSatisfaction", "TotalWorkingYears",
+    "TrainingTimesLastYear", "WorkLifeBalance", "YearsAtCompany", "YearsInCurrentRole",
+    "YearsSinceLastPromotion", "YearsWithCurrManager", "IntencionPermanencia", "CargaLaboralPercibida",
+    "SatisfaccionSalarial", "ConfianzaEmpresa", "NumeroTardanzas", "NumeroFaltas", "Tipocontrato",
+    "FechaIngreso", "FechaSalida"
+]
+
+COLUMNAS_DASHBOARD = [
+    "EmployeeNumber", "Age", "Gender", "Department", "JobRole", "MonthlyIncome",
+    "YearsSinceLastPromotion", "YearsAtCompany", "JobLevel", "OverTime", "MaritalStatus",
+    "BusinessTravel", "Tipocontrato", "FechaIngreso", "FechaSalida"
+]
+
+COLUMNAS_RECONOCIMIENTO = [
+    "EmployeeNumber", "Department", "JobRole", "PerformanceRating",
+    "YearsSinceLastPromotion", "JobInvolvement", "NumeroFaltas"
+]
+
+COLUMNAS_EMPLEADOS = [
+    "EmployeeNumber", "Age", "Gender", "MonthlyIncome", "Department", "JobRole", "BusinessTravel",
+    "EducationField", "Education", "MaritalStatus", "DistanceFromHome", "JobLevel", "OverTime",
+    "TotalWorkingYears", "YearsAtCompany", "YearsInCurrentRole", "YearsSinceLastPromotion",
+    "YearsWithCurrManager", "TrainingTimesLastYear", "NumCompaniesWorked", "PerformanceRating",
+    "NumeroTardanzas", "NumeroFaltas", "Tipocontrato", "FechaIngreso", "FechaSalida"
+]
+
+# Columnas visibles de la grilla de "Colaboradores Activos"
+COLUMNAS_GRILLA = ["EmployeeNumber", "Age", "Department", "JobRole", "MonthlyIncome"]
+
+COLUMNAS_ENCUESTAS = [
+    "EmployeeNumber", "Fecha", "EnvironmentSatisfaction", "JobInvolvement", "JobSatisfaction",
+    "RelationshipSatisfaction", "WorkLifeBalance", "IntencionPermanencia", "CargaLaboralPercibida",
+    "SatisfaccionSalarial", "ConfianzaEmpresa"
+]
+
+COLUMNAS_PERFIL = [
+    "id", "email", "full_name", "role", "phone_number", "address",
+    "date_of_birth", "avatar_url", "created_at"
+]
+
+def _select(columnas) -> str:
+    return columnas if isinstance(columnas, str) else ", ".join(columnas)
+
+# ==============================================================================
+# 3. EJECUCIÓN INSTRUMENTADA (LATENCIA Y TAMAÑO DE RESPUESTA)
+# ==============================================================================
+
+def _estimate_payload(data) -> int:
+    """Bytes aproximados de la respuesta JSON, estimados sobre una muestra de filas."""
+    if not data:
+        return 0
+    filas = data if isinstance(data, list) else [data]
+    muestra = filas[:20]
+    promedio = len(json.dumps(muestra, default=str).encode("utf-8")) / len(muestra)
+    return int(promedio * len(filas))
+
+def execute(query, tabla: str, operacion: str = "select"):
+    """Ejecuta una consulta registrando latencia, filas y bytes aproximados."""
+    inicio = time.perf_counter()
+    res = query.execute()
+    duracion_ms = (time.perf_counter() - inicio) * 1000
+    filas = len(res.data) if isinstance(res.data, list) else int(bool(res.data))
+    logger.info("tabla=%s op=%s ms=%.1f filas=%d bytes~%d", tabla, operacion, duracion_ms, filas,
+                _estimate_payload(res.data))
+    return res
+
+# ==============================================================================
+# 4. DESCARGA PAGINADA EN PARALELO
+# ==============================================================================
+
+# PostgREST corta cada respuesta en 'max-rows' (1000 por defecto en Supabase)
+PAGE_SIZE = 1000
+MAX_WORKERS = 4
+
+def fetch_all_rows(tabla: str, columnas, orden, desc: bool = False, filtros=None,
+                   page_size: int = PAGE_SIZE, max_workers: int = MAX_WORKERS) -> List[Dict[str, Any]]:
+    """
+    Descarga la tabla completa: la primera página trae también el conteo exacto y el
+    resto de rangos se piden en paralelo con un pool acotado. 'orden' debe ser una
+    clave única (o terminar en una) para que las páginas no se solapen.
+    'filtros' es una lista de (operador, columna, valor), p. ej. [("gt", "id", 120)].
+    """
+    client = get_client()
+
+    def consulta(con_conteo: bool = False):
+        q = client.table(tabla).select(_select(columnas), count="exact" if con_conteo else None)
+        for operador, col, valor in (filtros or []):
+            q = getattr(q, operador)(col, valor)
+        for col in orden:
+            q = q.order(col, desc=desc)
+        return q
+
+    primera = execute(consulta(con_conteo=True).range(0, page_size - 1), tabla)
+    filas = primera.data or []
+    total = primera.count if primera.count is not None else len(filas)
+    if len(filas) >= total:
+        return filas
+
+    # Si el servidor devolvió menos filas que las pedidas, su tope manda el tamaño de página
+    paso = len(filas) if 0 < len(filas) < page_size else page_size
+    inicios = range(len(filas), total, paso)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        paginas = pool.map(lambda ini: execute(consulta().range(ini, ini + paso - 1), tabla).data or [], inicios)
+        for pagina in paginas:
+            filas.extend(pagina)
+    return filas
+
+def fetch_all(tabla: str, columnas, orden, **kwargs) -> pd.DataFrame:
+    return pd.DataFrame(fetch_all_rows(tabla, columnas, orden, **kwargs))
+
+def count_rows(tabla: str, pk: str) -> int:
+    res = execute(get_client().table(tabla).select(pk, count="exact").limit(1), tabla, "count")
+    return res.count or 0
+
+def fetch_max(tabla: str, columna: str):
+    """Valor máximo de una columna (None si la tabla está vacía) con una sola fila de respuesta."""
+    res = execute(get_client().table(tabla).select(columna).order(columna, desc=True).limit(1), tabla, "max")
+    return res.data[0][columna] if res.data else None
+
+# ==============================================================================
+# 5. CONSULTAS POR TABLA
+# ==============================================================================
+
+# --- consolidado ---
+def fetch_consolidado(columnas=COLUMNAS_DASHBOARD) -> pd.DataFrame:
+    return fetch_all("consolidado", columnas, orden=["EmployeeNumber"])
+
+# --- empleados ---
+def fetch_max_employee_number() -> Optional[int]:
+    res = execute(get_client().table("empleados").select("EmployeeNumber")
+                  .order("EmployeeNumber", desc=True).limit(1), "empleados")
+    return int(res.data[0]["EmployeeNumber"]) if res.data else None
+
+def fetch_empleado(employee_number: int, columnas=COLUMNAS_EMPLEADOS) -> Dict[str, Any]:
+    res = execute(get_client().table("empleados").select(_select(columnas))
+                  .eq("EmployeeNumber", employee_number).limit(1), "empleados")
+    return res.data[0] if res.data else {}
+
+def _literal_postgrest(valor) -> str:
+    texto = str(valor).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{texto}"'
+
+def fetch_employees_page(cursor=None, limite: int = 25, orden: str = "EmployeeNumber", desc: bool = False,
+                         solo_activos: bool = True, coincidencias: Optional[Dict[str, list]] = None,
+                         columnas=COLUMNAS_GRILLA):
+    """
+    Una página de la grilla de empleados con paginación por clave (keyset): en lugar de
+    OFFSET, se piden las filas posteriores a 'cursor' = (valor de 'orden', EmployeeNumber)
+    de la última fila ya mostrada, así cada página cuesta lo mismo sin importar cuántas
+    van. 'orden' debe ser una columna sin nulos. 'coincidencias' {columna: valores} se
+    combina con OR (búsqueda). Devuelve (filas, hay_mas).
+    """
+    columnas = list(dict.fromkeys(list(columnas) + [orden, "EmployeeNumber"]))
+    q = get_client().table("empleados").select(_select(columnas))
+    if solo_activos:
+        q = q.is_("FechaSalida", "null")
+    # Condiciones OR (búsqueda y cursor compuesto); si hay dos van en un único 'or' anidado
+    logicas = []
+    if coincidencias is not None:
+        condiciones = [f"{col}.in.({','.join(_literal_postgrest(v) for v in valores)})"
+                       for col, valores in coincidencias.items() if valores]
+        if not condiciones:
+            return [], False
+        logicas.append(",".join(condiciones))
+    if cursor is not None:
+        valor, clave = cursor
+        op = "lt" if desc else "gt"
+        if orden == "EmployeeNumber":
+            q = getattr(q, op)("EmployeeNumber", clave)
+        else:
+            v = _literal_postgrest(valor)
+            logicas.append(f"{orden}.{op}.{v},and({orden}.eq.{v},EmployeeNumber.{op}.{clave})")
+    if len(logicas) == 1:
+        q = q.or_(logicas[0])
+    elif logicas:
+        q = q.or_("and(" + ",".join(f"or({l})" for l in logicas) + ")")
+    q = q.order(orden, desc=desc)
+    if orden != "EmployeeNumber":
+        q = q.order("EmployeeNumber", desc=desc)
+    # Una fila de más indica si existe página siguiente sin contar la tabla
+    filas = execute(q.limit(limite + 1), "empleados").data or []
+    return filas[:limite], len(filas) > limite
+
+def reserve_employee_numbers(cantidad: int) -> range:
+    """Reserva atómicamente un bloque de EmployeeNumber (sql/asignacion_ids.sql)."""
+    res = execute(get_client().rpc("reservar_employee_numbers", {"cantidad": int(cantidad)}), "contadores", "rpc")
+    ultimo = int(res.data)
+    return range(ultimo - cantidad + 1, ultimo + 1)
+
+def insert_empleado(payload: Dict[str, Any]):
+    return execute(get_client().table("empleados").insert(payload), "empleados", "insert")
+
+def upsert_empleados(filas: List[Dict[str, Any]]):
+    """Alta o edición de varias fichas en una sola petición (sin devolver las filas escritas)."""
+    return execute(get_client().table("empleados").upsert(filas, on_conflict="EmployeeNumber", returning="minimal"),
+                   "empleados", "upsert")
+
+def update_empleado(employee_number: int, payload: Dict[str, Any]):
+    return execute(get_client().table("empleados").update(payload).eq("EmployeeNumber", employee_number), "empleados", "update")
+
+def delete_empleado(employee_number: int):
+    return execute(get_client().table("empleados").delete().eq("EmployeeNumber", employee_number), "empleados", "delete")
+
+# --- profiles ---
+def fetch_profile(user_id: str) -> Optional[Dict[str, Any]]:
+    res = execute(get_client().table("profiles").select(_select(COLUMNAS_PERFIL)).eq("id", user_id), "profiles")
+    return res.data[0] if res.data else None
+
+def profile_exists(email: str) -> bool:
+    res = execute(get_client().table("profiles").select("id").eq("email", email), "profiles")
+    return bool(res.data)
+
+def insert_profile(payload: Dict[str, Any]):
+    return execute(get_client().table("profiles").insert(payload), "profiles", "insert")
+
+def update_profile(user_id: str, payload: Dict[str, Any]):
+    return execute(get_client().table("profiles").update(payload).eq("id", user_id), "profiles", "update")
+
+# --- configuracion_encuesta ---
+def fetch_survey_config() -> Dict[str, str]:
+    res = execute(get_client().table("configuracion_encuesta").select("clave, valor"), "configuracion_encuesta")
+    return {item['clave']: item['valor'] for item in res.data}
+
+def update_survey_config(clave: str, valor: str):
+    return execute(get_client().table("configuracion_encuesta").update({"valor": valor}).eq("clave", clave),
+                   "configuracion_encuesta", "update")
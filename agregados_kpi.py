@@ -0,0 +1,98 @@
+import logging
+from datetime import date
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from acceso_datos import get_client, fetch_all
+from snapshot_local import read_table
+from cache_dependencias import depends_on
+from cache_disco import persistent
+
+# ==============================================================================
+# 1. VISTAS AGREGADAS (sql/agregados_rotacion.sql)
+# ==============================================================================
+
+logger = logging.getLogger("agregados_kpi")
+
+# Vista -> columnas de agrupación (clave única de cada fila agregada, usada para paginar)
+VISTAS = {
+    "v_cubo_rotacion": ["Gender", "Tipocontrato", "Department", "tramo", "salida",
+                        "mes_salida", "anios_sin_promocion", "meses_antiguedad"],
+    "v_estancamiento_departamento": ["Department"],
+}
+
+COLUMNAS_BASE = ["Gender", "Tipocontrato", "Department", "YearsSinceLastPromotion", "FechaIngreso", "FechaSalida"]
+
+BINS_TRAMOS = [0, 6, 12, 24, 60, 1000]
+LABELS_TRAMOS = ['0–6 meses', '6–12 meses', '1–2 años', '2–5 años', 'Más de 5 años']
+
+def _fetch_view(vista: str) -> Optional[pd.DataFrame]:
+    """Lee la vista en el servidor; None si no existe (backend local, migración sin aplicar)."""
+    if get_client() is None:
+        return None
+    try:
+        return fetch_all(vista, "*", orden=VISTAS[vista])
+    except Exception as e:
+        logger.info("vista=%s no disponible, se calcula en pandas (%s)", vista, e)
+        return None
+
+# ==============================================================================
+# 2. CÁLCULO EQUIVALENTE EN PANDAS (FALLBACK)
+# ==============================================================================
+
+def _base_rotacion(df: pd.DataFrame) -> pd.DataFrame:
+    """Mismas derivaciones que v_rotacion_base."""
+    ingreso = pd.to_datetime(df['FechaIngreso'], errors='coerce')
+    salida = pd.to_datetime(df['FechaSalida'], errors='coerce')
+    base = pd.DataFrame({
+        'Gender': df['Gender'],
+        'Tipocontrato': df['Tipocontrato'].fillna('No especificado'),
+        'Department': df['Department'],
+        'YearsSinceLastPromotion': df['YearsSinceLastPromotion'],
+        'FechaSalida': salida,
+        'salida': salida.notna(),
+        'antiguedad_meses': (salida.fillna(pd.Timestamp(date.today())) - ingreso).dt.days / 30,
+    })
+    return base[ingreso.notna()]
+
+def _cubo(base):
+    """Mismas celdas que v_cubo_rotacion."""
+    meses = base['antiguedad_meses']
+    celdas = base.assign(
+        tramo=pd.cut(meses, bins=BINS_TRAMOS, labels=LABELS_TRAMOS).astype(object),
+        mes_salida=base['FechaSalida'].dt.to_period('M').dt.to_timestamp(),
+        anios_sin_promocion=base['YearsSinceLastPromotion'],
+        meses_antiguedad=np.trunc(meses).where(base['salida']).astype('Int64'),
+        primer_anio=meses <= 12,
+    )
+    return (celdas.groupby(VISTAS["v_cubo_rotacion"], dropna=False)
+            .agg(empleados=('salida', 'size'), suma_meses=('antiguedad_meses', 'sum'), primer_anio=('primer_anio', 'sum'))
+            .reset_index())
+
+def _estancamiento(df):
+    ysp = pd.to_numeric(df['YearsSinceLastPromotion'], errors='coerce').fillna(0)
+    return (pd.DataFrame({'Department': df['Department'], 'critico': ysp >= 3,
+                          'moderado': (ysp >= 2) & (ysp < 3), 'ysp': ysp})
+            .groupby('Department', dropna=False)
+            .agg(critico=('critico', 'sum'), moderado=('moderado', 'sum'),
+                 total=('ysp', 'size'), promedio=('ysp', 'mean')).reset_index())
+
+# ==============================================================================
+# 3. API PARA LAS PÁGINAS
+# ==============================================================================
+
+@depends_on("consolidado")
+@st.cache_data(ttl=600)
+@persistent("agregados_kpi", tablas=("consolidado",), version_extra=lambda: date.today().isoformat())
+def load_aggregate(vista: str) -> pd.DataFrame:
+    """Filas agregadas de la vista; si el servidor no la expone se calculan sobre la copia local."""
+    df = _fetch_view(vista)
+    if df is None:
+        filas = read_table("consolidado", COLUMNAS_BASE)
+        df = _estancamiento(filas) if vista == "v_estancamiento_departamento" else _cubo(_base_rotacion(filas))
+    if 'mes_salida' in df.columns:
+        df['mes_salida'] = pd.to_datetime(df['mes_salida'])
+    return df
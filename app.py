@@ -1,6 +1,6 @@
 import streamlit as st
 from typing import Optional
-from supabase import create_client, Client
+from supabase import Client
 import datetime
 import pandas as pd
 import re
@@ -15,6 +15,20 @@ from survey_control_logic import render_survey_control_panel
 from prediccion_manual_module import render_manual_prediction_tab
 from attrition_predictor import render_predictor_page
 from encuestas_historial import historial_encuestas_module
+from acceso_datos import get_client, fetch_profile, insert_profile, profile_exists
+from precarga import prefetch
+from arranque import start_prewarm
+from profile import load_user_profile_data
+from survey_control_logic import get_survey_config
+from employees_crud import fetch_employees_grid
+from dashboard_rotacion import load_filter_index
+from agregados_kpi import load_aggregate
+from cubo_rotacion import load_cube
+from supervivencia import load_survival
+from attrition_predictor import get_precomputed_results
+from resultados_precalculados import results_version
+from encuestas_historial import get_survey_data
+from tipos_compactos import memory_report
 
 # ============================================================
 # 0. CONFIGURACIÓN E INICIALIZACIÓN
@@ -26,17 +40,18 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-@st.cache_resource
 def get_supabase() -> Client:
-    url = st.secrets.get("SUPABASE_URL")
-    key = st.secrets.get("SUPABASE_KEY")
-    if not url or not key:
+    client = get_client()
+    if client is None:
         st.error("ERROR: Faltan SUPABASE_URL o SUPABASE_KEY en secrets.toml.")
         st.stop()
-    return create_client(url, key)
+    return client
 
 supabase = get_supabase()
 
+# Con WARM_START=1: modelo y datasets derivados se cargan desde disco en segundo plano
+start_prewarm()
+
 PAGES = [
     "Mi Perfil",
     "Dashboard", 
@@ -47,6 +62,22 @@ PAGES = [
     "Historial de Encuesta"
 ]
 
+def page_data_requirements(page: str) -> list:
+    """Loaders cacheados que necesita cada página (y el sidebar); se precargan en paralelo."""
+    requisitos = {
+        "Mi Perfil": [(load_user_profile_data, (st.session_state.get("user_id"),))],
+        "Dashboard": [(load_cube, ()), (load_filter_index, (datetime.date.today(),)), (load_survival, ())],
+        # Primera página con el orden por defecto (mismos argumentos que usa la grilla)
+        "Gestión de Empleados": [(fetch_employees_grid, (None, "EmployeeNumber", True, True, None))],
+        "Predicción desde Archivo": [(get_precomputed_results, (results_version(),))],
+        "Reconocimiento": [(load_aggregate, ("v_estancamiento_departamento",))],
+        "Historial de Encuesta": [(get_survey_data, ())],
+    }
+    tareas = list(requisitos.get(page, []))
+    if st.session_state.get("user_role") in ["admin", "supervisor"]:
+        tareas.append((get_survey_config, ()))
+    return tareas
+
 # ============================================================
 # 2. FUNCIONES DE APOYO Y PERFIL
 # ============================================================
@@ -54,11 +85,9 @@ PAGES = [
 def _fetch_and_set_user_profile(user_id: str, email: str):
     """Carga perfil. Si no existe en la tabla, lo crea automáticamente."""
     try:
-        response = supabase.table("profiles").select("*").eq("id", user_id).execute()
+        profile = fetch_profile(user_id)
         
-        if response.data and len(response.data) > 0:
-            profile = response.data[0]
-        else:
+        if not profile:
             # AUTO-CREACIÓN: Evita que el usuario quede bloqueado si no tiene fila en profiles
             new_profile = {
                 "id": user_id,
@@ -66,7 +95,7 @@ def _fetch_and_set_user_profile(user_id: str, email: str):
                 "full_name": email.split("@")[0],
                 "role": "guest"
             }
-            supabase.table("profiles").insert(new_profile).execute()
+            insert_profile(new_profile)
             profile = new_profile
 
         st.session_state.update({
@@ -167,9 +196,7 @@ def render_signup_form():
         if re.match(r"[^@]+@[^@]+\.[^@]+", email_reg): # Validación básica de formato
             try:
                 # Consultamos la tabla profiles gracias a tu política RLS para 'anon'
-                check_user = supabase.table("profiles").select("id").eq("email", email_reg).execute()
-                
-                if check_user.data and len(check_user.data) > 0:
+                if profile_exists(email_reg):
                     user_exists = True
                     st.error("⚠️ Este correo ya está registrado. El botón de registro se ha desactivado.")
             except Exception as e:
@@ -278,6 +305,22 @@ def render_auth_page():
 def set_page(page_name):
     st.session_state.current_page = page_name
 
+def render_memory_panel():
+    """Memoria de cada dataset cacheado en este proceso, antes y después de compactar tipos."""
+    with st.expander("🧠 Memoria de datasets"):
+        reporte = memory_report()
+        if reporte.empty:
+            st.caption("Aún no se cargó ningún dataset en este proceso.")
+            return
+        st.dataframe(pd.DataFrame({
+            "Filas": reporte["filas"],
+            "Antes (MB)": reporte["bytes_antes"] / 1e6,
+            "Después (MB)": reporte["bytes_despues"] / 1e6,
+            "Reducción (%)": reporte["reduccion_%"],
+        }).round(1), use_container_width=True)
+        st.caption(f"Total en caché: {reporte['bytes_despues'].sum() / 1e6:.1f} MB "
+                   f"(sin compactar: {reporte['bytes_antes'].sum() / 1e6:.1f} MB)")
+
 def render_sidebar():
     current_page = st.session_state.get("current_page", "Mi Perfil") 
     user_role = st.session_state.get("user_role", "guest")
@@ -310,7 +353,9 @@ def render_sidebar():
             handle_logout()
 
         if user_role in ["admin", "supervisor"]:
-            render_survey_control_panel(supabase)
+            render_survey_control_panel()
+        if user_role == "admin":
+            render_memory_panel()
 
 # ============================================================
 # 6. EJECUCIÓN MAESTRA
@@ -330,6 +375,11 @@ if is_logged_in:
         del st.session_state["just_logged_in"]
     
     # IMPORTANTE: No renderizamos NADA del login si is_logged_in es True
+    current = st.session_state.get("current_page", "Mi Perfil")
+
+    # Datos de la página y del sidebar en paralelo: la espera es la consulta más lenta
+    prefetch(page_data_requirements(current))
+
     render_sidebar()
     
     page_map = {
@@ -342,7 +392,6 @@ if is_logged_in:
         "Historial de Encuesta": historial_encuestas_module
     }
     
-    current = st.session_state.get("current_page", "Mi Perfil")
     page_map.get(current, lambda: None)()
 else:
     # Solo si NO está logueado mostramos la página de auth
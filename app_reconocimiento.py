@@ -1,8 +1,11 @@
 import streamlit as st
 import pandas as pd
-from supabase import create_client, Client
-from typing import Optional
 import warnings
+from acceso_datos import get_client, COLUMNAS_RECONOCIMIENTO
+from snapshot_local import read_table
+from cache_dependencias import depends_on
+from agregados_kpi import load_aggregate
+from tipos_compactos import compact_frame, translate_column, report_memory
 
 warnings.filterwarnings("ignore")
 
@@ -32,35 +35,27 @@ TRAD_PUESTO = {
 # 1. CONEXIÓN Y DATOS
 # ==============================================================================
 
-@st.cache_resource
-def get_supabase() -> Optional[Client]:
-    url = st.secrets.get("SUPABASE_URL")
-    key = st.secrets.get("SUPABASE_KEY")
-    return create_client(url, key) if url and key else None
-
-supabase = get_supabase()
-
-def fetch_employees_data():
-    if not supabase: return []
+def fetch_employees_data(departamento: str = None) -> pd.DataFrame:
+    if not get_client(): return pd.DataFrame()
+    filtros = [("Department", "==", departamento)] if departamento else None
     try:
-        columns = ["EmployeeNumber", "Department", "JobRole", "PerformanceRating", 
-                   "YearsSinceLastPromotion", "JobInvolvement", "NumeroFaltas"]
-        response = supabase.table("consolidado").select(", ".join(columns)).execute()
-        return response.data
+        return read_table("consolidado", COLUMNAS_RECONOCIMIENTO, filtros)
     except Exception as e:
         st.error(f"Error en base de datos: {e}")
-        return []
+        return pd.DataFrame()
 
+@depends_on("consolidado")
 @st.cache_data(ttl=300)
-def get_prepared_data():
-    raw_data = fetch_employees_data()
-    if not raw_data: return pd.DataFrame()
-    df = pd.DataFrame(raw_data)
-    df['Departamento_Vista'] = df['Department'].map(TRAD_DEPTO).fillna(df['Department'])
-    df['Cargo_Vista'] = df['JobRole'].map(TRAD_PUESTO).fillna(df['JobRole'])
+def get_prepared_data(departamento: str = None):
+    crudo = fetch_employees_data(departamento)
+    if crudo.empty: return crudo
+    df = crudo.copy()
     for col in ['YearsSinceLastPromotion', 'PerformanceRating', 'JobInvolvement', 'NumeroFaltas']:
         df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-    return df
+    df = compact_frame(df)
+    translate_column(df, 'Department', 'Departamento_Vista', TRAD_DEPTO)
+    translate_column(df, 'JobRole', 'Cargo_Vista', TRAD_PUESTO)
+    return report_memory(f"reconocimiento[{departamento}]", crudo, df)
 
 # ==============================================================================
 # 2. INTERFAZ
@@ -69,26 +64,16 @@ def get_prepared_data():
 def render_recognition_page():
     st.title("⭐ Reconocimiento y Desarrollo")
     
-    df = get_prepared_data()
-    if df.empty:
+    # Resumen agregado en el servidor (v_estancamiento_departamento); el detalle se pide por área
+    summary = load_aggregate("v_estancamiento_departamento")
+    if summary.empty:
         st.warning("No hay datos disponibles.")
         return
 
-    # --- LÓGICA DE RIESGO PARA RESUMEN ---
-    def classify_risk(y):
-        if y >= 3: return 'Crítico'
-        if y >= 2: return 'Moderado'
-        return 'Bajo'
-    
-    df['Nivel_Riesgo'] = df['YearsSinceLastPromotion'].apply(classify_risk)
-    
-    # Agrupación para la tabla de resumen inicial
-    summary = df.groupby('Departamento_Vista').agg(
-        Critico=('Nivel_Riesgo', lambda x: (x == 'Crítico').sum()),
-        Moderado=('Nivel_Riesgo', lambda x: (x == 'Moderado').sum()),
-        Total=('EmployeeNumber', 'count'),
-        Promedio=('YearsSinceLastPromotion', 'mean')
-    ).reset_index()
+    summary = summary.rename(columns={'critico': 'Critico', 'moderado': 'Moderado', 'total': 'Total', 'promedio': 'Promedio'})
+    departamentos = summary.pop('Department')
+    summary.insert(0, 'Departamento_Vista', departamentos.map(TRAD_DEPTO).fillna(departamentos))
+    depto_original = dict(zip(summary['Departamento_Vista'], departamentos))
 
     # Cálculo del porcentaje de riesgo (Críticos + Moderados sobre el total)
     summary['Riesgo %'] = ((summary['Critico'] + summary['Moderado']) / summary['Total']) * 100
@@ -118,11 +103,14 @@ def render_recognition_page():
 
     # --- AUDITORÍA DETALLADA ---
     st.subheader("🔍 Auditoría de Colaboradores")
-    lista_deptos = sorted(df['Departamento_Vista'].unique())
+    lista_deptos = sorted(summary['Departamento_Vista'].dropna().unique())
     dept_sel = st.selectbox("Seleccione un Departamento para auditar:", ["--- Seleccione ---"] + lista_deptos)
 
     if dept_sel != "--- Seleccione ---":
-        df_filtrado = df[df['Departamento_Vista'] == dept_sel].copy()
+        df_filtrado = get_prepared_data(depto_original[dept_sel])
+        if df_filtrado.empty:
+            st.warning("No hay datos disponibles.")
+            return
 
         # Preparamos las tablas finales traduciendo etiquetas
         df_display = df_filtrado[['EmployeeNumber', 'Cargo_Vista', 'PerformanceRating', 'JobInvolvement', 'YearsSinceLastPromotion', 'NumeroFaltas']].copy()
@@ -0,0 +1,88 @@
+"""
+Precalentamiento al arrancar el proceso (WARM_START=1).
+
+En la app: start_prewarm() lanza un hilo que carga el modelo y llena las cachés desde
+disco; luego sincroniza las tablas locales e invalida lo que haya cambiado.
+
+Tras un deploy, para que incluso la primera sesión lea del disco:
+    WARM_START=1 python arranque.py
+"""
+import os
+import sys
+import time
+import logging
+import threading
+from datetime import date
+
+from cache_disco import warm_start_enabled
+from snapshot_local import TABLAS_LOCALES, sync_table, table_version
+from cache_dependencias import invalidate
+
+logger = logging.getLogger("arranque")
+
+_lock = threading.Lock()
+_iniciado = False
+
+def _tareas():
+    # Importación diferida: el hilo arranca antes de que la página importe estos módulos
+    from attrition_predictor import load_resources, get_precomputed_results
+    from dashboard_rotacion import load_filter_index
+    from agregados_kpi import load_aggregate
+    from cubo_rotacion import load_cube
+    from supervivencia import load_survival
+    from rollup_mensual import monthly_rollup
+    from resultados_precalculados import results_version
+    tareas = ([(load_resources, ()), (load_filter_index, (date.today(),)), (get_precomputed_results, (results_version(),))]
+              + [(load_cube, ()), (load_aggregate, ("v_estancamiento_departamento",)),
+                 (load_survival, ()), (monthly_rollup, ())])
+    try:
+        from prediccion_manual_module import get_explainer
+        tareas.insert(1, (get_explainer, ()))
+    except Exception as e:
+        logger.warning("explainer SHAP no disponible para precalentar: %s", e)
+    return tareas
+
+def prewarm(sincronizar: bool = True):
+    """Llena las cachés en memoria (y en disco) y después refresca contra el origen."""
+    inicio = time.perf_counter()
+    for loader, args in _tareas():
+        try:
+            loader(*args)
+        except Exception as e:
+            logger.warning("precalentamiento=%s error=%s", getattr(loader, "__name__", loader), e)
+    logger.info("precalentamiento listo en %.2fs", time.perf_counter() - inicio)
+
+    if not sincronizar:
+        return
+    # Lo servido desde disco puede ser de antes del reinicio: se sincroniza y se invalida lo que cambió
+    for tabla in TABLAS_LOCALES:
+        antes = table_version(tabla)
+        try:
+            sync_table(tabla)
+        except Exception as e:
+            logger.warning("tabla=%s sin sincronizar: %s", tabla, e)
+            continue
+        if table_version(tabla) != antes:
+            invalidate(tabla)
+
+def start_prewarm():
+    """Idempotente: solo el primer llamado del proceso lanza el hilo."""
+    global _iniciado
+    if not warm_start_enabled():
+        return
+    with _lock:
+        if _iniciado:
+            return
+        _iniciado = True
+    threading.Thread(target=prewarm, name="precalentamiento", daemon=True).start()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    os.environ.setdefault("WARM_START", "1")
+    for tabla in TABLAS_LOCALES:
+        try:
+            sync_table(tabla)
+        except Exception as e:
+            logger.warning("tabla=%s sin sincronizar: %s", tabla, e)
+    prewarm(sincronizar=False)
+    sys.exit(0)
@@ -0,0 +1,87 @@
+import logging
+import threading
+
+import streamlit as st
+
+from acceso_datos import reserve_employee_numbers, fetch_max_employee_number
+
+# ==============================================================================
+# 1. ASIGNADOR DE EmployeeNumber POR BLOQUES
+# ==============================================================================
+# Cada proceso reserva un bloque de IDs con una sola llamada atómica al servidor
+# (sql/asignacion_ids.sql) y los entrega desde memoria. Dos administradores que dan de
+# alta a la vez reciben IDs distintos aunque estén en procesos distintos; los IDs de un
+# formulario cancelado vuelven al asignador del proceso (solo los que él entregó). Como con
+# una secuencia, puede haber huecos (bloques sin agotar al reiniciar).
+# Un ID nuevo elegido a mano (importación) se reclama con claim(): si cae en un bloque ya
+# reservado por algún proceso se rechaza; si no, el contador lo deja atrás.
+
+logger = logging.getLogger("asignacion_ids")
+
+TAMANO_BLOQUE = 20
+
+class IdAllocator:
+    def __init__(self, tamano_bloque: int = TAMANO_BLOQUE, reservar=reserve_employee_numbers):
+        self.tamano_bloque = tamano_bloque
+        self._reservar = reservar
+        self._bloque = iter(())
+        self._devueltos = []
+        self._entregados = set()
+        self._lock = threading.Lock()
+
+    def next(self) -> int:
+        with self._lock:
+            siguiente = self._devueltos.pop() if self._devueltos else next(self._bloque, None)
+            if siguiente is None:
+                self._bloque = iter(self._reservar(self.tamano_bloque))
+                siguiente = next(self._bloque)
+                logger.info("bloque reservado desde=%d tamano=%d", siguiente, self.tamano_bloque)
+            self._entregados.add(siguiente)
+            return siguiente
+
+    def take(self, cantidad: int) -> list:
+        """Varios IDs de una vez (altas masivas): un bloque exacto aparte del bloque en curso."""
+        if cantidad <= 0:
+            return []
+        with self._lock:
+            return list(self._reservar(cantidad))
+
+    def claim(self, ids) -> set:
+        """
+        Reclama IDs nuevos elegidos a mano. Devuelve los que quedan para quien llama; el resto
+        cae en un bloque ya reservado (por otro proceso o por este) y no debe usarse.
+        """
+        ids = {int(i) for i in ids}
+        if not ids:
+            return set()
+        with self._lock:
+            tope = self._reservar(0).stop - 1
+            if max(ids) <= tope:
+                return set()
+            # Si otro proceso reserva entre ambas llamadas, su bloque queda fuera de este
+            bloque = self._reservar(max(ids) - tope)
+            return {i for i in ids if i in bloque}
+
+    def release(self, employee_number: int):
+        """Devuelve un ID entregado por next() que no llegó a usarse (p. ej. formulario cancelado)."""
+        employee_number = int(employee_number)
+        with self._lock:
+            if employee_number not in self._entregados:
+                # p. ej. un ID de max+1 (next_employee_number sin reserva): no es de ningún bloque
+                logger.warning("id=%d no salió de un bloque reservado; no se reutiliza", employee_number)
+                return
+            self._entregados.discard(employee_number)
+            self._devueltos.append(employee_number)
+
+@st.cache_resource
+def get_id_allocator() -> IdAllocator:
+    return IdAllocator()
+
+def next_employee_number() -> int:
+    try:
+        return get_id_allocator().next()
+    except Exception as e:
+        # Sin la función en el servidor se vuelve al máximo + 1 (sin garantía ante altas simultáneas)
+        logger.warning("reserva de IDs no disponible, se usa max+1: %s", e)
+        ultimo = fetch_max_employee_number()
+        return ultimo + 1 if ultimo is not None else 1
@@ -4,12 +4,13 @@ import joblib
 import streamlit as st
 from datetime import datetime
 from typing import Optional
-
-# Configuración de Supabase
-try:
-    from supabase import create_client, Client
-except ImportError:
-    class Client: pass
+from snapshots_riesgo import save_snapshot, risk_increases
+from resultados_precalculados import load_results, results_version
+from acceso_datos import get_client, COLUMNAS_MODELO
+from snapshot_local import read_table
+from cache_dependencias import depends_on
+from tipos_compactos import compact_frame, report_memory
+from validacion_datos import ALIAS_CATEGORIAS, build_category_lookup, encode_categorical, validate_frame, rows_with_errors
 
 # ============================================================================== 
 # 1. RECURSOS Y MAPEOS (Traducción y Caché)
@@ -30,16 +31,16 @@ def load_resources():
     scaler = joblib.load('models/scaler.pkl')
     return model, mapping, scaler
 
-@st.cache_resource
-def get_supabase():
-    url = st.secrets.get("SUPABASE_URL")
-    key = st.secrets.get("SUPABASE_KEY")
-    return create_client(url, key) if url and key else None
-
+@depends_on("consolidado")
 @st.cache_data(ttl=600)
-def get_data_from_db(_client):
-    res = _client.table('consolidado').select('*').execute()
-    return pd.DataFrame(res.data) if res.data else None
+def get_data_from_db():
+    df = read_table("consolidado", COLUMNAS_MODELO)
+    return report_memory("consolidado_modelo", df, compact_frame(df)) if not df.empty else None
+
+@st.cache_data
+def get_precomputed_results(version: float):
+    # 'version' solo participa de la clave: cambia cuando el scoring nocturno reescribe el archivo
+    return load_results()
 
 # ============================================================================== 
 # 2. LÓGICA DE PREDICCIÓN Y ACCIONES
@@ -53,33 +54,115 @@ def obtener_recomendaciones(row):
     if row.get('NumeroTardanzas', 0) > 3 or row.get('NumeroFaltas', 0) > 1: r.append("Analizar ausentismo.")
     return " | ".join(r) if r else "Sin alertas."
 
-def run_pipeline(df_raw, model, mapping, scaler):
+MODEL_COLS = [
+    'Age', 'BusinessTravel', 'Department', 'DistanceFromHome', 'Education',
+    'EducationField', 'EnvironmentSatisfaction', 'Gender', 'JobInvolvement', 
+    'JobLevel', 'JobRole', 'JobSatisfaction', 'MaritalStatus', 'MonthlyIncome', 
+    'NumCompaniesWorked', 'OverTime', 'PercentSalaryHike', 'PerformanceRating', 
+    'RelationshipSatisfaction', 'TotalWorkingYears', 'TrainingTimesLastYear',
+    'WorkLifeBalance', 'YearsAtCompany', 'YearsInCurrentRole', 
+    'YearsSinceLastPromotion', 'YearsWithCurrManager', 'IntencionPermanencia', 
+    'CargaLaboralPercibida', 'SatisfaccionSalarial', 'ConfianzaEmpresa', 
+    'NumeroTardanzas', 'NumeroFaltas', 'tipo_contrato' 
+]
+CAT_COLS = ['BusinessTravel', 'Department', 'EducationField', 'Gender', 'JobRole', 'MaritalStatus', 'OverTime', 'tipo_contrato']
+
+def score_frame(df_raw, model, mapping, scaler):
+    """Codifica, escala y puntúa todas las filas en un solo lote. Devuelve el vector de probabilidades."""
     df_input = df_raw.copy()
-    model_cols = [
-        'Age', 'BusinessTravel', 'Department', 'DistanceFromHome', 'Education',
-        'EducationField', 'EnvironmentSatisfaction', 'Gender', 'JobInvolvement', 
-        'JobLevel', 'JobRole', 'JobSatisfaction', 'MaritalStatus', 'MonthlyIncome', 
-        'NumCompaniesWorked', 'OverTime', 'PercentSalaryHike', 'PerformanceRating', 
-        'RelationshipSatisfaction', 'TotalWorkingYears', 'TrainingTimesLastYear',
-        'WorkLifeBalance', 'YearsAtCompany', 'YearsInCurrentRole', 
-        'YearsSinceLastPromotion', 'YearsWithCurrManager', 'IntencionPermanencia', 
-        'CargaLaboralPercibida', 'SatisfaccionSalarial', 'ConfianzaEmpresa', 
-        'NumeroTardanzas', 'NumeroFaltas', 'tipo_contrato' 
-    ]
-    for col in model_cols:
+    for col in MODEL_COLS:
         if col not in df_input.columns: df_input[col] = 0
     
-    cat_cols = ['BusinessTravel', 'Department', 'EducationField', 'Gender', 'JobRole', 'MaritalStatus', 'OverTime', 'tipo_contrato']
-    for col in cat_cols:
+    for col in CAT_COLS:
         if col in df_input.columns:
-            df_input[col] = df_input[col].astype(str).str.strip().str.upper().map(mapping.get(col, {})).fillna(-1)
+            df_input[col] = encode_categorical(df_input[col], mapping.get(col, {}), ALIAS_CATEGORIAS.get(col))
+
+    df_final = df_input[MODEL_COLS].fillna(0)
+    return model.predict_proba(scaler.transform(df_final))[:, 1]
+
+LIKERT_COLS = [
+    'EnvironmentSatisfaction', 'JobInvolvement', 'JobSatisfaction', 'RelationshipSatisfaction',
+    'WorkLifeBalance', 'IntencionPermanencia', 'CargaLaboralPercibida', 'SatisfaccionSalarial', 'ConfianzaEmpresa'
+]
 
-    df_final = df_input[model_cols].fillna(0)
-    prob = model.predict_proba(scaler.transform(df_final))[:, 1]
-    df_raw['Probabilidad_Renuncia'] = prob
+def validate_input(df_raw, mapping):
+    """Etapa previa al scoring: tipos, rangos y categorías conocidas en una sola pasada vectorizada."""
+    rangos = {col: (0, None) for col in MODEL_COLS if col not in CAT_COLS}
+    rangos.update({col: (1, 5) for col in LIKERT_COLS})
+    rangos.update({'Age': (18, None), 'Education': (1, 5), 'JobLevel': (1, 5), 'PerformanceRating': (1, 4)})
+    categorias = {col: build_category_lookup(mapping[col].keys(), ALIAS_CATEGORIAS.get(col)) for col in CAT_COLS if col in mapping}
+    return validate_frame(df_raw, rangos=rangos, categorias=categorias, requeridas=MODEL_COLS)
+
+def run_pipeline(df_raw, model, mapping, scaler):
+    df_raw['Probabilidad_Renuncia'] = score_frame(df_raw, model, mapping, scaler)
     df_raw['Recomendacion'] = df_raw.apply(obtener_recomendaciones, axis=1)
     return df_raw
 
+# ============================================================================== 
+# 2.1 BACKFILL HISTÓRICO (AS-OF JOIN ENCUESTAS + EMPLEADOS)
+# ==============================================================================
+SURVEY_COLS = [
+    'EnvironmentSatisfaction', 'JobInvolvement', 'JobSatisfaction', 'RelationshipSatisfaction',
+    'WorkLifeBalance', 'IntencionPermanencia', 'CargaLaboralPercibida', 'SatisfaccionSalarial',
+    'ConfianzaEmpresa'
+]
+
+@depends_on("encuestas")
+@st.cache_data(ttl=600)
+def get_surveys_from_db():
+    df = read_table("encuestas", ['EmployeeNumber', 'Fecha'] + SURVEY_COLS)
+    return report_memory("encuestas_backfill", df, compact_frame(df)) if not df.empty else None
+
+def build_asof_features(df_emp, df_enc, fechas):
+    """Matriz de variables por (empleado, fecha de corte) con la última encuesta previa a cada fecha."""
+    cortes = pd.DataFrame({'FechaCorte': pd.to_datetime(pd.Series(fechas)).sort_values().unique()})
+    emp = df_emp.copy()
+    emp['EmployeeNumber'] = pd.to_numeric(emp['EmployeeNumber'], errors='coerce')
+    emp = emp.dropna(subset=['EmployeeNumber'])
+    emp['EmployeeNumber'] = emp['EmployeeNumber'].astype('int64')
+
+    # Producto empleado x fecha, quedándonos solo con quienes estaban activos en cada corte
+    base = emp.merge(cortes, how='cross')
+    if 'FechaIngreso' in base.columns:
+        ingreso = pd.to_datetime(base['FechaIngreso'], errors='coerce')
+        base = base[ingreso.isna() | (ingreso <= base['FechaCorte'])]
+    if 'FechaSalida' in base.columns:
+        salida = pd.to_datetime(base['FechaSalida'], errors='coerce')
+        base = base[salida.isna() | (salida > base['FechaCorte'])]
+
+    if df_enc is None or df_enc.empty:
+        return base.reset_index(drop=True)
+
+    enc = df_enc[['EmployeeNumber', 'Fecha'] + [c for c in SURVEY_COLS if c in df_enc.columns]].copy()
+    enc['EmployeeNumber'] = pd.to_numeric(enc['EmployeeNumber'], errors='coerce')
+    enc['Fecha'] = pd.to_datetime(enc['Fecha'], errors='coerce')
+    enc = enc.dropna(subset=['EmployeeNumber', 'Fecha'])
+    enc['EmployeeNumber'] = enc['EmployeeNumber'].astype('int64')
+
+    # merge_asof exige ambas tablas ordenadas por la clave temporal
+    base = base.sort_values('FechaCorte', kind='stable')
+    enc = enc.sort_values('Fecha', kind='stable')
+    survey_cols = [c for c in SURVEY_COLS if c in enc.columns]
+    enc = enc.rename(columns={'Fecha': 'FechaEncuesta', **{c: f'{c}__enc' for c in survey_cols}})
+    merged = pd.merge_asof(base.drop(columns=['FechaEncuesta'], errors='ignore'), enc,
+                           left_on='FechaCorte', right_on='FechaEncuesta',
+                           by='EmployeeNumber', direction='backward')
+
+    # La encuesta vigente a la fecha reemplaza a los valores del registro del empleado
+    for col in survey_cols:
+        enc_col = merged.pop(f'{col}__enc')
+        merged[col] = enc_col.fillna(merged[col]) if col in merged.columns else enc_col
+    return merged.sort_values(['EmployeeNumber', 'FechaCorte']).reset_index(drop=True)
+
+def run_backfill(df_emp, df_enc, fechas, model, mapping, scaler):
+    """Puntúa en un solo lote todos los pares (empleado, fecha) y devuelve las trayectorias de riesgo."""
+    features = build_asof_features(df_emp, df_enc, fechas)
+    if features.empty:
+        return pd.DataFrame(columns=['EmployeeNumber', 'FechaCorte', 'FechaEncuesta', 'Probabilidad_Renuncia'])
+    features['Probabilidad_Renuncia'] = score_frame(features, model, mapping, scaler)
+    cols = ['EmployeeNumber', 'FechaCorte', 'FechaEncuesta', 'Department', 'Probabilidad_Renuncia']
+    return features[[c for c in cols if c in features.columns]]
+
 # ============================================================================== 
 # 3. COMPONENTES DE INTERFAZ
 # ==============================================================================
@@ -121,6 +204,50 @@ def display_dashboard(df, title):
                 st.write("**Estrategia sugerida:**")
                 for r in row['Recomendacion'].split(" | "): st.write(f"• {r}")
 
+def display_validation_report(total, errores, faltantes):
+    filas_err = rows_with_errors(errores)
+    v1, v2, v3 = st.columns(3)
+    v1.metric("Filas cargadas", f"{total:,}")
+    v2.metric("Filas válidas", f"{total - len(filas_err):,}")
+    v3.metric("Filas con errores", f"{len(filas_err):,}")
+    if faltantes:
+        st.warning(f"Columnas ausentes (se asumirá 0): {', '.join(faltantes)}")
+    if not filas_err.empty:
+        st.error("Las filas con errores se excluyeron del análisis.")
+        with st.expander("📋 Reporte de errores por fila"):
+            st.dataframe(filas_err.head(1000), use_container_width=True, hide_index=True)
+            st.download_button("⬇️ Descargar reporte completo", errores.to_csv(index=False).encode("utf-8"),
+                               file_name="errores_validacion.csv", mime="text/csv")
+
+def display_risk_alerts(umbral=15.0):
+    st.divider()
+    st.subheader(f"📈 Riesgo en Aumento (+{umbral:.0f} pts desde el mes pasado)")
+    alertas = risk_increases(umbral_puntos=umbral)
+    if alertas.empty:
+        st.info("Sin corridas comparables o sin aumentos significativos de riesgo.")
+        return
+    st.dataframe(alertas, use_container_width=True, hide_index=True, column_config={
+        "EmployeeNumber": "ID",
+        "Prob_Anterior": st.column_config.NumberColumn("Riesgo Anterior", format="%.2f"),
+        "Prob_Actual": st.column_config.NumberColumn("Riesgo Actual", format="%.2f"),
+        "Cambio_Puntos": st.column_config.NumberColumn("Cambio (pts)", format="%+.1f")
+    })
+
+def display_backfill(df_hist):
+    st.markdown("### 📈 Trayectorias de Riesgo")
+    serie = df_hist.groupby('FechaCorte')['Probabilidad_Renuncia'].agg(['mean', 'size']).reset_index()
+    m1, m2 = st.columns(2)
+    m1.metric("Fechas de corte", len(serie))
+    m2.metric("Pares empleado-fecha", f"{len(df_hist):,}")
+    st.line_chart(serie.set_index('FechaCorte')['mean'].rename("Riesgo promedio"))
+
+    ids = sorted(df_hist['EmployeeNumber'].unique().tolist())
+    emp_sel = st.multiselect("Comparar colaboradores:", ids, default=ids[:3])
+    if emp_sel:
+        tray = df_hist[df_hist['EmployeeNumber'].isin(emp_sel)].pivot_table(
+            index='FechaCorte', columns='EmployeeNumber', values='Probabilidad_Renuncia')
+        st.line_chart(tray)
+
 # ============================================================================== 
 # 4. RENDERIZADO PRINCIPAL (Navegación Superior Estable)
 # ==============================================================================
@@ -132,7 +259,7 @@ def render_predictor_page():
     if 'modo' not in st.session_state:
         st.session_state.modo = "archivo" # Por defecto inicia en archivo
 
-    col_nav1, col_nav2 = st.columns(2)
+    col_nav1, col_nav2, col_nav3 = st.columns(3)
     
     # Botones que actúan como "Tabs" pero son estables
     if col_nav1.button("📂 ANALIZAR ARCHIVO LOCAL", use_container_width=True, type="primary" if st.session_state.modo == "archivo" else "secondary"):
@@ -141,6 +268,9 @@ def render_predictor_page():
     if col_nav2.button("☁️ ANALIZAR DESDE SUPABASE", use_container_width=True, type="primary" if st.session_state.modo == "supabase" else "secondary"):
         st.session_state.modo = "supabase"
 
+    if col_nav3.button("📈 HISTÓRICO DE RIESGO", use_container_width=True, type="primary" if st.session_state.modo == "historico" else "secondary"):
+        st.session_state.modo = "historico"
+
     st.markdown("---")
 
     # MÓDULO ARCHIVO
@@ -149,26 +279,64 @@ def render_predictor_page():
         file = st.file_uploader("Subir CSV o Excel", type=["csv", "xlsx"], key="file_input")
         if file and st.button("🚀 Iniciar Predicción", use_container_width=True):
             df = pd.read_csv(file) if file.name.endswith('.csv') else pd.read_excel(file)
-            st.session_state.res_archivo = run_pipeline(df, model, mapping, scaler)
-        
+            df_ok, errores, faltantes = validate_input(df, mapping)
+            st.session_state.val_archivo = (len(df), errores, faltantes)
+            df_validas = df_ok[~df_ok.index.isin(errores['fila'])]
+            st.session_state.res_archivo = run_pipeline(df_validas.copy(), model, mapping, scaler) if not df_validas.empty else None
+
+        if st.session_state.get('val_archivo'):
+            display_validation_report(*st.session_state.val_archivo)
+
         if 'res_archivo' in st.session_state and st.session_state.res_archivo is not None:
             display_dashboard(st.session_state.res_archivo, "Archivo Local")
 
     # MÓDULO SUPABASE
     elif st.session_state.modo == "supabase":
         st.subheader("Sincronización con Nube")
-        client = get_supabase()
+        client = get_client()
         if client:
             if st.button("🔄 Consultar Base de Datos y Predecir", use_container_width=True):
                 with st.spinner("Descargando datos y procesando IA..."):
-                    df_sb = get_data_from_db(client)
+                    df_sb = get_data_from_db()
                     if df_sb is not None:
                         st.session_state.res_supabase = run_pipeline(df_sb, model, mapping, scaler)
+                        save_snapshot(st.session_state.res_supabase)
                     else:
                         st.error("No se pudo obtener información de la tabla 'consolidado'.")
             
+            if st.session_state.get('res_supabase') is None:
+                df_pre, agregados = get_precomputed_results(results_version())
+                if df_pre is not None:
+                    st.caption(f"🌙 Resultados precalculados del scoring nocturno ({agregados.get('generado_en', '')}).")
+                    display_dashboard(df_pre, "Supabase (Precalculado)")
+                    display_risk_alerts()
+
             if 'res_supabase' in st.session_state and st.session_state.res_supabase is not None:
                 display_dashboard(st.session_state.res_supabase, "Supabase en Vivo")
+                display_risk_alerts()
+        else:
+            st.error("Error de conexión: Verifica las credenciales en 'secrets'.")
+
+    # MÓDULO HISTÓRICO (BACKFILL)
+    elif st.session_state.modo == "historico":
+        st.subheader("Reconstrucción Histórica del Riesgo")
+        client = get_client()
+        if client:
+            hoy = datetime.today().date()
+            c_d1, c_d2 = st.columns(2)
+            rango = c_d1.date_input("Periodo a reconstruir", ((pd.Timestamp(hoy) - pd.DateOffset(years=1)).date(), hoy))
+            frecuencia = c_d2.selectbox("Frecuencia de corte", ["Mensual", "Trimestral"])
+            if len(rango) == 2 and st.button("⏪ Reconstruir Trayectorias", use_container_width=True):
+                fechas = pd.date_range(rango[0], rango[1], freq="MS" if frecuencia == "Mensual" else "QS")
+                with st.spinner("Cruzando encuestas históricas y puntuando..."):
+                    df_sb = get_data_from_db()
+                    if df_sb is not None and len(fechas) > 0:
+                        st.session_state.res_historico = run_backfill(df_sb, get_surveys_from_db(), fechas, model, mapping, scaler)
+                    else:
+                        st.error("No hay datos o fechas de corte para reconstruir.")
+
+            if st.session_state.get('res_historico') is not None and not st.session_state.res_historico.empty:
+                display_backfill(st.session_state.res_historico)
         else:
             st.error("Error de conexión: Verifica las credenciales en 'secrets'.")
 
@@ -0,0 +1,414 @@
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+
+# ==============================================================================
+# 1. ESQUEMA LOCAL (SQLITE)
+# ==============================================================================
+# Sustituto local de Supabase para medir rendimiento sin latencia de red.
+# Implementa el subconjunto de la API de tablas que usa la app:
+#   table().select().eq()/gt()/in_()...order().range().limit().insert().update().delete().upsert()
+# y rpc() para las funciones de sql/ que usa la app.
+# 'consolidado' es una vista: empleados + última encuesta de cada empleado.
+
+COLUMNAS_ENCUESTA = [
+    "EnvironmentSatisfaction", "JobInvolvement", "JobSatisfaction", "RelationshipSatisfaction",
+    "WorkLifeBalance", "IntencionPermanencia", "CargaLaboralPercibida", "SatisfaccionSalarial",
+    "ConfianzaEmpresa"
+]
+
+ESQUEMA = f"""
+CREATE TABLE IF NOT EXISTS empleados (
+    "EmployeeNumber" INTEGER PRIMARY KEY, "Age" INTEGER, "Gender" TEXT, "MonthlyIncome" INTEGER,
+    "Department" TEXT, "JobRole" TEXT, "BusinessTravel" TEXT, "EducationField" TEXT, "Education" INTEGER,
+    "MaritalStatus" TEXT, "DistanceFromHome" INTEGER, "JobLevel" INTEGER, "OverTime" TEXT,
+    "TotalWorkingYears" INTEGER, "YearsAtCompany" INTEGER, "YearsInCurrentRole" INTEGER,
+    "YearsSinceLastPromotion" INTEGER, "YearsWithCurrManager" INTEGER, "TrainingTimesLastYear" INTEGER,
+    "NumCompaniesWorked" INTEGER, "PerformanceRating" INTEGER, "PercentSalaryHike" INTEGER,
+    "NumeroTardanzas" INTEGER, "NumeroFaltas" INTEGER, "Tipocontrato" TEXT,
+    "FechaIngreso" TEXT, "FechaSalida" TEXT
+);
+CREATE TABLE IF NOT EXISTS encuestas (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT, "EmployeeNumber" INTEGER, "Fecha" TEXT,
+    {", ".join(f'"{c}" INTEGER' for c in COLUMNAS_ENCUESTA)}
+);
+CREATE INDEX IF NOT EXISTS idx_encuestas_emp_fecha ON encuestas ("EmployeeNumber", "Fecha");
+CREATE TABLE IF NOT EXISTS profiles (
+    "id" TEXT PRIMARY KEY, "email" TEXT UNIQUE, "full_name" TEXT, "role" TEXT, "phone_number" TEXT,
+    "address" TEXT, "date_of_birth" TEXT, "avatar_url" TEXT, "created_at" TEXT DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS configuracion_encuesta ("clave" TEXT PRIMARY KEY, "valor" TEXT);
+CREATE TABLE IF NOT EXISTS contadores ("nombre" TEXT PRIMARY KEY, "valor" INTEGER NOT NULL);
+CREATE VIEW IF NOT EXISTS consolidado AS
+    SELECT e.*, {", ".join(f'u."{c}"' for c in COLUMNAS_ENCUESTA)}
+    FROM empleados e
+    LEFT JOIN encuestas u ON u."id" = (
+        SELECT x."id" FROM encuestas x WHERE x."EmployeeNumber" = e."EmployeeNumber"
+        ORDER BY x."Fecha" DESC, x."id" DESC LIMIT 1
+    );
+"""
+
+CLAVES_PRIMARIAS = {
+    "empleados": "EmployeeNumber", "consolidado": "EmployeeNumber", "encuestas": "id",
+    "profiles": "id", "configuracion_encuesta": "clave"
+}
+
+class LocalBackendError(Exception):
+    """Equivalente local del APIError de PostgREST (tabla o columna inexistente, etc.)."""
+
+# ==============================================================================
+# 2. CONSTRUCTOR DE CONSULTAS (API COMPATIBLE)
+# ==============================================================================
+
+OPERADORES = {"eq": "=", "neq": "!=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<=", "like": "LIKE", "ilike": "LIKE"}
+
+def _q(col: str) -> str:
+    return '"' + col.replace('"', '""') + '"'
+
+def _partir(texto: str) -> list:
+    """Separa por comas de primer nivel (fuera de paréntesis y comillas)."""
+    partes, actual, nivel, comillas, i = [], "", 0, False, 0
+    while i < len(texto):
+        c = texto[i]
+        if c == "\\" and comillas and i + 1 < len(texto):
+            actual += texto[i:i + 2]
+            i += 2
+            continue
+        if c == '"':
+            comillas = not comillas
+        elif not comillas and c == "(":
+            nivel += 1
+        elif not comillas and c == ")":
+            nivel -= 1
+        if c == "," and nivel == 0 and not comillas:
+            partes.append(actual)
+            actual = ""
+        else:
+            actual += c
+        i += 1
+    return partes + ([actual] if actual else [])
+
+def _literal(valor: str):
+    valor = valor.strip()
+    if len(valor) >= 2 and valor[0] == valor[-1] == '"':
+        return valor[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    return valor
+
+def _condicion(texto: str, union: str = "OR"):
+    """Traduce la sintaxis de filtros lógicos de PostgREST ('a.eq.1,and(b.gt.2,c.is.null)') a SQL."""
+    sql, params = [], []
+    for termino in _partir(texto):
+        termino = termino.strip()
+        for logico in ("and", "or"):
+            if termino.startswith(logico + "(") and termino.endswith(")"):
+                sub, sub_params = _condicion(termino[len(logico) + 1:-1], logico.upper())
+                sql.append(sub)
+                params.extend(sub_params)
+                break
+        else:
+            col, operador, valor = termino.split(".", 2)
+            if operador == "is":
+                sql.append(f"{_q(col)} IS NULL" if valor == "null" else f"{_q(col)} IS NOT NULL")
+            elif operador == "in":
+                valores = [_literal(v) for v in _partir(valor.strip()[1:-1])]
+                sql.append(f"{_q(col)} IN ({', '.join('?' * len(valores))})" if valores else "0")
+                params.extend(valores)
+            else:
+                patron = operador in ("like", "ilike")
+                sql.append(f"{_q(col)} {OPERADORES[operador]} ?" + (" COLLATE NOCASE" if operador == "ilike" else ""))
+                params.append(_literal(valor).replace("*", "%") if patron else _literal(valor))
+    return "(" + f" {union} ".join(sql) + ")", params
+
+class LocalQuery:
+    def __init__(self, backend, tabla):
+        self._backend, self._tabla = backend, tabla
+        self._accion, self._columnas, self._conteo = "select", "*", None
+        self._filtros, self._params, self._orden = [], [], []
+        self._offset, self._limite, self._payload, self._on_conflict = 0, None, None, None
+        self._single, self._returning = False, "representation"
+
+    # --- lectura ---
+    def select(self, *columnas, count=None, head=None):
+        texto = ",".join(columnas) if columnas else "*"
+        partes = [c.strip() for c in texto.split(",") if c.strip()]
+        self._columnas = "*" if partes in ([], ["*"]) else ", ".join(_q(c) for c in partes)
+        self._conteo = count
+        return self
+
+    def _filtro(self, operador, col, valor):
+        if operador == "ilike":
+            self._filtros.append(f"{_q(col)} LIKE ? COLLATE NOCASE")
+        else:
+            self._filtros.append(f"{_q(col)} {OPERADORES[operador]} ?")
+        self._params.append(valor)
+        return self
+
+    def eq(self, col, valor): return self._filtro("eq", col, valor)
+    def neq(self, col, valor): return self._filtro("neq", col, valor)
+    def gt(self, col, valor): return self._filtro("gt", col, valor)
+    def gte(self, col, valor): return self._filtro("gte", col, valor)
+    def lt(self, col, valor): return self._filtro("lt", col, valor)
+    def lte(self, col, valor): return self._filtro("lte", col, valor)
+    def like(self, col, patron): return self._filtro("like", col, patron)
+    def ilike(self, col, patron): return self._filtro("ilike", col, patron)
+
+    def is_(self, col, valor):
+        self._filtros.append(f"{_q(col)} IS NULL" if valor in (None, "null") else f"{_q(col)} IS NOT NULL")
+        return self
+
+    def or_(self, filtros: str):
+        condicion, params = _condicion(filtros)
+        self._filtros.append(condicion)
+        self._params.extend(params)
+        return self
+
+    def in_(self, col, valores):
+        valores = list(valores)
+        self._filtros.append(f"{_q(col)} IN ({', '.join('?' * len(valores))})" if valores else "0")
+        self._params.extend(valores)
+        return self
+
+    def order(self, col, desc=False, nullsfirst=None):
+        self._orden.append(f"{_q(col)} {'DESC' if desc else 'ASC'}")
+        return self
+
+    def range(self, inicio, fin):
+        self._offset, self._limite = inicio, fin - inicio + 1
+        return self
+
+    def limit(self, n):
+        self._limite = n
+        return self
+
+    def single(self):
+        self._single = True
+        return self
+
+    # --- escritura ---
+    def insert(self, payload):
+        self._accion, self._payload = "insert", payload
+        return self
+
+    def upsert(self, payload, on_conflict=None, returning="representation"):
+        self._accion, self._payload = "upsert", payload
+        self._on_conflict = on_conflict or CLAVES_PRIMARIAS.get(self._tabla)
+        self._returning = returning
+        return self
+
+    def update(self, payload):
+        self._accion, self._payload = "update", payload
+        return self
+
+    def delete(self):
+        self._accion = "delete"
+        return self
+
+    def execute(self):
+        try:
+            return self._backend._run(self)
+        except sqlite3.Error as e:
+            raise LocalBackendError(f"{self._tabla}: {e}") from e
+
+    def _where(self):
+        return (" WHERE " + " AND ".join(self._filtros)) if self._filtros else ""
+
+class LocalBackend:
+    """Cliente con la forma de supabase.Client sobre un archivo (o memoria) SQLite."""
+
+    def __init__(self, path: str = ":memory:"):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self._rpcs = {"reservar_employee_numbers": self._reservar_employee_numbers}
+        with self._lock:
+            self._conn.executescript(ESQUEMA)
+        self.auth = LocalAuth(self)
+
+    def table(self, nombre: str) -> LocalQuery:
+        return LocalQuery(self, nombre)
+
+    def rpc(self, nombre: str, params: dict = None):
+        if nombre not in self._rpcs:
+            raise LocalBackendError(f"función {nombre} inexistente")
+        funcion = self._rpcs[nombre]
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=funcion(**(params or {})), count=None))
+
+    def _reservar_employee_numbers(self, cantidad: int) -> int:
+        """Igual que sql/asignacion_ids.sql: UPDATE ... RETURNING dentro de una transacción."""
+        with self._lock, self._conn:
+            self._conn.execute('INSERT OR IGNORE INTO contadores ("nombre", "valor") '
+                               'SELECT \'EmployeeNumber\', COALESCE(MAX("EmployeeNumber"), 0) FROM empleados')
+            return self._conn.execute(
+                'UPDATE contadores SET "valor" = MAX("valor", (SELECT COALESCE(MAX("EmployeeNumber"), 0) FROM empleados)) + ? '
+                'WHERE "nombre" = \'EmployeeNumber\' RETURNING "valor"', [int(cantidad)]).fetchone()[0]
+
+    def _rows(self, cursor):
+        return [dict(r) for r in cursor.fetchall()]
+
+    def _run(self, q: LocalQuery):
+        t = _q(q._tabla)
+        with self._lock, self._conn:
+            if q._accion == "select":
+                sql = f"SELECT {q._columnas} FROM {t}{q._where()}"
+                if q._orden:
+                    sql += " ORDER BY " + ", ".join(q._orden)
+                if q._limite is not None or q._offset:
+                    sql += f" LIMIT {q._limite if q._limite is not None else -1} OFFSET {q._offset}"
+                data = self._rows(self._conn.execute(sql, q._params))
+                count = None
+                if q._conteo:
+                    count = self._conn.execute(f"SELECT COUNT(*) FROM {t}{q._where()}", q._params).fetchone()[0]
+                if q._single:
+                    data = data[0] if data else None
+                return SimpleNamespace(data=data, count=count)
+
+            if q._accion in ("insert", "upsert"):
+                filas = q._payload if isinstance(q._payload, list) else [q._payload]
+                insertadas = []
+                for fila in filas:
+                    cols = list(fila.keys())
+                    sql = f"INSERT INTO {t} ({', '.join(_q(c) for c in cols)}) VALUES ({', '.join('?' * len(cols))})"
+                    if q._accion == "upsert":
+                        otras = [c for c in cols if c != q._on_conflict]
+                        sql += f" ON CONFLICT({_q(q._on_conflict)}) DO " + (
+                            "UPDATE SET " + ", ".join(f"{_q(c)} = excluded.{_q(c)}" for c in otras) if otras else "NOTHING")
+                    cur = self._conn.execute(sql, [fila[c] for c in cols])
+                    if q._returning == "minimal":
+                        continue  # Como Prefer: return=minimal: no relee las filas escritas
+                    clave = CLAVES_PRIMARIAS.get(q._tabla)
+                    valor = fila.get(clave, cur.lastrowid)
+                    insertadas.extend(self._rows(self._conn.execute(f"SELECT * FROM {t} WHERE {_q(clave)} = ?", [valor])))
+                return SimpleNamespace(data=insertadas, count=None)
+
+            afectadas = self._rows(self._conn.execute(f"SELECT * FROM {t}{q._where()}", q._params))
+            if q._accion == "update":
+                sets = ", ".join(f"{_q(c)} = ?" for c in q._payload)
+                self._conn.execute(f"UPDATE {t} SET {sets}{q._where()}", list(q._payload.values()) + q._params)
+                afectadas = [{**fila, **q._payload} for fila in afectadas]
+            else:
+                self._conn.execute(f"DELETE FROM {t}{q._where()}", q._params)
+            return SimpleNamespace(data=afectadas, count=None)
+
+    def executescript(self, sql: str):
+        with self._lock, self._conn:
+            self._conn.executescript(sql)
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM empleados').fetchone()[0] == 0
+
+# ==============================================================================
+# 3. AUTENTICACIÓN MÍNIMA (SOLO PARA USO LOCAL)
+# ==============================================================================
+
+class LocalAuth:
+    """Acepta cualquier contraseña para correos presentes en 'profiles'."""
+
+    def __init__(self, backend):
+        self._backend, self._session = backend, None
+
+    def sign_in_with_password(self, credenciales):
+        res = self._backend.table("profiles").select("id, email").eq("email", credenciales["email"]).execute()
+        if not res.data:
+            raise Exception("Invalid login credentials")
+        self._session = SimpleNamespace(user=SimpleNamespace(**res.data[0]))
+        return self._session
+
+    def sign_up(self, datos):
+        perfil = {"id": str(uuid.uuid4()), "email": datos["email"], "role": "guest",
+                  "full_name": datos.get("options", {}).get("data", {}).get("full_name")}
+        self._backend.table("profiles").insert(perfil).execute()
+        return SimpleNamespace(user=SimpleNamespace(id=perfil["id"], email=perfil["email"]))
+
+    def get_session(self):
+        return self._session
+
+    def sign_out(self):
+        self._session = None
+
+    def reset_password_for_email(self, email):
+        return None
+
+    def verify_otp(self, datos):
+        return self._session
+
+    def update_user(self, datos):
+        return self._session
+
+# ==============================================================================
+# 4. DATOS SINTÉTICOS
+# ==============================================================================
+
+DEPARTAMENTOS = {
+    "Sales": ["Sales Executive", "Sales Representative", "Manager"],
+    "Research & Development": ["Research Scientist", "Laboratory Technician", "Manufacturing Director",
+                               "Healthcare Representative", "Research Director", "Manager"],
+    "Human Resources": ["Human Resources", "Manager"],
+}
+
+def seed_synthetic(backend: LocalBackend, n_empleados: int = 2000, encuestas_por_empleado: int = 3, seed: int = 42):
+    """Puebla las cinco tablas con datos reproducibles (misma semilla = mismos datos)."""
+    rng = np.random.default_rng(seed)
+    hoy = date.today()
+    deptos = rng.choice(list(DEPARTAMENTOS), n_empleados, p=[0.3, 0.65, 0.05])
+    ingreso_dias = rng.integers(30, 365 * 12, n_empleados)
+    sale = rng.random(n_empleados) < 0.16
+    permanencia = (ingreso_dias * rng.uniform(0.05, 0.95, n_empleados)).astype(int)
+
+    empleados = []
+    for i in range(n_empleados):
+        edad = int(rng.integers(18, 60))
+        ingreso = hoy - timedelta(days=int(ingreso_dias[i]))
+        anios = int(ingreso_dias[i] // 365)
+        empleados.append({
+            "EmployeeNumber": i + 1, "Age": edad, "Gender": str(rng.choice(["Male", "Female"])),
+            "MonthlyIncome": int(rng.integers(1000, 20000)), "Department": str(deptos[i]),
+            "JobRole": str(rng.choice(DEPARTAMENTOS[deptos[i]])),
+            "BusinessTravel": str(rng.choice(["Non-Travel", "Travel_Rarely", "Travel_Frequently"], p=[0.1, 0.7, 0.2])),
+            "EducationField": str(rng.choice(["Life Sciences", "Medical", "Marketing", "Technical Degree", "Other", "Human Resources"])),
+            "Education": int(rng.integers(1, 6)), "MaritalStatus": str(rng.choice(["Single", "Married", "Divorced"])),
+            "DistanceFromHome": int(rng.integers(1, 30)), "JobLevel": int(rng.integers(1, 6)),
+            "OverTime": str(rng.choice(["No", "Yes"], p=[0.7, 0.3])),
+            "TotalWorkingYears": anios + int(rng.integers(0, 10)), "YearsAtCompany": anios,
+            "YearsInCurrentRole": int(rng.integers(0, anios + 1)), "YearsSinceLastPromotion": int(rng.integers(0, min(anios, 15) + 1)),
+            "YearsWithCurrManager": int(rng.integers(0, anios + 1)), "TrainingTimesLastYear": int(rng.integers(0, 7)),
+            "NumCompaniesWorked": int(rng.integers(0, 10)), "PerformanceRating": int(rng.integers(3, 5)),
+            "PercentSalaryHike": int(rng.integers(11, 26)), "NumeroTardanzas": int(rng.poisson(2)),
+            "NumeroFaltas": int(rng.poisson(0.7)),
+            "Tipocontrato": str(rng.choice(["Indefinido", "Temporal", "Tiempo Completo"], p=[0.6, 0.3, 0.1])),
+            "FechaIngreso": ingreso.isoformat(),
+            "FechaSalida": (ingreso + timedelta(days=int(permanencia[i]))).isoformat() if sale[i] else None,
+        })
+
+    encuestas = []
+    for emp in empleados:
+        inicio = date.fromisoformat(emp["FechaIngreso"])
+        fin = date.fromisoformat(emp["FechaSalida"]) if emp["FechaSalida"] else hoy
+        for _ in range(encuestas_por_empleado):
+            fecha = inicio + timedelta(days=int(rng.integers(0, max((fin - inicio).days, 1))))
+            encuestas.append({"EmployeeNumber": emp["EmployeeNumber"], "Fecha": fecha.isoformat(),
+                              **{c: int(rng.integers(1, 6)) for c in COLUMNAS_ENCUESTA}})
+
+    backend.table("empleados").insert(empleados).execute()
+    backend.table("encuestas").insert(encuestas).execute()
+    backend.table("profiles").insert([
+        {"id": str(uuid.UUID(int=1)), "email": "admin@local.test", "full_name": "Admin Local", "role": "admin"},
+        {"id": str(uuid.UUID(int=2)), "email": "supervisor@local.test", "full_name": "Supervisor Local", "role": "supervisor"},
+    ]).execute()
+    backend.table("configuracion_encuesta").insert([
+        {"clave": "encuesta_habilitada_global", "valor": "false"},
+        {"clave": "departamento_habilitado", "valor": "NINGUNO"},
+    ]).execute()
+
+def get_local_client(path: str = os.path.join("data", "backend_local.sqlite"), n_empleados: int = 2000) -> LocalBackend:
+    backend = LocalBackend(path)
+    if backend.is_empty():
+        seed_synthetic(backend, n_empleados=n_empleados)
+    return backend
@@ -0,0 +1,66 @@
+"""
+Benchmark de las derivaciones de dashboard_rotacion.load_data (antigüedad y tramos).
+
+Uso:
+    python benchmarks/bench_load_data.py [--filas 100000] [--repeticiones 3]
+
+Compara la versión anterior (apply por fila) con derive_tenure y verifica que den lo mismo.
+"""
+import os
+import sys
+import time
+import argparse
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dashboard_rotacion import derive_tenure, BINS_TRAMOS, LABELS_TRAMOS
+
+def synthetic_frame(filas: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    ingreso = pd.Timestamp("2010-01-01") + pd.to_timedelta(rng.integers(0, 5000, filas), unit="D")
+    salida = ingreso + pd.to_timedelta(rng.integers(1, 3000, filas), unit="D")
+    salida = salida.where(rng.random(filas) < 0.16)
+    return pd.DataFrame({"FechaIngreso": ingreso, "FechaSalida": salida})
+
+def derive_tenure_apply(df: pd.DataFrame, fecha_ref: date) -> pd.DataFrame:
+    """Implementación previa, conservada solo como referencia del benchmark."""
+    fecha_actual = pd.to_datetime(fecha_ref)
+    df['Attrition'] = df['FechaSalida'].apply(lambda x: 'No' if pd.isna(x) else 'Yes')
+    df['Estado de Empleado'] = df['Attrition'].map({'Yes': 'Renunció', 'No': 'Permanece'})
+    df['Fecha_Fin_Calc'] = df.apply(lambda r: fecha_actual if pd.isna(r['FechaSalida']) and r['Attrition'] == 'No' else r['FechaSalida'], axis=1)
+    df['AntiguedadMeses'] = (df['Fecha_Fin_Calc'] - df['FechaIngreso']).dt.days / 30
+    df['Tramo de antigüedad'] = pd.cut(df['AntiguedadMeses'], bins=BINS_TRAMOS, labels=LABELS_TRAMOS)
+    return df
+
+def medir(fn, base: pd.DataFrame, fecha_ref: date, repeticiones: int):
+    tiempos, resultado = [], None
+    for _ in range(repeticiones):
+        df = base.copy()
+        inicio = time.perf_counter()
+        resultado = fn(df, fecha_ref)
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos), resultado
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--filas", type=int, default=100_000)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    fecha_ref = date(2025, 6, 30)
+    base = synthetic_frame(args.filas)
+    t_apply, antes = medir(derive_tenure_apply, base, fecha_ref, args.repeticiones)
+    t_vector, despues = medir(derive_tenure, base, fecha_ref, args.repeticiones)
+
+    for col in ['Attrition', 'Estado de Empleado', 'Tramo de antigüedad']:
+        assert antes[col].astype(str).equals(despues[col].astype(str)), col
+    np.testing.assert_allclose(antes['AntiguedadMeses'], despues['AntiguedadMeses'])
+
+    print(f"filas={args.filas}  apply={t_apply:.3f}s  vectorizado={t_vector:.4f}s  aceleración={t_apply / t_vector:.0f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+import time
+import logging
+import threading
+import functools
+from collections import OrderedDict, defaultdict
+
+# ==============================================================================
+# 1. CACHÉ COMPARTIDA: SINGLE-FLIGHT + STALE-WHILE-REVALIDATE
+# ==============================================================================
+# Caché de proceso para datasets compartidos por todas las sesiones:
+#  - Si no hay valor, una sola sesión lo calcula por clave; las demás esperan ese resultado.
+#  - Si el valor venció, se sigue sirviendo el anterior y un hilo lo recalcula en segundo plano.
+# Así el vencimiento del TTL nunca pone una descarga completa en la petición de un usuario.
+# El valor devuelto es compartido entre sesiones: los llamadores no deben mutarlo.
+# 'max_entries' acota las claves guardadas (se descarta la usada hace más tiempo).
+
+logger = logging.getLogger("cache_compartido")
+
+class _Entrada:
+    __slots__ = ("valor", "creado", "refrescando")
+
+    def __init__(self, valor, creado):
+        self.valor, self.creado, self.refrescando = valor, creado, False
+
+def swr_cache(ttl: float, max_entries: int = None):
+    def decorador(loader):
+        entradas = OrderedDict()
+        locks = defaultdict(threading.Lock)
+        estado = {"generacion": 0}
+        guardia = threading.Lock()
+
+        def _clave(args, kwargs):
+            return args, tuple(sorted(kwargs.items()))
+
+        def _guardar(clave, entrada):
+            """Llamar con 'guardia' tomada."""
+            entradas[clave] = entrada
+            entradas.move_to_end(clave)
+            while max_entries is not None and len(entradas) > max_entries:
+                vieja, _ = entradas.popitem(last=False)
+                locks.pop(vieja, None)
+                logger.info("loader=%s descartada clave=%r (max_entries=%d)", loader.__name__, vieja, max_entries)
+
+        def _revalidar(clave, generacion, args, kwargs):
+            try:
+                valor = loader(*args, **kwargs)
+                with guardia:
+                    # Un clear() durante el refresco descarta el resultado ya obsoleto
+                    if estado["generacion"] == generacion and clave in entradas:
+                        _guardar(clave, _Entrada(valor, time.time()))
+            except Exception:
+                logger.exception("loader=%s revalidación fallida; se mantiene el valor anterior", loader.__name__)
+            finally:
+                with guardia:
+                    entrada = entradas.get(clave)
+                    if entrada is not None and entrada.refrescando:
+                        entrada.refrescando = False
+
+        @functools.wraps(loader)
+        def wrapper(*args, **kwargs):
+            clave = _clave(args, kwargs)
+            entrada = entradas.get(clave)
+            if entrada is None:
+                # Single-flight: la primera sesión descarga, el resto espera en el mismo lock
+                with guardia:
+                    lock = locks[clave]
+                with lock:
+                    entrada = entradas.get(clave)
+                    if entrada is None:
+                        generacion = estado["generacion"]
+                        valor = loader(*args, **kwargs)
+                        with guardia:
+                            entrada = _Entrada(valor, time.time())
+                            if estado["generacion"] == generacion:
+                                _guardar(clave, entrada)
+                return entrada.valor
+
+            with guardia:
+                if clave in entradas:
+                    entradas.move_to_end(clave)
+
+            if time.time() - entrada.creado > ttl:
+                with guardia:
+                    lanzar = not entrada.refrescando
+                    entrada.refrescando = True
+                if lanzar:
+                    threading.Thread(target=_revalidar, args=(clave, estado["generacion"], args, kwargs),
+                                     name=f"swr-{loader.__name__}", daemon=True).start()
+            return entrada.valor
+
+        def clear():
+            with guardia:
+                estado["generacion"] += 1
+                entradas.clear()
+                locks.clear()
+
+        wrapper.clear = clear
+        return wrapper
+    return decorador
@@ -0,0 +1,70 @@
+import logging
+from collections import defaultdict
+
+import snapshot_local
+
+# ==============================================================================
+# 1. REGISTRO DE DEPENDENCIAS ENTRE CACHÉS Y TABLAS
+# ==============================================================================
+# Cada loader cacheado declara las tablas que lee. Una escritura en una tabla
+# invalida solo los loaders que dependen de ella (o de sus tablas derivadas),
+# en lugar de vaciar toda la caché de la app con st.cache_data.clear().
+
+logger = logging.getLogger("cache_dependencias")
+
+# Tablas/vistas que se calculan a partir de otra y comparten su clave primaria
+TABLAS_DERIVADAS = {
+    "empleados": ["consolidado"],
+}
+
+_loaders_por_tabla = defaultdict(list)
+
+def depends_on(*tablas: str):
+    """Decorador para loaders con .clear() (st.cache_data o similares): registra sus tablas."""
+    def decorador(loader):
+        for tabla in tablas:
+            _loaders_por_tabla[tabla].append(loader)
+        loader.tablas = tablas
+        return loader
+    return decorador
+
+def affected_tables(tabla: str) -> list:
+    afectadas, pendientes = [], [tabla]
+    while pendientes:
+        actual = pendientes.pop()
+        if actual not in afectadas:
+            afectadas.append(actual)
+            pendientes.extend(TABLAS_DERIVADAS.get(actual, []))
+    return afectadas
+
+def invalidate(tabla: str):
+    """Vacía solo las cachés que leen la tabla o alguna de sus derivadas."""
+    for afectada in affected_tables(tabla):
+        for loader in _loaders_por_tabla.get(afectada, []):
+            loader.clear()
+            logger.info("tabla=%s invalidado=%s", afectada, getattr(loader, "__name__", loader))
+
+# ==============================================================================
+# 2. ESCRITURAS PUNTUALES
+# ==============================================================================
+
+def notify_write(tabla: str, clave, fila: dict = None):
+    """
+    Registrar una escritura de una sola fila: la copia local se parchea (con la fila
+    escrita, o eliminándola si 'fila' es None), las derivadas releen solo esa clave
+    y después se invalidan únicamente las cachés afectadas.
+    """
+    try:
+        if tabla in snapshot_local.TABLAS_LOCALES:
+            if fila is None:
+                snapshot_local.patch_rows(tabla, borrar=[clave])
+            else:
+                snapshot_local.patch_rows(tabla, filas=[fila])
+        for derivada in affected_tables(tabla)[1:]:
+            if derivada in snapshot_local.TABLAS_LOCALES:
+                snapshot_local.refresh_rows(derivada, [clave])
+    except Exception as e:
+        # Ante cualquier duda, la próxima lectura recarga completo
+        logger.warning("tabla=%s parche fallido, se marca obsoleta: %s", tabla, e)
+        snapshot_local.mark_stale(*[t for t in affected_tables(tabla) if t in snapshot_local.TABLAS_LOCALES])
+    invalidate(tabla)
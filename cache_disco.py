@@ -0,0 +1,68 @@
+import os
+import glob
+import hashlib
+import logging
+import functools
+
+import pandas as pd
+
+from acceso_datos import _get_credential
+from snapshot_local import table_version
+
+# ==============================================================================
+# 1. CACHÉ PERSISTENTE EN DISCO (ARRANQUE EN CALIENTE, OPCIONAL)
+# ==============================================================================
+# Con WARM_START=1 los datasets derivados se guardan en disco con una clave de versión
+# (versión de las tablas locales de las que salen + versión de formato). Tras un
+# reinicio el primer usuario los lee del disco en vez de descargarlos y recalcularlos.
+
+logger = logging.getLogger("cache_disco")
+
+CACHE_DIR = os.path.join("data", "cache_arranque")
+
+# Subir al cambiar las derivaciones de algún loader persistido
+VERSION_FORMATO = 1
+
+def warm_start_enabled() -> bool:
+    return str(_get_credential("WARM_START") or "").lower() in ("1", "true", "si", "yes")
+
+def _hash(valor) -> str:
+    return hashlib.sha1(repr(valor).encode("utf-8")).hexdigest()[:16]
+
+def persistent(nombre: str, tablas=(), version_extra=None):
+    """
+    Decorador para el loader *interno* (debajo de st.cache_data / swr_cache): la memoria
+    sigue delante y el disco solo responde cuando la memoria está vacía (p. ej. tras un
+    redeploy). 'version_extra' es un callable opcional que también entra en la clave.
+    """
+    def decorador(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not warm_start_enabled():
+                return fn(*args, **kwargs)
+            version = lambda: (VERSION_FORMATO, [table_version(t) for t in tablas],
+                               version_extra() if version_extra else None)
+            prefijo = os.path.join(CACHE_DIR, f"{nombre}__{_hash((args, sorted(kwargs.items())))}")
+            ruta = f"{prefijo}__{_hash(version())}.pkl"
+            if os.path.exists(ruta):
+                try:
+                    return pd.read_pickle(ruta)
+                except Exception as e:
+                    logger.warning("cache=%s ilegible, se recalcula: %s", ruta, e)
+            valor = fn(*args, **kwargs)
+            # fn puede haber sincronizado (y reescrito) las tablas: se guarda con la versión de
+            # los datos que realmente leyó, que es la que verá el próximo arranque
+            ruta = f"{prefijo}__{_hash(version())}.pkl"
+            try:
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                pd.to_pickle(valor, ruta + ".tmp")
+                os.replace(ruta + ".tmp", ruta)
+                # Versiones anteriores del mismo loader y argumentos ya no sirven
+                for viejo in glob.glob(f"{prefijo}__*.pkl"):
+                    if viejo != ruta:
+                        os.remove(viejo)
+            except OSError as e:
+                logger.warning("cache=%s no se pudo guardar: %s", ruta, e)
+            return valor
+        return wrapper
+    return decorador
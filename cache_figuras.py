@@ -0,0 +1,76 @@
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+from cache_dependencias import depends_on
+
+# ==============================================================================
+# 1. CACHÉ DE FIGURAS POR ESTADO DE FILTROS
+# ==============================================================================
+# Guarda el JSON serializado de cada figura con clave (versión de datos, gráfico,
+# filtros). Un rerun con una combinación ya vista no recalcula ni la agregación ni la
+# figura: devuelve el dict listo para st.plotly_chart. Es de proceso (compartida entre
+# sesiones), con desalojo LRU y un tope de memoria en bytes de JSON.
+
+logger = logging.getLogger("cache_figuras")
+
+MAX_BYTES = 32 * 1024 * 1024
+TTL = 600  # igual que el cubo: datos remotos que cambien sin tocar la copia local
+
+class FigureCache:
+    def __init__(self, max_bytes: int = MAX_BYTES, ttl: float = TTL):
+        self.max_bytes, self.ttl = max_bytes, ttl
+        self._entradas = OrderedDict()  # clave -> (json, creado)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.aciertos = self.fallos = 0
+
+    def _quitar(self, clave):
+        js, _ = self._entradas.pop(clave)
+        self._bytes -= len(js)
+
+    def get(self, grafico: str, version, filtros: dict, construir):
+        """
+        'construir' es un callable sin argumentos que devuelve la figura (o None si no hay
+        nada que graficar); solo se llama cuando la combinación no está en caché.
+        """
+        clave = (grafico, version, tuple(sorted(filtros.items())))
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None and time.time() - entrada[1] <= self.ttl:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return json.loads(entrada[0]) if entrada[0] else None
+            if entrada is not None:
+                self._quitar(clave)
+            self.fallos += 1
+
+        figura = construir()
+        js = figura.to_json() if figura is not None else ""
+        if len(js) > self.max_bytes:
+            return figura
+        with self._lock:
+            if clave in self._entradas:
+                self._quitar(clave)
+            self._entradas[clave] = (js, time.time())
+            self._bytes += len(js)
+            while self._bytes > self.max_bytes:
+                viejo = next(iter(self._entradas))
+                self._quitar(viejo)
+                logger.debug("desalojada=%s", viejo)
+        return figura
+
+    def clear(self):
+        with self._lock:
+            self._entradas.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entradas": len(self._entradas), "bytes": self._bytes,
+                    "aciertos": self.aciertos, "fallos": self.fallos}
+
+# Una escritura en 'consolidado' (o 'empleados') vacía las figuras como al resto de cachés
+FIGURAS_DASHBOARD = depends_on("consolidado")(FigureCache())
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from agregados_kpi import load_aggregate, VISTAS, _cubo
+from cache_dependencias import depends_on
+
+# ==============================================================================
+# 1. CUBO PREAGREGADO DEL DASHBOARD DE ROTACIÓN
+# ==============================================================================
+# Se construye una vez por refresco de datos a partir de v_cubo_rotacion. Cada cambio
+# de filtro es una máscara booleana sobre las celdas y un np.bincount por gráfico:
+# el costo depende del número de celdas, no de la plantilla.
+
+DIMENSIONES = VISTAS["v_cubo_rotacion"]
+MEDIDAS = ["empleados", "suma_meses", "primer_anio"]
+
+class RotationCube:
+    def __init__(self, celdas: pd.DataFrame):
+        self.n_celdas = len(celdas)
+        self._codigos, self._valores, self._posicion, self._indices, self._no_nulos = {}, {}, {}, {}, {}
+        for dim in DIMENSIONES:
+            codigos, valores = pd.factorize(celdas[dim], use_na_sentinel=False)
+            self._codigos[dim], self._valores[dim] = codigos, valores
+            self._indices[dim] = pd.Index(valores, name=dim)
+            self._no_nulos[dim] = ~pd.isna(valores)
+            self._posicion[dim] = {v: i for i, v in enumerate(valores) if not pd.isna(v)}
+        self._medidas = {m: celdas[m].to_numpy(dtype="float64") for m in MEDIDAS}
+        self._salida = celdas["salida"].to_numpy(dtype=bool)
+
+    def values(self, dim: str) -> list:
+        """Valores presentes de una dimensión (sin nulos), para poblar los filtros."""
+        return [v for v in self._valores[dim] if not pd.isna(v)]
+
+    def mask(self, solo_salidas: bool = False, **filtros) -> np.ndarray:
+        """filtros: {dimensión: valor}; None en el valor significa 'todos'."""
+        mascara = self._salida.copy() if solo_salidas else np.ones(self.n_celdas, dtype=bool)
+        for dim, valor in filtros.items():
+            if valor is None:
+                continue
+            mascara &= self._codigos[dim] == self._posicion[dim].get(valor, -1)
+        return mascara
+
+    def total(self, medida: str = "empleados", mascara: np.ndarray = None) -> float:
+        pesos = self._medidas[medida]
+        return float(pesos.sum() if mascara is None else pesos[mascara].sum())
+
+    def by(self, dim: str, mascara: np.ndarray, medida: str = "empleados") -> pd.Series:
+        """Suma de 'medida' por valor de 'dim' en las celdas seleccionadas (sin valores en cero ni nulos)."""
+        indice = self._indices[dim]
+        suma = np.bincount(self._codigos[dim][mascara], weights=self._medidas[medida][mascara], minlength=len(indice))
+        conservar = (suma != 0) & self._no_nulos[dim]
+        suma = suma[conservar] if medida == "suma_meses" else suma[conservar].astype(np.int64)
+        return pd.Series(suma, index=indice[conservar])
+
+def cube_from_rows(df: pd.DataFrame) -> RotationCube:
+    """
+    Cubo de un subconjunto de filas del detalle de dashboard_rotacion.load_data (p. ej. el
+    resultado de un filtro por índices bitmap). Las dimensiones quedan con las etiquetas
+    traducidas del detalle.
+    """
+    salida = df['FechaSalida'].notna()
+    base = pd.DataFrame({
+        'Gender': df['Género'].astype(object),
+        'Tipocontrato': df['Tipo de Contrato'].astype(object),
+        'Department': df['Departamento'].astype(object),
+        'YearsSinceLastPromotion': df['Años sin promoción'],
+        'FechaSalida': df['FechaSalida'],
+        'salida': salida,
+        'antiguedad_meses': df['AntiguedadMeses'],
+    })
+    return RotationCube(_cubo(base))
+
+@depends_on("consolidado")
+@st.cache_resource(ttl=600)
+def load_cube() -> RotationCube:
+    # cache_resource: el cubo se comparte sin copiarse en cada rerun
+    return RotationCube(load_aggregate("v_cubo_rotacion"))
@@ -1,53 +1,63 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
-from supabase import create_client, Client
-from typing import Optional
 from datetime import date
+from acceso_datos import COLUMNAS_DASHBOARD
+from snapshot_local import read_table, table_version
+from cache_dependencias import depends_on
+from cache_compartido import swr_cache
+from agregados_kpi import LABELS_TRAMOS
+from cubo_rotacion import load_cube, cube_from_rows
+from indice_bitmap import BitmapIndex
+from plantilla_historica import load_headcount_engine
+from rollup_mensual import monthly_rollup
+from grafico_dispersion import income_age_figure, rendering_mode
+from tipos_compactos import compact_frame, translate_column, report_memory
+from cache_disco import persistent
+from cache_figuras import FIGURAS_DASHBOARD
+from supervivencia import load_survival, SEGMENTOS
 
 # ==============================================================================
 # 1. CONFIGURACIÓN Y CARGA DE DATOS
 # ==============================================================================
 
-FECHA_ACTUAL = pd.to_datetime(date.today())
+TRAD_GENERO = {'Male': 'Masculino', 'Female': 'Femenino'}
 
-@st.cache_resource
-def get_supabase() -> Optional[Client]:
-    url = st.secrets.get("SUPABASE_URL")
-    key = st.secrets.get("SUPABASE_KEY")
-    return create_client(url, key) if url and key else None
+TRAD_DEPARTAMENTOS = {
+    'Sales': 'Ventas',
+    'Research & Development': 'Investigación y Desarrollo',
+    'Human Resources': 'Recursos Humanos',
+    'Software': 'Software/Sistemas',
+    'Hardware': 'Hardware'
+}
 
-supabase = get_supabase()
-
-@st.cache_data(ttl=3600)
-def load_data():
-    response = supabase.table("consolidado").select("*").execute()
-    df = pd.DataFrame(response.data)
+@depends_on("consolidado")
+# Una clave por fecha de referencia: solo se conservan las dos últimas (hoy y ayer)
+@swr_cache(ttl=3600, max_entries=2)
+@persistent("dashboard_rotacion", tablas=("consolidado",))
+def load_data(fecha_ref: date):
+    """Detalle del dashboard; 'fecha_ref' fija el fin de la antigüedad de quienes siguen activos."""
+    crudo = read_table("consolidado", COLUMNAS_DASHBOARD)
+    df = compact_frame(crudo)
 
     # Procesamiento de Fechas
     df['FechaIngreso'] = pd.to_datetime(df['FechaIngreso'], errors='coerce')
     df['FechaSalida'] = pd.to_datetime(df['FechaSalida'], errors='coerce')
 
-    # --- TRADUCCIONES ---
+    # --- TRADUCCIONES (renombrando categorías, sin columnas de texto duplicadas) ---
     if 'Gender' in df.columns:
-        df['Género'] = df['Gender'].map({'Male': 'Masculino', 'Female': 'Femenino'}).fillna(df['Gender'])
+        translate_column(df, 'Gender', 'Género', TRAD_GENERO)
 
     # Traducción de Departamentos
     if 'Department' in df.columns:
-        dict_dept = {
-            'Sales': 'Ventas',
-            'Research & Development': 'Investigación y Desarrollo',
-            'Human Resources': 'Recursos Humanos',
-            'Software': 'Software/Sistemas',
-            'Hardware': 'Hardware'
-        }
-        df['Departamento'] = df['Department'].replace(dict_dept)
+        translate_column(df, 'Department', 'Departamento', TRAD_DEPARTAMENTOS)
 
     # --- TIPO DE CONTRATO ---
     if 'Tipocontrato' in df.columns:
-        df['Tipo de Contrato'] = df['Tipocontrato'].fillna('No especificado')
+        translate_column(df, 'Tipocontrato', 'Tipo de Contrato', {}, relleno='No especificado')
     else:
-        df['Tipo de Contrato'] = 'No definido'
+        df['Tipo de Contrato'] = pd.Categorical(['No definido'] * len(df))
 
     # Renombrar columnas para consistencia (Manteniendo nombres originales internamente)
     df = df.rename(columns={
@@ -57,22 +67,51 @@ def load_data():
         'JobRole': 'Puesto'
     })
 
-    # Lógica de Attrition
-    if 'Attrition' not in df.columns:
-        df['Attrition'] = df['FechaSalida'].apply(lambda x: 'No' if pd.isna(x) else 'Yes')
-    
+    df = derive_tenure(df, fecha_ref)
+    return report_memory("dashboard_rotacion", crudo, df.dropna(subset=['FechaIngreso']))
+
+BINS_TRAMOS = [0, 6, 12, 24, 60, 1000]
+
+def derive_tenure(df: pd.DataFrame, fecha_ref: date) -> pd.DataFrame:
+    """Attrition, fecha de fin, antigüedad y tramo como operaciones por columna (sin apply por fila)."""
+    salida = df['FechaSalida'].to_numpy(dtype='datetime64[ns]')
+    ingreso = df['FechaIngreso'].to_numpy(dtype='datetime64[ns]')
+    sin_salida = np.isnat(salida)
+
+    if 'Attrition' in df.columns:
+        activo = (df['Attrition'] == 'No').to_numpy()
+    else:
+        activo = sin_salida
+        df['Attrition'] = pd.Categorical(np.where(sin_salida, 'No', 'Yes'), categories=['No', 'Yes'])
+    df['Attrition'] = df['Attrition'].astype('category')
     df['Estado de Empleado'] = df['Attrition'].map({'Yes': 'Renunció', 'No': 'Permanece'})
-    
-    # Cálculo de antigüedad
-    df['Fecha_Fin_Calc'] = df.apply(lambda r: FECHA_ACTUAL if pd.isna(r['FechaSalida']) and r['Attrition'] == 'No' else r['FechaSalida'], axis=1)
-    df['AntiguedadMeses'] = (df['Fecha_Fin_Calc'] - df['FechaIngreso']).dt.days / 30
 
-    # Tramos de antigüedad
-    bins = [0, 6, 12, 24, 60, 1000]
-    labels_tramos = ['0–6 meses', '6–12 meses', '1–2 años', '2–5 años', 'Más de 5 años']
-    df['Tramo de antigüedad'] = pd.cut(df['AntiguedadMeses'], bins=bins, labels=labels_tramos)
+    # Activos sin fecha de salida: la antigüedad corre hasta la fecha de referencia
+    fin = np.where(sin_salida & activo, np.datetime64(pd.Timestamp(fecha_ref), 'ns'), salida)
+    dias = pd.TimedeltaIndex(fin - ingreso).days.to_numpy(dtype='float64')
+    df['Fecha_Fin_Calc'] = fin
+    df['AntiguedadDias'] = pd.array(dias, dtype='Int32')
+    df['AntiguedadMeses'] = dias / 30
+    df['Tramo de antigüedad'] = pd.cut(df['AntiguedadMeses'].to_numpy(), bins=BINS_TRAMOS, labels=LABELS_TRAMOS)
+    return df
+
+# Columnas del detalle con índice bitmap; las de FILTROS_DETALLE aparecen en "Más filtros"
+COLUMNAS_INDEXADAS = ['Género', 'Tipo de Contrato', 'Departamento', 'Puesto', 'Tramo de antigüedad']
+FILTROS_DETALLE = {'Departamento': 'Departamento', 'Puesto': 'Puesto', 'Tramo de antigüedad': 'Etapa laboral'}
 
-    return df.dropna(subset=['FechaIngreso'])
+@depends_on("consolidado")
+@st.cache_resource(ttl=600)
+def load_filter_index(fecha_ref: date):
+    """(detalle, índice) del mismo load_data: las posiciones de los bitmaps son las filas del detalle."""
+    detalle = load_data(fecha_ref).reset_index(drop=True)
+    return detalle, BitmapIndex(detalle, COLUMNAS_INDEXADAS, columna_fecha='FechaIngreso')
+
+@depends_on("consolidado")
+@st.cache_resource(ttl=600, max_entries=32)
+def load_filtered_cube(version: str, fecha_ref: date, bits: bytes):
+    """Cubo de las filas marcadas en 'bits' (bitmap empaquetado): un rerun con la misma selección no lo rehace."""
+    detalle, indice = load_filter_index(fecha_ref)
+    return cube_from_rows(detalle[indice.to_mask(np.frombuffer(bits, dtype=np.uint8))])
 
 # ==============================================================================
 # 2. INTERFAZ DEL DASHBOARD
@@ -82,46 +121,85 @@ def render_rotacion_dashboard():
     st.set_page_config(layout="wide") # Opcional: para aprovechar mejor el ancho total
     st.title("📊 Análisis Descriptivo de Rotación de Personal")
     
-    data = load_data()
-    if data.empty:
+    # KPIs y gráficos: celdas del cubo preagregado (sql/agregados_rotacion.sql -> v_cubo_rotacion)
+    cubo = load_cube()
+    if cubo.n_celdas == 0:
         st.error("No se encontraron datos.")
         return
 
     # --- FILTROS SUPERIORES ---
+    opciones_genero = {TRAD_GENERO.get(g, g): g for g in cubo.values('Gender')}
     c_f1, c_f2 = st.columns(2)
     with c_f1:
-        genero = st.selectbox("Filtrar por Género:", ['Todos'] + sorted(data['Género'].dropna().unique().tolist()))
+        genero = st.selectbox("Filtrar por Género:", ['Todos'] + sorted(opciones_genero))
     with c_f2:
-        contrato = st.selectbox("Filtrar por Tipo de Contrato:", ['Todos'] + sorted(data['Tipo de Contrato'].dropna().unique().tolist()))
+        contrato = st.selectbox("Filtrar por Tipo de Contrato:", ['Todos'] + sorted(cubo.values('Tipocontrato')))
+
+    # --- FILTROS ADICIONALES: índices bitmap sobre el detalle ---
+    detalle, indice = load_filter_index(date.today())
+    limites = indice.date_bounds()
+    with st.expander("🔎 Más filtros"):
+        columnas_ui = st.columns(len(FILTROS_DETALLE) + 1)
+        elegidos = {}
+        for col_ui, (columna, etiqueta) in zip(columnas_ui, FILTROS_DETALLE.items()):
+            with col_ui:
+                elegidos[columna] = st.multiselect(f"{etiqueta}:", indice.values(columna), key=f"filtro_{columna}")
+        rango = None
+        if limites is not None:
+            with columnas_ui[-1]:
+                rango = st.date_input("Fecha de ingreso:", value=limites, min_value=limites[0],
+                                      max_value=limites[1], key="filtro_ingreso")
+            # Mientras se elige el rango llega una sola fecha; el rango completo no filtra
+            rango = tuple(rango) if isinstance(rango, (tuple, list)) and len(rango) == 2 else None
+            rango = None if rango == tuple(limites) else rango
+    elegidos = {col: valores for col, valores in elegidos.items() if valores}
 
-    # Aplicar filtros
-    df_f = data.copy()
-    if genero != 'Todos': df_f = df_f[df_f['Género'] == genero]
-    if contrato != 'Todos': df_f = df_f[df_f['Tipo de Contrato'] == contrato]
+    # OR dentro de cada columna, AND entre columnas (y el rango de ingreso)
+    bits = indice.select({'Género': None if genero == 'Todos' else [genero],
+                          'Tipo de Contrato': None if contrato == 'Todos' else [contrato],
+                          **elegidos}, rango)
 
-    df_ren = df_f[df_f['Estado de Empleado'] == 'Renunció']
+    # Aplicar filtros: máscaras sobre las celdas, sin copiar ni recorrer filas
+    filtro = dict(Gender=None if genero == 'Todos' else opciones_genero[genero],
+                  Tipocontrato=None if contrato == 'Todos' else contrato)
+    clave_filtros = {**filtro, **{col: tuple(v) for col, v in elegidos.items()}, 'ingreso': rango}
+    if elegidos or rango is not None:
+        # Filtros fuera del cubo: cubo de las filas seleccionadas (ya filtradas por género y contrato)
+        cubo = load_filtered_cube(table_version("consolidado"), date.today(), bits.tobytes())
+        filtro = {}
+    sel = cubo.mask(**filtro)
+    sel_ren = cubo.mask(solo_salidas=True, **filtro)
+    total, salidas = int(cubo.total(mascara=sel)), int(cubo.total(mascara=sel_ren))
 
     # --- KPIs ---
     k1, k2, k3, k4 = st.columns(4)
-    k1.metric("👥 Total Empleados", len(df_f))
-    k2.metric("🚪 Renuncias", len(df_ren))
-    tasa = (len(df_ren) / len(df_f) * 100) if len(df_f) > 0 else 0
+    k1.metric("👥 Total Empleados", total)
+    k2.metric("🚪 Renuncias", salidas)
+    tasa = (salidas / total * 100) if total > 0 else 0
     k3.metric("📉 Tasa de Rotación", f"{tasa:.1f}%")
-    promedio = df_ren['AntiguedadMeses'].mean() if not df_ren.empty else 0
+    promedio = cubo.total('suma_meses', sel_ren) / salidas if salidas else 0
     k4.metric("⏱️ Promedio Salida", f"{promedio:.1f} meses")
 
     st.markdown("---")
 
+    # Figuras cacheadas por (versión de datos, gráfico, filtros): un rerun con una
+    # combinación ya vista no reagrega ni reconstruye la figura (cache_figuras.py)
+    version = table_version("consolidado")
+    def figura(grafico, construir, **extra):
+        return FIGURAS_DASHBOARD.get(grafico, version, {**clave_filtros, **extra}, construir)
+
     # --- 1. GRÁFICO DE DEPARTAMENTO (SOLO Y ANCHO) ---
     st.subheader("🏢 Fugas por Departamento")
-    if not df_ren.empty:
-        dept_data = df_ren['Departamento'].value_counts().reset_index()
-        dept_data.columns = ['Departamento', 'Salidas']
-        fig_dept = px.bar(dept_data, x='Salidas', y='Departamento', orientation='h',
+    dept = cubo.by('Department', sel_ren)
+    dept = dept.groupby(dept.index.map(lambda d: TRAD_DEPARTAMENTOS.get(d, d))).sum().sort_values(ascending=False)
+    if salidas:
+        def construir_dept():
+            dept_data = dept.rename_axis('Departamento').reset_index(name='Salidas')
+            return px.bar(dept_data, x='Salidas', y='Departamento', orientation='h',
                           title="Ranking de áreas con mayor volumen de bajas",
                           color='Salidas', color_continuous_scale='Reds',
                           labels={'Salidas': 'Número de Salidas', 'Departamento': 'Área'})
-        st.plotly_chart(fig_dept, use_container_width=True)
+        st.plotly_chart(figura("departamentos", construir_dept), use_container_width=True)
     else:
         st.warning("No hay datos de renuncias para los filtros seleccionados.")
 
@@ -130,71 +208,145 @@ def render_rotacion_dashboard():
 
     with col_etapa:
         st.subheader("⏳ Tasa por Etapa Laboral")
-        total_t = df_f['Tramo de antigüedad'].value_counts()
-        ren_t = df_ren['Tramo de antigüedad'].value_counts()
-        stats_t = (ren_t / total_t * 100).reset_index()
-        stats_t.columns = ['Tramo', 'Porcentaje']
-        stats_t['Porcentaje'] = stats_t['Porcentaje'].fillna(0)
-        
-        fig_bar = px.bar(stats_t, x='Tramo', y='Porcentaje', text='Porcentaje',
-                         title="Tasa de deserción por antigüedad",
-                         labels={'Porcentaje': 'Tasa (%)', 'Tramo': 'Antigüedad'},
-                         color='Porcentaje', color_continuous_scale='Reds')
-        fig_bar.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
-        st.plotly_chart(fig_bar, use_container_width=True)
+        def construir_tramos():
+            total_t = cubo.by('tramo', sel).reindex(LABELS_TRAMOS, fill_value=0)
+            ren_t = cubo.by('tramo', sel_ren).reindex(LABELS_TRAMOS, fill_value=0)
+            stats_t = (ren_t / total_t * 100).fillna(0).rename_axis('Tramo').reset_index(name='Porcentaje')
+
+            fig_bar = px.bar(stats_t, x='Tramo', y='Porcentaje', text='Porcentaje',
+                             title="Tasa de deserción por antigüedad",
+                             labels={'Porcentaje': 'Tasa (%)', 'Tramo': 'Antigüedad'},
+                             color='Porcentaje', color_continuous_scale='Reds')
+            fig_bar.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
+            return fig_bar
+        st.plotly_chart(figura("tramos", construir_tramos), use_container_width=True)
 
     with col_promo:
         st.subheader("🚧 Factor de Estancamiento")
-        promo_data = df_ren['Años sin promoción'].value_counts().reset_index()
-        promo_data.columns = ['Años', 'Salidas']
-        fig_promo = px.bar(promo_data.sort_values('Años'), x='Años', y='Salidas',
-                           title="Bajas vs Años desde último ascenso",
-                           labels={'Salidas': 'Renuncias', 'Años': 'Años sin promoción'},
-                           color='Salidas', color_continuous_scale='Oranges')
-        st.plotly_chart(fig_promo, use_container_width=True)
+        def construir_promo():
+            promo_data = cubo.by('anios_sin_promocion', sel_ren).reset_index()
+            promo_data.columns = ['Años', 'Salidas']
+            return px.bar(promo_data.sort_values('Años'), x='Años', y='Salidas',
+                          title="Bajas vs Años desde último ascenso",
+                          labels={'Salidas': 'Renuncias', 'Años': 'Años sin promoción'},
+                          color='Salidas', color_continuous_scale='Oranges')
+        st.plotly_chart(figura("estancamiento", construir_promo), use_container_width=True)
 
     # --- 3. RELACIÓN INGRESOS Y EDAD ---
+    # Único gráfico a nivel de fila: filas del detalle seleccionadas por el índice bitmap,
+    # solo si la figura no está ya en caché
     st.subheader("💰 Relación entre Ingresos, Edad y Rotación")
-    fig_scat = px.scatter(df_f, x='Edad', y='Ingreso Mensual', color='Estado de Empleado',
-                          labels={'Edad': 'Edad', 'Ingreso Mensual': 'Sueldo (USD)', 'Estado de Empleado': 'Situación'},
-                          color_discrete_map={'Renunció': '#E74C3C', 'Permanece': '#2ECC71'},
-                          hover_data=['Puesto', 'Departamento', 'Tipo de Contrato'])
-    st.plotly_chart(fig_scat, use_container_width=True)
+    def construir_dispersion():
+        df_f = detalle[indice.to_mask(bits)]
+        # Con poblaciones grandes pasa a WebGL y luego a densidad agregada (grafico_dispersion.py)
+        return income_age_figure(df_f)
+    if rendering_mode(total) != "svg":
+        st.caption(f"{total:,} empleados: vista simplificada para poblaciones grandes.")
+    st.plotly_chart(figura("dispersion", construir_dispersion, dia=date.today()), use_container_width=True)
 
     # --- 4. TENDENCIA TEMPORAL ---
     st.subheader("📆 Evolución histórica de bajas")
-    if not df_ren.empty:
-        ren_mes = df_ren.groupby(pd.Grouper(key='FechaSalida', freq='M')).size().reset_index(name='Total')
-        fig_line = px.line(ren_mes, x='FechaSalida', y='Total', markers=True,
+    if salidas:
+        def construir_tendencia():
+            ren_mes = (cubo.by('mes_salida', sel_ren).sort_index()
+                       .asfreq('MS', fill_value=0).rename_axis('FechaSalida').reset_index(name='Total'))
+            return px.line(ren_mes, x='FechaSalida', y='Total', markers=True,
                            title="Tendencia temporal de renuncias",
                            labels={'Total': 'Cantidad de Salidas', 'FechaSalida': 'Mes'})
-        st.plotly_chart(fig_line, use_container_width=True)
+        st.plotly_chart(figura("tendencia", construir_tendencia), use_container_width=True)
+
+    # --- 4.1 PLANTILLA Y ROTACIÓN A CUALQUIER FECHA ---
+    st.subheader("📈 Plantilla y rotación mensual")
+    motor = load_headcount_engine()
+    c_d, c_f = st.columns(2)
+    with c_d:
+        deptos = {TRAD_DEPARTAMENTOS.get(d, d): d for d in motor.values('Department')}
+        depto = st.selectbox("Departamento:", ['Todos'] + sorted(deptos), key="plantilla_depto")
+    with c_f:
+        fecha_corte = st.date_input("Plantilla al:", value=date.today(), key="plantilla_fecha")
+    filtro_motor = dict(departamento=None if depto == 'Todos' else deptos[depto],
+                        contrato=None if contrato == 'Todos' else contrato)
+
+    st.metric(f"👥 Plantilla al {fecha_corte:%d/%m/%Y}", motor.headcount(fecha_corte, **filtro_motor))
+    # Series mensuales: rollup mantenido al guardar empleados (rollup_mensual.py)
+    def construir_plantilla():
+        return px.line(monthly_rollup(**filtro_motor), x='Mes', y=['Plantilla final', 'Ingresos', 'Salidas'], markers=False,
+                       title="Plantilla al cierre de mes, ingresos y salidas",
+                       labels={'value': 'Empleados', 'variable': ''})
+    def construir_tasa():
+        return px.line(monthly_rollup(**filtro_motor), x='Mes', y='Tasa de rotación (%)',
+                       title="Tasa de rotación mensual (salidas / plantilla promedio)")
+    def construir_antiguedad():
+        return px.line(monthly_rollup(**filtro_motor), x='Mes',
+                       y=['Antigüedad promedio (meses)', 'Antigüedad al salir (meses)'],
+                       title="Antigüedad promedio de la plantilla y de quienes salen",
+                       labels={'value': 'Meses', 'variable': ''})
+    # La serie llega hasta el mes en curso: el día entra en la clave
+    st.plotly_chart(figura("plantilla", construir_plantilla, depto=depto, dia=date.today()), use_container_width=True)
+    c_tasa, c_antig = st.columns(2)
+    with c_tasa:
+        st.plotly_chart(figura("tasa_mensual", construir_tasa, depto=depto, dia=date.today()), use_container_width=True)
+    with c_antig:
+        st.plotly_chart(figura("antiguedad_mensual", construir_antiguedad, depto=depto, dia=date.today()),
+                        use_container_width=True)
 
     # --- 5. GRÁFICO SOLICITADO: DISTRIBUCIÓN POR MESES DE ANTIGÜEDAD (ANCHO COMPLETO) ---
     st.subheader("📊 Distribución de renuncias por meses de antigüedad")
-    if not df_ren.empty:
-        # Agrupamos por el valor entero de meses de antigüedad
-        df_ren['Meses_Enteros'] = df_ren['AntiguedadMeses'].fillna(0).astype(int)
-        dist_antiguedad = df_ren.groupby('Meses_Enteros').size().reset_index(name='count')
-        
-        fig_meses = px.bar(
-            dist_antiguedad, 
-            x='Meses_Enteros', 
-            y='count',
-            title="Detalle de bajas por mes exacto de permanencia",
-            labels={'Meses_Enteros': 'Antigüedad al renunciar (meses)', 'count': 'count'},
-            color_discrete_sequence=['#E74C3C'] 
-        )
-        
-        fig_meses.update_layout(bargap=0.1)
-        st.plotly_chart(fig_meses, use_container_width=True)
+    if salidas:
+        def construir_meses():
+            dist_antiguedad = cubo.by('meses_antiguedad', sel_ren).sort_index().reset_index()
+            dist_antiguedad.columns = ['Meses_Enteros', 'count']
+
+            fig_meses = px.bar(
+                dist_antiguedad,
+                x='Meses_Enteros',
+                y='count',
+                title="Detalle de bajas por mes exacto de permanencia",
+                labels={'Meses_Enteros': 'Antigüedad al renunciar (meses)', 'count': 'count'},
+                color_discrete_sequence=['#E74C3C']
+            )
+
+            fig_meses.update_layout(bargap=0.1)
+            return fig_meses
+        st.plotly_chart(figura("meses_antiguedad", construir_meses), use_container_width=True)
+
+    # --- 6. CURVAS DE PERMANENCIA (KAPLAN–MEIER Y COX) ---
+    # Ajustadas una vez por versión de 'consolidado' (supervivencia.py); no dependen de los filtros
+    st.subheader("🧬 Probabilidad de permanencia por segmento")
+    curvas, cox = load_survival()
+    if curvas.empty:
+        st.info("No hay suficientes datos para estimar curvas de permanencia.")
+    else:
+        segmento = st.radio("Segmentar por:", list(SEGMENTOS), horizontal=True, key="km_segmento")
+        def construir_km():
+            datos = curvas[curvas['Segmento'] == segmento].assign(
+                Grupo=lambda d: d['Grupo'].map(lambda g: TRAD_DEPARTAMENTOS.get(g, g)))
+            fig_km = px.line(datos, x='Meses', y='Supervivencia', color='Grupo', line_shape='hv',
+                             title="Kaplan–Meier: probabilidad de seguir en la empresa según antigüedad",
+                             labels={'Supervivencia': 'Probabilidad de permanencia', 'Meses': 'Meses de antigüedad'},
+                             hover_data={'IC inferior': ':.2f', 'IC superior': ':.2f'})
+            fig_km.update_yaxes(range=[0, 1.02], tickformat='.0%')
+            return fig_km
+        st.plotly_chart(FIGURAS_DASHBOARD.get("supervivencia", version, {'segmento': segmento}, construir_km),
+                        use_container_width=True)
+
+        with st.expander("📐 Modelo de Cox: riesgo relativo de salida"):
+            if cox.empty:
+                st.caption("El modelo de Cox no pudo ajustarse con los datos actuales.")
+            else:
+                columnas_cox = {c: s for s, c in SEGMENTOS.items()}
+                tabla = cox.assign(Variable=cox['Variable'].map(
+                    lambda v: f"{columnas_cox.get(v.split('_', 1)[0], v)}: {TRAD_DEPARTAMENTOS.get(v.split('_', 1)[-1], v.split('_', 1)[-1])}"))
+                st.dataframe(tabla.drop(columns='concordancia').round(3), hide_index=True, use_container_width=True)
+                st.caption(f"Hazard ratio > 1: mayor riesgo de salida que la categoría de referencia. "
+                           f"Concordancia del modelo: {cox['concordancia'].iloc[0]:.2f}.")
 
     # --- LECTURA EJECUTIVA ---
     st.markdown("---")
     st.subheader("🧠 Lectura ejecutiva")
     
-    pct_ano = (df_ren['AntiguedadMeses'] <= 12).mean() * 100 if not df_ren.empty else 0
-    area_critica = df_ren['Departamento'].value_counts().idxmax() if not df_ren.empty else "N/A"
+    pct_ano = cubo.total('primer_anio', sel_ren) / salidas * 100 if salidas else 0
+    area_critica = dept.index[0] if salidas else "N/A"
     
     st.info(
         f"🔍 **Retención Inicial:** El **{pct_ano:.0f}%** de las salidas se concentran en el primer año.\n\n"
@@ -1,10 +1,16 @@
 import streamlit as st
 import pandas as pd
-from supabase import create_client, Client
 from datetime import date
 import base64
 import time
 import re
+from acceso_datos import fetch_employees_page, fetch_empleado, insert_empleado, update_empleado, delete_empleado
+from asignacion_ids import next_employee_number, get_id_allocator
+from cache_dependencias import depends_on, notify_write
+from rollup_mensual import apply_employee_write
+from snapshot_local import read_table
+from importacion_empleados import TAMANO_LOTE, load_import_file, prepare_import, import_employees
+from validacion_datos import rows_with_errors
 
 # =================================================================
 # 1. CONFIGURACIÓN Y MAPEOS
@@ -22,30 +28,96 @@ MAPEO_ROLES = {
 MAPEO_VIAJES = {"Non-Travel": "Sin Viajes", "Travel_Rarely": "Viaja Poco", "Travel_Frequently": "Viaja Frecuentemente"}
 MAPEO_ESTADO_CIVIL = {"Single": "Soltero/a", "Married": "Casado/a", "Divorced": "Divorciado/a"}
 MAPEO_GENERO = {"Male": "Masculino", "Female": "Femenino"}
+TIPOS_CONTRATO = ["Indefinido", "Temporal", "Tiempo Completo"]
 
-@st.cache_resource
-def get_supabase() -> Client:
-    url = st.secrets.get("SUPABASE_URL")
-    key = st.secrets.get("SUPABASE_KEY")
-    return create_client(url, key)
-
-supabase = get_supabase()
+# Valores aceptados en la importación masiva: los mismos que ofrecen los selectbox del formulario
+MAPEOS_IMPORTACION = {
+    "Gender": MAPEO_GENERO, "Department": MAPEO_DEPTOS, "JobRole": MAPEO_ROLES,
+    "BusinessTravel": MAPEO_VIAJES, "EducationField": MAPEO_EDUCACION, "MaritalStatus": MAPEO_ESTADO_CIVIL,
+    "OverTime": {"No": "No", "Yes": "Sí"}, "Tipocontrato": {c: c for c in TIPOS_CONTRATO},
+}
 
-@st.cache_data(ttl=5)
-def fetch_employees_fast():
-    # Usamos .range para asegurar visibilidad de IDs altos
-    res = supabase.table("empleados").select("*").range(0, 5000).order("EmployeeNumber", desc=True).execute()
-    # Convertimos a minúsculas para el manejo interno del DataFrame
-    return [{k.lower(): v for k, v in r.items()} for r in res.data]
+# Grilla paginada: búsqueda, orden y filtro de activos se resuelven en el servidor
+TAMANO_PAGINA = 25
+ORDENES_GRILLA = {
+    "ID (más recientes primero)": ("EmployeeNumber", True),
+    "ID (ascendente)": ("EmployeeNumber", False),
+    "Sueldo (mayor a menor)": ("MonthlyIncome", True),
+    "Sueldo (menor a mayor)": ("MonthlyIncome", False),
+    "Edad (ascendente)": ("Age", False),
+}
 
-def get_next_employee_number():
-    try:
-        res = supabase.table("empleados").select("EmployeeNumber").order("EmployeeNumber", desc=True).limit(1).execute()
-        if res.data:
-            return int(res.data[0]['EmployeeNumber']) + 1
-        return 1
-    except:
-        return 1
+def search_terms(texto: str):
+    """Texto libre -> {columna: valores} para buscar en el servidor (None = sin búsqueda)."""
+    texto = (texto or "").strip().lower()
+    if not texto:
+        return None
+    coincidencias = {
+        "Department": [k for k, v in MAPEO_DEPTOS.items() if texto in k.lower() or texto in v.lower()],
+        "JobRole": [k for k, v in MAPEO_ROLES.items() if texto in k.lower() or texto in v.lower()],
+    }
+    if texto.isdigit():
+        coincidencias["EmployeeNumber"] = [int(texto)]
+    return coincidencias
+
+def render_bulk_import(deshabilitado: bool = False):
+    """Alta/edición masiva desde CSV o Excel: valida todo el archivo y escribe por lotes."""
+    with st.expander("📥 Importación masiva (CSV/Excel)"):
+        st.caption("Columnas con los nombres de la base (EmployeeNumber, Age, Department, JobRole, ...). "
+                   "Las categorías pueden venir en inglés o en español; sin EmployeeNumber se asigna uno nuevo "
+                   "y con un EmployeeNumber existente la ficha se actualiza (las celdas vacías conservan el valor guardado).")
+        archivo = st.file_uploader("Subir CSV o Excel", type=["csv", "xlsx"], key="import_archivo", disabled=deshabilitado)
+        if archivo is None:
+            return
+        try:
+            df_raw = load_import_file(archivo.getvalue(), archivo.name)
+        except Exception as e:
+            st.error(f"No se pudo leer el archivo: {e}")
+            return
+        validas, errores, faltantes, ignoradas = prepare_import(df_raw, MAPEOS_IMPORTACION)
+        filas_err = rows_with_errors(errores)
+
+        v1, v2, v3 = st.columns(3)
+        v1.metric("Filas cargadas", f"{len(df_raw):,}")
+        v2.metric("Filas válidas", f"{len(validas):,}")
+        v3.metric("Filas con errores", f"{len(filas_err):,}")
+        if faltantes:
+            st.error(f"Faltan columnas obligatorias: {', '.join(faltantes)}")
+        if ignoradas:
+            st.info(f"Columnas ignoradas: {', '.join(map(str, ignoradas))}")
+        if not filas_err.empty:
+            st.warning("Las filas con errores no se importarán.")
+            st.dataframe(filas_err.head(1000), use_container_width=True, hide_index=True)
+            st.download_button("⬇️ Descargar reporte de errores", errores.to_csv(index=False).encode("utf-8"),
+                               file_name="errores_importacion.csv", mime="text/csv")
+
+        tamano_lote = st.number_input("Filas por lote", 50, 5000, TAMANO_LOTE, step=50, key="import_lote")
+        if st.button(f"⬆️ Importar {len(validas):,} filas válidas", type="primary",
+                     disabled=deshabilitado or validas.empty or bool(faltantes)):
+            barra = st.progress(0.0, text="Importando...")
+            reporte = import_employees(validas, int(tamano_lote), progreso=lambda f: barra.progress(f, text="Importando..."))
+            r1, r2, r3, r4 = st.columns(4)
+            r1.metric("Escritas", f"{reporte['escritas']:,}", f"{reporte['nuevas']:,} nuevas", delta_color="off")
+            r2.metric("Actualizadas", f"{reporte['actualizadas']:,}")
+            r3.metric("Lotes", f"{reporte['lotes']:,}", f"-{reporte['lotes_fallidos']} fallidos" if reporte['lotes_fallidos'] else None)
+            r4.metric("Filas/segundo", f"{reporte['filas_por_segundo']:,.0f}", f"{reporte['segundos']:.2f} s", delta_color="off")
+            if reporte['errores'].empty:
+                st.success("¡Importación completa!")
+            else:
+                st.error("Algunas filas no se guardaron (lotes rechazados por la base o IDs ya reservados).")
+                st.dataframe(rows_with_errors(reporte['errores']).head(1000), use_container_width=True, hide_index=True)
+
+@depends_on("empleados")
+@st.cache_data(ttl=30)
+def fetch_employees_grid(cursor=None, orden="EmployeeNumber", desc=True, solo_activos=True, coincidencias=None):
+    return fetch_employees_page(cursor, TAMANO_PAGINA, orden, desc, solo_activos, coincidencias)
+
+@depends_on("empleados")
+@st.cache_data(ttl=600)
+def load_employee_ids():
+    # Una sola columna de la copia local: el buscador ofrece todos los IDs, no solo los de la página
+    ids = read_table("empleados", ["EmployeeNumber"])["EmployeeNumber"].astype(int).sort_values()
+    return ids.astype(str).tolist()
 
 def to_eng(mapeo, valor_esp):
     try:
@@ -64,24 +136,52 @@ def render_employee_management_page():
     if "show_add" not in st.session_state: st.session_state.show_add = False
 
     proceso_activo = st.session_state.edit_id is not None or st.session_state.show_add
-    raw_data = fetch_employees_fast()
-
-    # --- TABLA DE LISTADO (SOLO ACTIVOS) ---
-    if raw_data:
-        activos_df = [e for e in raw_data if not e.get('fechasalida')]
-        if activos_df:
-            df_view = pd.DataFrame(activos_df)
-            st.subheader("Colaboradores Activos")
-            cols_viz = {"employeenumber": "ID", "age": "Edad", "department": "Depto", "jobrole": "Puesto", "monthlyincome": "Sueldo"}
-            df_view['department'] = df_view['department'].replace(MAPEO_DEPTOS)
-            df_view['jobrole'] = df_view['jobrole'].replace(MAPEO_ROLES)
-            st.dataframe(df_view.rename(columns=cols_viz)[list(cols_viz.values())], use_container_width=True, hide_index=True)
+
+    # --- TABLA DE LISTADO (PAGINADA POR CLAVE EN EL SERVIDOR) ---
+    c_bus, c_ord, c_act = st.columns([2, 1, 1])
+    with c_bus:
+        texto = st.text_input("Buscar por ID, departamento o puesto:", key="grid_busqueda")
+    with c_ord:
+        orden_sel = st.selectbox("Ordenar por:", list(ORDENES_GRILLA), key="grid_orden")
+    with c_act:
+        solo_activos = st.checkbox("Solo activos", value=True, key="grid_activos")
+
+    # Cada página se pide desde la última fila de la anterior; cambiar búsqueda u orden vuelve a la primera
+    if st.session_state.get("grid_clave") != (texto, orden_sel, solo_activos):
+        st.session_state.grid_clave = (texto, orden_sel, solo_activos)
+        st.session_state.grid_cursores = [None]
+    orden, desc = ORDENES_GRILLA[orden_sel]
+    filas, hay_mas = fetch_employees_grid(st.session_state.grid_cursores[-1], orden, desc, solo_activos, search_terms(texto))
+
+    st.subheader("Colaboradores Activos" if solo_activos else "Colaboradores")
+    if filas:
+        cols_viz = {"EmployeeNumber": "ID", "Age": "Edad", "Department": "Depto", "JobRole": "Puesto", "MonthlyIncome": "Sueldo"}
+        df_view = pd.DataFrame(filas)
+        df_view['Department'] = df_view['Department'].replace(MAPEO_DEPTOS)
+        df_view['JobRole'] = df_view['JobRole'].replace(MAPEO_ROLES)
+        st.dataframe(df_view.rename(columns=cols_viz)[list(cols_viz.values())], use_container_width=True, hide_index=True)
+    else:
+        st.info("No hay colaboradores que coincidan con la búsqueda.")
+
+    c_prev, c_pag, c_next = st.columns([1, 2, 1])
+    with c_prev:
+        if st.button("◀ Anterior", use_container_width=True, disabled=len(st.session_state.grid_cursores) == 1):
+            st.session_state.grid_cursores.pop()
+            st.rerun()
+    with c_pag:
+        st.caption(f"Página {len(st.session_state.grid_cursores)}")
+    with c_next:
+        if st.button("Siguiente ▶", use_container_width=True, disabled=not hay_mas):
+            st.session_state.grid_cursores.append((filas[-1][orden], filas[-1]["EmployeeNumber"]))
+            st.rerun()
+
+    render_bulk_import(deshabilitado=proceso_activo)
 
     st.divider()
 
     # --- BUSCADOR ---
     st.subheader("🔍 Localizar Colaborador")
-    lista_ids = [str(e['employeenumber']) for e in raw_data]
+    lista_ids = load_employee_ids()
     id_sel = st.selectbox("Escriba o seleccione ID:", [None] + lista_ids, disabled=proceso_activo)
     
     c_b1, c_b2, c_b3 = st.columns(3)
@@ -91,20 +191,26 @@ def render_employee_management_page():
             st.rerun()
     with c_b2:
         if st.button("🗑️ Eliminar", use_container_width=True, disabled=proceso_activo or not id_sel):
-            supabase.table("empleados").delete().eq("EmployeeNumber", int(id_sel)).execute()
-            st.cache_data.clear()
+            delete_empleado(int(id_sel))
+            notify_write("empleados", int(id_sel))
+            apply_employee_write(int(id_sel))
             st.rerun()
     with c_b3:
         if st.button("➕ Nuevo Registro", use_container_width=True, disabled=proceso_activo, type="primary"):
             st.session_state.show_add = True
+            # El ID se reserva una vez al abrir el formulario, no en cada rerun
+            st.session_state.nuevo_id = next_employee_number()
             st.rerun()
 
     # --- FORMULARIO ---
     if proceso_activo:
         st.divider()
         es_edit = st.session_state.edit_id is not None
-        p = next((e for e in raw_data if e['employeenumber'] == st.session_state.edit_id), {}) if es_edit else {}
-        current_id = st.session_state.edit_id if es_edit else get_next_employee_number()
+        # Solo la ficha editada, con claves en minúsculas para el formulario
+        p = {k.lower(): v for k, v in fetch_empleado(st.session_state.edit_id).items()} if es_edit else {}
+        if not es_edit and st.session_state.get("nuevo_id") is None:
+            st.session_state.nuevo_id = next_employee_number()
+        current_id = st.session_state.edit_id if es_edit else st.session_state.nuevo_id
 
         st.subheader(f"📋 Ficha de Datos: ID {current_id}")
         
@@ -123,7 +229,7 @@ def render_employee_management_page():
             f1, f2, f3, f4 = st.columns(4)
             with f1:
                 income = st.number_input("Sueldo Mensual", 0, 100000, int(p.get('monthlyincome', 2000)))
-                contract = st.selectbox("Contrato", ["Indefinido", "Temporal", "Tiempo Completo"], index=0)
+                contract = st.selectbox("Contrato", TIPOS_CONTRATO, index=0)
             with f2:
                 dept = st.selectbox("Departamento", list(MAPEO_DEPTOS.values()), index=list(MAPEO_DEPTOS.values()).index(MAPEO_DEPTOS.get(p.get('department'), "Ventas")))
                 role = st.selectbox("Puesto", list(MAPEO_ROLES.values()), index=list(MAPEO_ROLES.values()).index(MAPEO_ROLES.get(p.get('jobrole'), "Ejecutivo de Ventas")))
@@ -206,13 +312,15 @@ def render_employee_management_page():
                 
                 try:
                     if es_edit:
-                        supabase.table("empleados").update(payload).eq("EmployeeNumber", current_id).execute()
+                        update_empleado(current_id, payload)
                     else:
-                        supabase.table("empleados").insert(payload).execute()
+                        insert_empleado(payload)
+                    notify_write("empleados", current_id, payload)
+                    apply_employee_write(current_id, payload)
                     
                     st.session_state.edit_id = None
                     st.session_state.show_add = False
-                    st.cache_data.clear()
+                    st.session_state.nuevo_id = None
                     st.success("¡Operación exitosa!")
                     time.sleep(1)
                     st.rerun()
@@ -220,8 +328,11 @@ def render_employee_management_page():
                     st.error(f"Error al guardar en Supabase: {e}")
 
         if st.button("❌ Cancelar"):
+            if st.session_state.get("nuevo_id") is not None:
+                get_id_allocator().release(st.session_state.nuevo_id)
             st.session_state.edit_id = None
             st.session_state.show_add = False
+            st.session_state.nuevo_id = None
             st.rerun()
 
 if __name__ == "__main__":
@@ -1,49 +1,31 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-from supabase import create_client, Client
-from typing import Optional
 import warnings
+from acceso_datos import COLUMNAS_ENCUESTAS
+from snapshot_local import read_table
+from cache_dependencias import depends_on
+from cache_compartido import swr_cache
+from tipos_compactos import compact_frame, report_memory
 
 warnings.filterwarnings("ignore")
 
 # =================================================================
-# 1. CONFIGURACIÓN Y CONEXIÓN A SUPABASE
+# 1. CARGA DE DATOS
 # =================================================================
 
-@st.cache_resource
-def get_supabase() -> Client:
-    url = st.secrets.get("SUPABASE_URL")
-    key = st.secrets.get("SUPABASE_KEY")
-    if not url or not key:
-        st.error("❌ Faltan credenciales de Supabase en secrets.toml")
-        st.stop()
-    return create_client(url, key)
-
-supabase = get_supabase()
-
-@st.cache_data(ttl=600)
+@depends_on("encuestas")
+@swr_cache(ttl=600)
 def get_survey_data() -> pd.DataFrame:
-    try:
-        response = (
-            supabase
-            .table("encuestas")
-            .select("*")
-            .order("EmployeeNumber")
-            .order("Fecha")
-            .execute()
-        )
-
-        if not response.data:
-            return pd.DataFrame()
-
-        df = pd.DataFrame(response.data)
-        df["Fecha"] = pd.to_datetime(df["Fecha"])
-        return df
+    # Los errores se propagan: así un refresco fallido en segundo plano conserva el valor
+    # anterior en lugar de guardar un DataFrame vacío, y la página muestra el error
+    crudo = read_table("encuestas", COLUMNAS_ENCUESTAS)
+    if crudo.empty:
+        return crudo
+    df = crudo.sort_values(["EmployeeNumber", "Fecha"], kind="stable").reset_index(drop=True)
 
-    except Exception as e:
-        st.error(f"❌ Error al consultar encuestas: {e}")
-        return pd.DataFrame()
+    df["Fecha"] = pd.to_datetime(df["Fecha"])
+    return report_memory("encuestas_historial", crudo, compact_frame(df))
 
 # =================================================================
 # 2. ANÁLISIS DE RIESGO
@@ -116,7 +98,11 @@ def create_radar_chart(data: pd.Series):
 def historial_encuestas_module():
     st.title("📜 Historial de Encuestas por Empleado")
 
-    df_maestro = get_survey_data()
+    try:
+        df_maestro = get_survey_data()
+    except Exception as e:
+        st.error(f"❌ Error al consultar encuestas: {e}")
+        return
 
     if df_maestro.empty:
         st.warning("No existen encuestas registradas en la base de datos.")
@@ -134,9 +120,7 @@ def historial_encuestas_module():
         "IntencionPermanencia": "Permanencia",
         "CargaLaboralPercibida": "Carga Laboral",
         "SatisfaccionSalarial": "Satis. Salarial",
-        "ConfianzaEmpresa": "Confianza",
-        "NumeroTardanzas": "Tardanzas",
-        "NumeroFaltas": "Faltas"
+        "ConfianzaEmpresa": "Confianza"
     }
 
     # Selector de empleado
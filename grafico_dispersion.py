@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+# ==============================================================================
+# 1. DISPERSIÓN INGRESO / EDAD SEGÚN TAMAÑO DE LA POBLACIÓN
+# ==============================================================================
+# Hasta UMBRAL_WEBGL filas: scatter SVG con todo el hover.
+# Hasta UMBRAL_DENSIDAD: scatter WebGL solo con las columnas graficadas (hover recortado).
+# Por encima: densidad 2D binned en el servidor, un heatmap por situación; el payload
+# queda acotado por BINS_DENSIDAD y no por el número de empleados.
+
+UMBRAL_WEBGL = 5_000
+UMBRAL_DENSIDAD = 50_000
+BINS_DENSIDAD = (40, 40)
+
+COLORES_ESTADO = {'Renunció': '#E74C3C', 'Permanece': '#2ECC71'}
+ESCALAS_ESTADO = {'Renunció': 'Reds', 'Permanece': 'Greens'}
+ETIQUETAS = {'Edad': 'Edad', 'Ingreso Mensual': 'Sueldo (USD)', 'Estado de Empleado': 'Situación'}
+HOVER_COMPLETO = ['Puesto', 'Departamento', 'Tipo de Contrato']
+
+def rendering_mode(filas: int) -> str:
+    if filas > UMBRAL_DENSIDAD:
+        return "densidad"
+    return "webgl" if filas > UMBRAL_WEBGL else "svg"
+
+def _densidad(df: pd.DataFrame, x: str, y: str) -> go.Figure:
+    validos = df[[x, y, 'Estado de Empleado']].dropna()
+    vx = validos[x].to_numpy(dtype='float64')
+    vy = validos[y].to_numpy(dtype='float64')
+    # Bordes comunes para que los dos paneles sean comparables celda a celda
+    bordes_x = np.histogram_bin_edges(vx, bins=BINS_DENSIDAD[0])
+    bordes_y = np.histogram_bin_edges(vy, bins=BINS_DENSIDAD[1])
+    centros_x = (bordes_x[:-1] + bordes_x[1:]) / 2
+    centros_y = (bordes_y[:-1] + bordes_y[1:]) / 2
+
+    estados = [e for e in COLORES_ESTADO if (validos['Estado de Empleado'] == e).any()]
+    fig = make_subplots(rows=1, cols=max(len(estados), 1), shared_yaxes=True, subplot_titles=estados)
+    for i, estado in enumerate(estados, start=1):
+        sel = (validos['Estado de Empleado'] == estado).to_numpy()
+        conteo, _, _ = np.histogram2d(vx[sel], vy[sel], bins=[bordes_x, bordes_y])
+        fig.add_trace(go.Heatmap(
+            x=centros_x, y=centros_y, z=np.where(conteo.T > 0, conteo.T, np.nan),
+            colorscale=ESCALAS_ESTADO[estado], showscale=False, name=estado,
+            hovertemplate=f"{estado}<br>{ETIQUETAS[x]}: %{{x:.0f}}<br>{ETIQUETAS[y]}: %{{y:,.0f}}<br>Empleados: %{{z:.0f}}<extra></extra>",
+        ), row=1, col=i)
+        fig.update_xaxes(title_text=ETIQUETAS[x], row=1, col=i)
+    fig.update_yaxes(title_text=ETIQUETAS[y], row=1, col=1)
+    fig.update_layout(title=f"Densidad de empleados ({len(validos):,} filas agrupadas en celdas)")
+    return fig
+
+def income_age_figure(df: pd.DataFrame, x: str = 'Edad', y: str = 'Ingreso Mensual') -> go.Figure:
+    modo = rendering_mode(len(df))
+    if modo == "densidad":
+        return _densidad(df, x, y)
+    if modo == "webgl":
+        # Solo viajan al navegador las tres columnas del gráfico
+        return px.scatter(df[[x, y, 'Estado de Empleado']], x=x, y=y, color='Estado de Empleado',
+                          labels=ETIQUETAS, color_discrete_map=COLORES_ESTADO, render_mode='webgl')
+    return px.scatter(df, x=x, y=y, color='Estado de Empleado', labels=ETIQUETAS,
+                      color_discrete_map=COLORES_ESTADO, hover_data=HOVER_COMPLETO)
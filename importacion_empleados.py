@@ -0,0 +1,224 @@
+import io
+import time
+import logging
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from acceso_datos import COLUMNAS_EMPLEADOS, upsert_empleados
+from asignacion_ids import get_id_allocator
+from cache_dependencias import affected_tables, invalidate
+from snapshot_local import read_table, sync_table, mark_stale
+from validacion_datos import normalize_key, build_category_lookup, validate_frame
+
+# ==============================================================================
+# 1. IMPORTACIÓN MASIVA DE EMPLEADOS (CSV / EXCEL)
+# ==============================================================================
+# El archivo se valida en una sola pasada vectorizada con las mismas reglas que el
+# formulario de employees_crud (límites de los number_input y valores de los selectbox).
+# Las filas válidas se escriben con upsert por EmployeeNumber en lotes: una petición por
+# lote en lugar de una por empleado. Un lote rechazado se reporta y no detiene al resto.
+
+logger = logging.getLogger("importacion_empleados")
+
+TAMANO_LOTE = 500
+
+# Mismos límites que los number_input del formulario
+RANGOS_IMPORTACION = {
+    "EmployeeNumber": (1, None), "Age": (18, 100), "MonthlyIncome": (0, 100000),
+    "JobLevel": (1, 5), "Education": (1, 5), "DistanceFromHome": (0, 200),
+    "TotalWorkingYears": (0, 50), "YearsAtCompany": (0, 50), "YearsInCurrentRole": (0, 50),
+    "YearsSinceLastPromotion": (0, 50), "YearsWithCurrManager": (0, 50),
+    "TrainingTimesLastYear": (0, 20), "NumCompaniesWorked": (0, 15), "PerformanceRating": (1, 4),
+    "NumeroTardanzas": (0, 1000), "NumeroFaltas": (0, 1000),
+}
+
+# Sin estas columnas el archivo no se importa; el resto es opcional y puede venir vacío
+# (al actualizar un empleado existente, una celda vacía deja el valor guardado)
+REQUERIDAS_IMPORTACION = [
+    "Age", "Gender", "MonthlyIncome", "Department", "JobRole", "BusinessTravel", "Tipocontrato", "FechaIngreso"
+]
+
+COLUMNAS_FECHA = ["FechaIngreso", "FechaSalida"]
+
+@st.cache_data(max_entries=2)
+def load_import_file(contenido: bytes, nombre: str) -> pd.DataFrame:
+    """Lee el archivo subido una vez (los reruns de la página no lo vuelven a parsear)."""
+    if nombre.lower().endswith(".xlsx"):
+        return pd.read_excel(io.BytesIO(contenido))
+    return pd.read_csv(io.BytesIO(contenido), sep=None, engine="python", encoding="utf-8-sig")
+
+def _canonical_columns(df: pd.DataFrame):
+    """Renombra encabezados a COLUMNAS_EMPLEADOS ('employee number', 'EMPLOYEE_NUMBER'...)."""
+    clave = lambda c: normalize_key(c).replace("_", "")
+    canonicas = {clave(c): c for c in COLUMNAS_EMPLEADOS}
+    renombres = {c: canonicas[clave(c)] for c in df.columns if clave(c) in canonicas}
+    ignoradas = [c for c in df.columns if c not in renombres]
+    return df[list(renombres)].rename(columns=renombres), ignoradas
+
+def _category_lookups(mapeos: dict) -> dict:
+    """Acepta el valor de la base (inglés) o la etiqueta del formulario (español)."""
+    categorias = {}
+    for col, mapeo in mapeos.items():
+        lookup = build_category_lookup(mapeo.keys())
+        lookup.update({normalize_key(esp): eng for eng, esp in mapeo.items() if normalize_key(esp) not in lookup})
+        categorias[col] = lookup
+    return categorias
+
+def _errores(mascara, df: pd.DataFrame, col: str, motivo: str) -> pd.DataFrame:
+    idx = np.flatnonzero(mascara)
+    return pd.DataFrame({'fila': df.index.to_numpy()[idx], 'columna': col,
+                         'valor': df[col].to_numpy(dtype=object)[idx], 'error': motivo})
+
+def _parse_dates(serie: pd.Series) -> pd.Series:
+    """ISO (como el formulario) o celdas de fecha de Excel; si no, dd/mm/aaaa."""
+    fechas = pd.to_datetime(serie, errors='coerce', format='ISO8601')
+    resto = fechas.isna() & serie.notna()
+    if resto.any():
+        fechas[resto] = pd.to_datetime(serie[resto].astype(str), errors='coerce', format='%d/%m/%Y')
+    return fechas
+
+def prepare_import(df_raw: pd.DataFrame, mapeos: dict):
+    """
+    Valida el archivo completo sin recorrer filas.
+
+    mapeos: {columna: {valor en la base: etiqueta del formulario}} (los MAPEO_* de employees_crud).
+    Devuelve (validas, errores, faltantes, ignoradas): 'validas' ya tiene valores canónicos
+    y tipos listos para la base; 'errores' una fila por (fila del archivo, columna) inválida.
+    """
+    df, ignoradas = _canonical_columns(df_raw)
+    # Numeración de filas como en la planilla (encabezado = fila 1)
+    df.index = pd.RangeIndex(2, len(df) + 2)
+    rangos = {c: r for c, r in RANGOS_IMPORTACION.items() if c in df.columns}
+    categorias = {c: l for c, l in _category_lookups(mapeos).items() if c in df.columns}
+    requeridas = [c for c in REQUERIDAS_IMPORTACION if c not in COLUMNAS_FECHA]
+    opcionales = [c for c in df.columns if c not in requeridas and c not in COLUMNAS_FECHA]
+
+    faltantes = [c for c in REQUERIDAS_IMPORTACION if c not in df.columns]
+    df_req, err_req, _ = validate_frame(
+        df[[c for c in requeridas if c in df.columns]], rangos={c: r for c, r in rangos.items() if c in requeridas},
+        categorias={c: l for c, l in categorias.items() if c in requeridas})
+    df_opc, err_opc, _ = validate_frame(
+        df[opcionales], rangos={c: r for c, r in rangos.items() if c in opcionales},
+        categorias={c: l for c, l in categorias.items() if c in opcionales}, permitir_nulos=True)
+    errores = [err_req, err_opc]
+
+    # Los number_input del formulario solo admiten enteros
+    validado = pd.concat([df_req, df_opc], axis=1)
+    for col in rangos:
+        with np.errstate(invalid='ignore'):
+            errores.append(_errores((validado[col].to_numpy(dtype='float64') % 1 > 0), df, col, "no entero"))
+
+    fechas = {}
+    for col in COLUMNAS_FECHA:
+        if col not in df.columns:
+            continue
+        fechas[col] = _parse_dates(df[col])
+        nulos = df[col].isna().to_numpy()
+        errores.append(_errores(~nulos & fechas[col].isna().to_numpy(), df, col, "fecha inválida"))
+        if col == "FechaIngreso":
+            errores.append(_errores(nulos, df, col, "vacío"))
+    if len(fechas) == 2:
+        errores.append(_errores((fechas["FechaSalida"] < fechas["FechaIngreso"]).to_numpy(), df,
+                                "FechaSalida", "anterior a FechaIngreso"))
+
+    if "EmployeeNumber" in df.columns:
+        repetidos = validado["EmployeeNumber"].notna() & validado["EmployeeNumber"].duplicated(keep=False)
+        errores.append(_errores(repetidos.to_numpy(), df, "EmployeeNumber", "repetido en el archivo"))
+
+    errores = (pd.concat([e for e in errores if not e.empty], ignore_index=True)
+               .sort_values(['fila', 'columna'], kind='stable').reset_index(drop=True)
+               if any(not e.empty for e in errores) else err_req.iloc[0:0])
+
+    validas = (validado.loc[~validado.index.isin(errores['fila'])] if not faltantes else validado.iloc[0:0]).copy()
+    for col in rangos:
+        validas[col] = validas[col].astype('Int64')
+    for col, serie in fechas.items():
+        validas[col] = serie.loc[validas.index].dt.strftime('%Y-%m-%d')
+    return validas[[c for c in COLUMNAS_EMPLEADOS if c in validas.columns]], errores, faltantes, ignoradas
+
+# ==============================================================================
+# 2. ESCRITURA POR LOTES
+# ==============================================================================
+
+def import_employees(validas: pd.DataFrame, tamano_lote: int = TAMANO_LOTE, progreso=None) -> dict:
+    """
+    Upsert de las filas validadas en lotes de hasta 'tamano_lote'. Las filas sin EmployeeNumber
+    reciben IDs reservados en bloque (asignacion_ids); en las existentes, las celdas vacías
+    conservan el valor guardado. 'progreso(fraccion)' es opcional.
+    Devuelve métricas de rendimiento y los errores de los lotes rechazados (y de los IDs nuevos
+    del archivo que caen en un bloque ya reservado, que no se escriben).
+    """
+    df = validas.copy()
+    if "EmployeeNumber" not in df.columns:
+        df["EmployeeNumber"] = pd.Series(pd.NA, index=df.index, dtype='Int64')
+    sin_id = df["EmployeeNumber"].isna().to_numpy()
+    if sin_id.any():
+        df.loc[sin_id, "EmployeeNumber"] = get_id_allocator().take(int(sin_id.sum()))
+
+    existentes = read_table("empleados", ["EmployeeNumber"])["EmployeeNumber"]
+    es_nueva = pd.Series(~df["EmployeeNumber"].isin(existentes).to_numpy(), index=df.index)
+    total, errores = len(df), []
+
+    # Un ID nuevo escrito en el archivo no puede caer en un bloque que otro proceso ya reservó
+    manuales = df.loc[~sin_id & es_nueva.to_numpy(), "EmployeeNumber"].astype(int)
+    if not manuales.empty:
+        try:
+            aceptados = get_id_allocator().claim(manuales)
+        except Exception as e:
+            # Sin la función de reserva en el servidor tampoco hay bloques reservados
+            logger.warning("reserva de IDs no disponible, IDs del archivo sin verificar: %s", e)
+            aceptados = set(manuales)
+        rechazadas = manuales.index[~manuales.isin(aceptados)]
+        if len(rechazadas):
+            errores.append(pd.DataFrame({'fila': rechazadas, 'columna': 'EmployeeNumber',
+                                         'valor': manuales[rechazadas].to_numpy(dtype=object),
+                                         'error': 'ID dentro de un bloque ya reservado para altas'}))
+            df = df.drop(index=rechazadas)
+
+    # Una celda vacía no debe pisar con NULL el valor guardado de un empleado existente: cada
+    # fila envía solo sus columnas con dato. El upsert masivo exige las mismas claves en todo
+    # el lote, así que los lotes se arman dentro de cada grupo de filas con las mismas columnas.
+    con_dato = df.notna().to_numpy()
+    patron = con_dato @ (1 << np.arange(con_dato.shape[1], dtype=np.int64))
+    paso = max(1, int(tamano_lote))
+    lotes = []
+    for _, grupo in df.groupby(patron, sort=False):
+        grupo = grupo.loc[:, grupo.notna().iloc[0].to_numpy()]
+        for desde in range(0, len(grupo), paso):
+            lotes.append(grupo.iloc[desde:desde + paso])
+
+    inicio = time.perf_counter()
+    escritas, nuevas, fallidos = 0, 0, 0
+    for n, lote in enumerate(lotes, start=1):
+        try:
+            upsert_empleados(lote.astype(object).to_dict("records"))
+            escritas += len(lote)
+            nuevas += int(es_nueva[lote.index].sum())
+        except Exception as e:
+            fallidos += 1
+            logger.warning("lote %d/%d rechazado (%d filas): %s", n, len(lotes), len(lote), e)
+            errores.append(pd.DataFrame({'fila': lote.index, 'columna': 'lote', 'valor': n, 'error': str(e)[:300]}))
+        if progreso is not None:
+            progreso(n / len(lotes))
+    segundos = time.perf_counter() - inicio
+
+    if escritas:
+        # Demasiadas filas para parchear una a una: se recargan las copias locales (cambia su
+        # versión, así el rollup y las curvas se rehacen) y se invalidan las cachés afectadas
+        try:
+            for tabla in affected_tables("empleados"):
+                sync_table(tabla, forzar_completo=True)
+        except Exception as e:
+            logger.warning("recarga tras importación fallida, se marcan obsoletas: %s", e)
+            mark_stale("empleados", "consolidado")
+        invalidate("empleados")
+    logger.info("importación filas=%d escritas=%d lotes=%d fallidos=%d s=%.2f",
+                total, escritas, len(lotes), fallidos, segundos)
+    return {
+        "filas": total, "escritas": escritas, "nuevas": nuevas, "actualizadas": escritas - nuevas,
+        "ids_asignados": int(sin_id.sum()), "lotes": len(lotes), "lotes_fallidos": fallidos,
+        "segundos": segundos, "filas_por_segundo": escritas / segundos if segundos > 0 else float(escritas),
+        "errores": pd.concat(errores, ignore_index=True) if errores else pd.DataFrame(columns=['fila', 'columna', 'valor', 'error']),
+    }
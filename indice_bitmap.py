@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+# ==============================================================================
+# 1. ÍNDICES BITMAP PARA FILTRAR EL DETALLE
+# ==============================================================================
+# Al cargar los datos se arma, por cada columna categórica, un bitmap empaquetado
+# (np.packbits: 1 bit por fila) para cada valor. Un filtro es un OR de los valores
+# elegidos dentro de una columna y un AND entre columnas; el rango de fechas sale de
+# un searchsorted sobre las fechas ordenadas. Ninguna combinación recorre el DataFrame.
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+class BitmapIndex:
+    def __init__(self, df: pd.DataFrame, columnas: list, columna_fecha: str = None):
+        self.n_filas = len(df)
+        self._bitmaps = {}
+        for col in columnas:
+            if col not in df.columns:
+                continue
+            codigos, valores = pd.factorize(df[col], sort=True)
+            self._bitmaps[col] = {valor: np.packbits(codigos == i) for i, valor in enumerate(valores)}
+        self._todos = np.packbits(np.ones(self.n_filas, dtype=bool))
+
+        self.columna_fecha = columna_fecha
+        if columna_fecha is not None:
+            fechas = np.asarray(pd.to_datetime(df[columna_fecha], errors="coerce"), dtype="datetime64[ns]")
+            validas = np.flatnonzero(~np.isnat(fechas))
+            orden = np.argsort(fechas[validas], kind="stable")
+            self._filas_por_fecha = validas[orden]
+            self._fechas_ordenadas = fechas[self._filas_por_fecha]
+
+    @property
+    def columns(self) -> list:
+        return list(self._bitmaps)
+
+    def values(self, col: str) -> list:
+        return list(self._bitmaps.get(col, {}))
+
+    def date_bounds(self):
+        if self.columna_fecha is None or not len(self._fechas_ordenadas):
+            return None
+        return pd.Timestamp(self._fechas_ordenadas[0]).date(), pd.Timestamp(self._fechas_ordenadas[-1]).date()
+
+    def any_of(self, col: str, valores) -> np.ndarray:
+        """OR de los bitmaps de 'valores' en 'col' (valores desconocidos no suman filas)."""
+        bitmaps = [self._bitmaps[col][v] for v in valores if v in self._bitmaps[col]]
+        if not bitmaps:
+            return np.zeros_like(self._todos)
+        return np.bitwise_or.reduce(bitmaps) if len(bitmaps) > 1 else bitmaps[0]
+
+    def date_range(self, desde=None, hasta=None) -> np.ndarray:
+        """Filas con fecha en [desde, hasta] (extremos incluidos, día completo)."""
+        inicio = 0 if desde is None else np.searchsorted(
+            self._fechas_ordenadas, np.datetime64(pd.Timestamp(desde), "ns"), side="left")
+        fin = len(self._fechas_ordenadas) if hasta is None else np.searchsorted(
+            self._fechas_ordenadas, np.datetime64(pd.Timestamp(hasta) + pd.Timedelta(days=1), "ns"), side="left")
+        filas = np.zeros(self.n_filas, dtype=bool)
+        filas[self._filas_por_fecha[inicio:fin]] = True
+        return np.packbits(filas)
+
+    def select(self, filtros: dict = None, rango=None) -> np.ndarray:
+        """
+        filtros: {columna: lista de valores}; una lista vacía o None significa 'todos'.
+        rango: (desde, hasta) sobre la columna de fecha, o None.
+        """
+        partes = [self.any_of(col, valores) for col, valores in (filtros or {}).items() if valores]
+        if rango is not None and self.columna_fecha is not None:
+            partes.append(self.date_range(*rango))
+        if not partes:
+            return self._todos
+        return np.bitwise_and.reduce(partes) if len(partes) > 1 else partes[0]
+
+    def count(self, bits: np.ndarray) -> int:
+        return int(_POPCOUNT[bits].sum(dtype=np.int64))
+
+    def to_mask(self, bits: np.ndarray) -> np.ndarray:
+        return np.unpackbits(bits, count=self.n_filas).astype(bool)
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from snapshot_local import read_table
+from cache_dependencias import depends_on
+
+# ==============================================================================
+# 1. MOTOR DE PLANTILLA Y ROTACIÓN A UNA FECHA
+# ==============================================================================
+# Por cada grupo (Departamento, Tipo de contrato) se guardan las fechas de ingreso y
+# de salida ordenadas. La plantilla a la fecha t es
+#     #(ingreso <= t) - #(salida <= t)
+# es decir, dos searchsorted. La serie mensual del dashboard sale de rollup_mensual.
+
+COLUMNAS_PLANTILLA = ["EmployeeNumber", "Department", "Tipocontrato", "FechaIngreso", "FechaSalida"]
+
+def _a_dias(fechas) -> np.ndarray:
+    return np.asarray(pd.to_datetime(fechas, errors="coerce"), dtype="datetime64[D]")
+
+class HeadcountEngine:
+    def __init__(self, df: pd.DataFrame):
+        ingreso = _a_dias(df["FechaIngreso"])
+        salida = _a_dias(df["FechaSalida"])
+        validos = ~np.isnat(ingreso)
+        grupos = pd.DataFrame({
+            "Department": df["Department"].to_numpy()[validos],
+            "Tipocontrato": df["Tipocontrato"].fillna("No especificado").to_numpy()[validos],
+        })
+        ingreso, salida = ingreso[validos], salida[validos]
+
+        self._grupos = {}
+        for clave, idx in grupos.groupby(["Department", "Tipocontrato"], dropna=False).indices.items():
+            sal = salida[idx]
+            self._grupos[clave] = (np.sort(ingreso[idx]), np.sort(sal[~np.isnat(sal)]))
+        self.fecha_min = ingreso.min() if ingreso.size else np.datetime64("today", "D")
+
+    def values(self, dim: str) -> list:
+        posicion = 0 if dim == "Department" else 1
+        return sorted({clave[posicion] for clave in self._grupos if not pd.isna(clave[posicion])})
+
+    def _seleccion(self, departamento=None, contrato=None):
+        return [arrays for (dep, con), arrays in self._grupos.items()
+                if (departamento is None or dep == departamento) and (contrato is None or con == contrato)]
+
+    def _conteos(self, cortes: np.ndarray, departamento=None, contrato=None):
+        """(ingresos <= corte, salidas <= corte) para cada corte, sumando los grupos seleccionados."""
+        ingresos = np.zeros(len(cortes), dtype=np.int64)
+        salidas = np.zeros(len(cortes), dtype=np.int64)
+        for ing, sal in self._seleccion(departamento, contrato):
+            ingresos += np.searchsorted(ing, cortes, side="right")
+            salidas += np.searchsorted(sal, cortes, side="right")
+        return ingresos, salidas
+
+    def headcount(self, fecha, departamento=None, contrato=None) -> int:
+        """Empleados activos al cierre del día 'fecha' (ingresó ese día o antes y no salió)."""
+        ingresos, salidas = self._conteos(np.array([np.datetime64(pd.Timestamp(fecha), "D")]), departamento, contrato)
+        return int(ingresos[0] - salidas[0])
+
+@depends_on("consolidado")
+@st.cache_resource(ttl=600)
+def load_headcount_engine() -> HeadcountEngine:
+    return HeadcountEngine(read_table("consolidado", COLUMNAS_PLANTILLA))
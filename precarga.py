@@ -0,0 +1,50 @@
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
+
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+# ==============================================================================
+# 1. PRECARGA CONCURRENTE DE LOS DATOS DE UNA PÁGINA
+# ==============================================================================
+# Cada página declara sus loaders cacheados; se ejecutan en paralelo antes de dibujar
+# la página, de modo que la primera pintura espera la consulta más lenta y no la suma
+# de todas. Luego la página llama a los mismos loaders y encuentra la caché caliente.
+
+logger = logging.getLogger("precarga")
+
+MAX_WORKERS = 6
+
+Tarea = Tuple[Callable, tuple]
+
+def prefetch(tareas: List[Tarea], max_workers: int = MAX_WORKERS) -> Dict[str, float]:
+    """
+    Ejecuta (loader, args) en un pool de hilos y devuelve la duración de cada uno (s).
+    Los errores solo se registran: la página vuelve a llamar al loader y los muestra.
+    """
+    if not tareas:
+        return {}
+    ctx = get_script_run_ctx()
+
+    def con_contexto():
+        # Permite que los loaders usen st.cache_data / st.error desde el hilo
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+
+    def ejecutar(tarea: Tarea):
+        loader, args = tarea
+        nombre = getattr(loader, "__name__", repr(loader)) + (repr(args) if args else "")
+        inicio = time.perf_counter()
+        try:
+            loader(*args)
+        except Exception as e:
+            logger.warning("precarga=%s error=%s", nombre, e)
+        return nombre, time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tareas)), initializer=con_contexto) as pool:
+        tiempos = dict(pool.map(ejecutar, tareas))
+    logger.info("precarga tareas=%d total=%.2fs suma=%.2fs", len(tareas), time.perf_counter() - inicio, sum(tiempos.values()))
+    return tiempos
@@ -3,8 +3,8 @@ import pandas as pd
 import joblib
 import shap
 import plotly.express as px
-from supabase import create_client, Client
 from typing import Dict, Any
+from snapshot_local import read_table, read_records
 import warnings
 
 warnings.filterwarnings("ignore")
@@ -17,9 +17,6 @@ MODEL_PATH = "models/xgboost_model.pkl"
 SCALER_PATH = "models/scaler.pkl"
 MAPPING_PATH = "models/categorical_mapping.pkl"
 
-EMPLOYEE_TABLE = "consolidado"
-KEY_COLUMN = "EmployeeNumber"
-
 TRADUCCIONES_COLS = {
     "Age": "Edad", "BusinessTravel": "Viajes de Negocios", "Department": "Departamento",
     "DistanceFromHome": "Distancia desde Casa", "Education": "Nivel Educativo",
@@ -92,18 +89,16 @@ def load_resources():
 model, scaler, mapping = load_resources()
 
 @st.cache_resource
-def get_supabase() -> Client:
-    return create_client(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_KEY"])
-
-supabase = get_supabase()
+def get_explainer():
+    # Construir el explainer de un árbol grande es costoso: uno por proceso
+    return shap.Explainer(model)
 
 def fetch_employee_ids():
-    res = supabase.table(EMPLOYEE_TABLE).select(KEY_COLUMN).execute()
-    return sorted([str(r[KEY_COLUMN]) for r in res.data])
+    return sorted(read_table("consolidado", ["EmployeeNumber"])["EmployeeNumber"].astype(str).tolist())
 
 def load_employee_data(emp_id: str) -> Dict[str, Any]:
-    res = supabase.table(EMPLOYEE_TABLE).select("*").eq(KEY_COLUMN, emp_id).limit(1).execute()
-    return res.data[0] if res.data else {}
+    fila = read_records("consolidado", filtros=[("EmployeeNumber", "==", int(emp_id))])
+    return fila[0] if fila else {}
 
 # ==========================================================
 # 3. PREDICCIÓN + SHAP CON COLORES
@@ -119,7 +114,7 @@ def predict_with_shap(data: Dict[str, Any]):
     df_scaled = scaler.transform(df)
     proba = model.predict_proba(df_scaled)[0][1]
     
-    explainer = shap.Explainer(model)
+    explainer = get_explainer()
     shap_values = explainer(df_scaled)
     
     shap_df = pd.DataFrame({
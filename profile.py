@@ -5,6 +5,8 @@ import time
 import re
 import pytz
 from supabase import Client 
+import acceso_datos
+from cache_dependencias import depends_on, invalidate
 
 # ==========================================================
 # CONFIGURACIÓN Y UTILIDADES
@@ -23,12 +25,11 @@ def format_datetime_peru(iso_str, use_now_if_none=False, date_only=False):
         return dt.strftime("%Y-%m-%d") if date_only else dt.strftime("%Y-%m-%d %H:%M hrs (PE)")
     except: return "N/A"
 
+@depends_on("profiles")
 @st.cache_data(ttl=600)
 def load_user_profile_data(user_id: str):
     if not user_id: return None
-    supabase = st.session_state["supabase"]
-    response = supabase.table("profiles").select("*").eq("id", user_id).single().execute()
-    return response.data
+    return acceso_datos.fetch_profile(user_id)
 
 def hydrate_session(profile: dict):
     if not profile: return
@@ -49,7 +50,6 @@ def hydrate_session(profile: dict):
 # ==========================================================
 
 def update_profile(name, dob, phone, address, avatar):
-    supabase = st.session_state["supabase"]
     user_id = st.session_state["user_id"]
     
     payload = {
@@ -63,8 +63,8 @@ def update_profile(name, dob, phone, address, avatar):
         payload["avatar_url"] = "data:image/png;base64," + base64.b64encode(avatar).decode()
     
     try:
-        supabase.table("profiles").update(payload).eq("id", user_id).execute()
-        load_user_profile_data.clear()
+        acceso_datos.update_profile(user_id, payload)
+        invalidate("profiles")
         st.session_state["update_status_message"] = ("success", "✅ Perfil actualizado correctamente.")
         st.session_state["temp_avatar_bytes"] = None 
         time.sleep(1)
@@ -0,0 +1,52 @@
+import os
+import json
+import pandas as pd
+from datetime import datetime
+
+# ==============================================================================
+# 1. ALMACÉN DE RESULTADOS PRECALCULADOS (ESCRITO POR EL SCORING NOCTURNO)
+# ==============================================================================
+
+PRECALC_DIR = os.path.join("data", "precalculado")
+RESULTADOS_PATH = os.path.join(PRECALC_DIR, "scoring_consolidado.pkl")
+AGREGADOS_PATH = os.path.join(PRECALC_DIR, "agregados.json")
+
+def build_aggregates(df: pd.DataFrame) -> dict:
+    """Resumen que las páginas muestran sin recorrer el detalle."""
+    prob = df['Probabilidad_Renuncia']
+    agregados = {
+        "generado_en": datetime.now().isoformat(timespec="seconds"),
+        "analizados": int(len(df)),
+        "criticos": int((prob > 0.5).sum()),
+        "riesgo_promedio": float(prob.mean()) if len(df) else 0.0,
+    }
+    if 'Department' in df.columns:
+        agregados["riesgo_por_departamento"] = {str(k): float(v) for k, v in prob.groupby(df['Department']).mean().items()}
+    return agregados
+
+def save_results(df: pd.DataFrame, agregados: dict, base_dir: str = PRECALC_DIR):
+    """Reemplaza atómicamente los resultados vigentes para que las páginas nunca lean un archivo a medias."""
+    os.makedirs(base_dir, exist_ok=True)
+    res_path = os.path.join(base_dir, os.path.basename(RESULTADOS_PATH))
+    agg_path = os.path.join(base_dir, os.path.basename(AGREGADOS_PATH))
+
+    df.to_pickle(res_path + ".tmp")
+    with open(agg_path + ".tmp", "w", encoding="utf-8") as fh:
+        json.dump(agregados, fh, ensure_ascii=False, indent=2)
+    os.replace(res_path + ".tmp", res_path)
+    os.replace(agg_path + ".tmp", agg_path)
+
+def load_results(base_dir: str = PRECALC_DIR):
+    """Devuelve (resultados, agregados) o (None, None) si aún no hubo corrida nocturna."""
+    res_path = os.path.join(base_dir, os.path.basename(RESULTADOS_PATH))
+    agg_path = os.path.join(base_dir, os.path.basename(AGREGADOS_PATH))
+    if not (os.path.exists(res_path) and os.path.exists(agg_path)):
+        return None, None
+    with open(agg_path, encoding="utf-8") as fh:
+        agregados = json.load(fh)
+    return pd.read_pickle(res_path), agregados
+
+def results_version(base_dir: str = PRECALC_DIR) -> float:
+    """Marca de versión (mtime) para usar como clave de caché en las páginas."""
+    agg_path = os.path.join(base_dir, os.path.basename(AGREGADOS_PATH))
+    return os.path.getmtime(agg_path) if os.path.exists(agg_path) else 0.0
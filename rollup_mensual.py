@@ -0,0 +1,186 @@
+import os
+import json
+import time
+import logging
+import threading
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from snapshot_local import LOCAL_DIR, FULL_REFRESH_MAX_AGE, read_table, table_version
+from cache_dependencias import depends_on
+
+# ==============================================================================
+# 1. ROLLUP MENSUAL MANTENIDO DE FORMA INCREMENTAL
+# ==============================================================================
+# Una fila por (Mes, Department, Tipocontrato) con flujos del mes: ingresos, salidas y
+# sumas que permiten derivar la antigüedad. La plantilla y la antigüedad promedio a fin
+# de mes salen de sumas acumuladas al leer; así un alta o edición solo toca las filas de
+# sus meses de ingreso y salida (antes y después del cambio), no toda la historia.
+#
+# 'aportes' guarda lo último aplicado por empleado para poder restarlo al editarlo.
+
+logger = logging.getLogger("rollup_mensual")
+
+COLUMNAS_ROLLUP = ["EmployeeNumber", "Department", "Tipocontrato", "FechaIngreso", "FechaSalida"]
+CLAVE = ["Mes", "Department", "Tipocontrato"]
+MEDIDAS = ["ingresos", "salidas", "suma_dias_ingreso", "suma_dias_ingreso_salidas", "suma_meses_salidas"]
+
+_RUTA = os.path.join(LOCAL_DIR, "rollup_mensual.parquet")
+_RUTA_APORTES = os.path.join(LOCAL_DIR, "rollup_mensual_aportes.parquet")
+_RUTA_META = os.path.join(LOCAL_DIR, "rollup_mensual.meta.json")
+
+_lock = threading.Lock()
+
+def _aportes(df: pd.DataFrame) -> pd.DataFrame:
+    ingreso = pd.to_datetime(df['FechaIngreso'], errors='coerce')
+    aportes = pd.DataFrame({
+        'EmployeeNumber': pd.to_numeric(df['EmployeeNumber']).astype('int64'),
+        'Department': df['Department'].fillna('No especificado').astype(str),
+        'Tipocontrato': df['Tipocontrato'].fillna('No especificado').astype(str),
+        'FechaIngreso': ingreso.dt.normalize(),
+        'FechaSalida': pd.to_datetime(df['FechaSalida'], errors='coerce').dt.normalize(),
+    })
+    return aportes[ingreso.notna()]
+
+def _movimientos(aportes: pd.DataFrame, signo: int = 1) -> pd.DataFrame:
+    """Contribución de 'aportes' a cada fila del rollup (signo -1 para restarla)."""
+    dias_ingreso = (aportes['FechaIngreso'] - pd.Timestamp(0)).dt.days
+    salio = aportes['FechaSalida'].notna()
+    altas = pd.DataFrame({
+        'Mes': aportes['FechaIngreso'].dt.to_period('M').dt.to_timestamp(),
+        'Department': aportes['Department'], 'Tipocontrato': aportes['Tipocontrato'],
+        'ingresos': 1, 'salidas': 0, 'suma_dias_ingreso': dias_ingreso,
+        'suma_dias_ingreso_salidas': 0, 'suma_meses_salidas': 0.0,
+    })
+    bajas = pd.DataFrame({
+        'Mes': aportes.loc[salio, 'FechaSalida'].dt.to_period('M').dt.to_timestamp(),
+        'Department': aportes.loc[salio, 'Department'], 'Tipocontrato': aportes.loc[salio, 'Tipocontrato'],
+        'ingresos': 0, 'salidas': 1, 'suma_dias_ingreso': 0,
+        'suma_dias_ingreso_salidas': dias_ingreso[salio],
+        'suma_meses_salidas': (aportes.loc[salio, 'FechaSalida'] - aportes.loc[salio, 'FechaIngreso']).dt.days / 30,
+    })
+    movimientos = pd.concat([altas, bajas], ignore_index=True).groupby(CLAVE, as_index=False)[MEDIDAS].sum()
+    movimientos[MEDIDAS] = movimientos[MEDIDAS] * signo
+    return movimientos
+
+def _leer_meta() -> dict:
+    try:
+        with open(_RUTA_META, encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+def _guardar(rollup: pd.DataFrame, aportes: pd.DataFrame, meta: dict):
+    os.makedirs(LOCAL_DIR, exist_ok=True)
+    for df, ruta in ((rollup, _RUTA), (aportes, _RUTA_APORTES)):
+        df.to_parquet(ruta + ".tmp", index=False)
+        os.replace(ruta + ".tmp", ruta)
+    with open(_RUTA_META + ".tmp", "w", encoding="utf-8") as fh:
+        json.dump(meta, fh)
+    os.replace(_RUTA_META + ".tmp", _RUTA_META)
+
+def rebuild():
+    """Recalcula el rollup completo desde la copia local de 'consolidado'."""
+    with _lock:
+        aportes = _aportes(read_table("consolidado", COLUMNAS_ROLLUP))
+        rollup = _movimientos(aportes)
+        _guardar(rollup, aportes, {"version": table_version("consolidado"), "completo_en": time.time()})
+        logger.info("rollup completo filas=%d empleados=%d", len(rollup), len(aportes))
+
+def _al_dia() -> bool:
+    meta = _leer_meta()
+    return (os.path.exists(_RUTA) and meta.get("version") == table_version("consolidado")
+            and time.time() - meta.get("completo_en", 0) <= FULL_REFRESH_MAX_AGE)
+
+# ==============================================================================
+# 2. ACTUALIZACIÓN INCREMENTAL (ALTAS, EDICIONES Y BAJAS DE EMPLEADOS)
+# ==============================================================================
+
+def apply_employee_write(clave, fila: dict = None):
+    """
+    Llamar después de notify_write("empleados", clave, fila): resta lo que el empleado
+    aportaba, suma su versión nueva ('fila' None = eliminado) y guarda solo esos cambios.
+    """
+    try:
+        with _lock:
+            if not os.path.exists(_RUTA):
+                return  # Aún no hay rollup: la próxima lectura lo arma completo
+            rollup = pd.read_parquet(_RUTA)
+            aportes = pd.read_parquet(_RUTA_APORTES)
+            clave = int(clave)
+            previo = aportes[aportes['EmployeeNumber'] == clave]
+            cambios = [_movimientos(previo, signo=-1)]
+            aportes = aportes[aportes['EmployeeNumber'] != clave]
+            if fila is not None:
+                anterior = previo.iloc[0].to_dict() if len(previo) else {}
+                nuevo = _aportes(pd.DataFrame([{**{c: fila.get(c, anterior.get(c)) for c in COLUMNAS_ROLLUP},
+                                                'EmployeeNumber': clave}]))
+                cambios.append(_movimientos(nuevo))
+                aportes = pd.concat([aportes, nuevo], ignore_index=True)
+            delta = pd.concat(cambios, ignore_index=True).groupby(CLAVE, as_index=False)[MEDIDAS].sum()
+
+            # Solo las filas de los meses afectados se suman; las que quedan en cero se quitan
+            rollup = (pd.concat([rollup, delta], ignore_index=True)
+                      .groupby(CLAVE, as_index=False, sort=False)[MEDIDAS].sum())
+            rollup = rollup[(rollup['ingresos'] != 0) | (rollup['salidas'] != 0)]
+            _guardar(rollup, aportes, {**_leer_meta(), "version": table_version("consolidado")})
+            logger.info("rollup empleado=%s filas_afectadas=%d", clave, len(delta))
+    except Exception as e:
+        logger.warning("rollup incremental fallido para empleado=%s, se recalculará completo: %s", clave, e)
+        try:
+            os.remove(_RUTA_META)
+        except OSError:
+            pass
+    _read_rollup.clear()
+
+# ==============================================================================
+# 3. LECTURA PARA EL DASHBOARD
+# ==============================================================================
+
+@depends_on("consolidado")
+@st.cache_data(max_entries=2)
+def _read_rollup(version: str) -> pd.DataFrame:
+    return pd.read_parquet(_RUTA)
+
+def monthly_rollup(departamento=None, contrato=None, hasta=None) -> pd.DataFrame:
+    """
+    Serie mensual: ingresos, salidas, plantilla al cierre, tasa de rotación, antigüedad
+    promedio de la plantilla y antigüedad promedio al salir (en meses).
+    """
+    if not _al_dia():
+        rebuild()
+    rollup = _read_rollup(str(os.stat(_RUTA).st_mtime_ns))
+    if departamento is not None:
+        rollup = rollup[rollup['Department'] == departamento]
+    if contrato is not None:
+        rollup = rollup[rollup['Tipocontrato'] == contrato]
+    if rollup.empty:
+        return pd.DataFrame(columns=['Mes', 'Ingresos', 'Salidas', 'Plantilla final', 'Tasa de rotación (%)',
+                                     'Antigüedad promedio (meses)', 'Antigüedad al salir (meses)'])
+
+    fin = pd.Timestamp(hasta if hasta is not None else date.today()).to_period('M').to_timestamp()
+    meses = rollup.groupby('Mes')[MEDIDAS].sum()
+    meses = meses.reindex(pd.date_range(meses.index.min(), max(fin, meses.index.max()), freq='MS'), fill_value=0)
+    meses = meses[meses.index <= fin]
+
+    plantilla = (meses['ingresos'].cumsum() - meses['salidas'].cumsum()).to_numpy()
+    plantilla_inicial = np.concatenate([[0], plantilla[:-1]])
+    # Antigüedad de los activos a fin de mes = plantilla * día de cierre - suma de sus días de ingreso
+    cierre = ((meses.index + pd.offsets.MonthEnd(0)) - pd.Timestamp(0)).days.to_numpy()
+    dias_activos = plantilla * cierre - (meses['suma_dias_ingreso'].cumsum()
+                                         - meses['suma_dias_ingreso_salidas'].cumsum()).to_numpy()
+    promedio = (plantilla_inicial + plantilla) / 2
+    salidas = meses['salidas'].to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return pd.DataFrame({
+            'Mes': meses.index,
+            'Ingresos': meses['ingresos'].to_numpy(),
+            'Salidas': salidas,
+            'Plantilla final': plantilla,
+            'Tasa de rotación (%)': np.where(promedio > 0, salidas / promedio * 100, 0.0),
+            'Antigüedad promedio (meses)': np.where(plantilla > 0, dias_activos / plantilla / 30, np.nan),
+            'Antigüedad al salir (meses)': np.where(salidas > 0, meses['suma_meses_salidas'].to_numpy() / salidas, np.nan),
+        })
@@ -0,0 +1,75 @@
+"""
+Scoring nocturno sin Streamlit.
+
+Uso (cron):
+    python scoring_nocturno.py [--sin-snapshot]
+
+Códigos de salida:
+    0 = OK, 1 = sin datos en 'consolidado', 2 = sin credenciales / conexión, 3 = error inesperado
+"""
+import sys
+import time
+import logging
+import argparse
+from contextlib import contextmanager
+
+EXIT_OK, EXIT_SIN_DATOS, EXIT_CONEXION, EXIT_ERROR = 0, 1, 2, 3
+
+logger = logging.getLogger("scoring_nocturno")
+
+@contextmanager
+def etapa(nombre: str, tiempos: dict):
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        tiempos[nombre] = time.perf_counter() - inicio
+        logger.info("etapa=%s duracion=%.2fs", nombre, tiempos[nombre])
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Scoring nocturno de riesgo de renuncia.")
+    parser.add_argument("--sin-snapshot", action="store_true", help="No agregar la corrida al histórico de snapshots.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    tiempos = {}
+    try:
+        from attrition_predictor import load_resources, run_pipeline
+        from resultados_precalculados import build_aggregates, save_results
+        from snapshots_riesgo import save_snapshot
+        from acceso_datos import get_client, fetch_consolidado, COLUMNAS_MODELO
+
+        with etapa("cargar_modelo", tiempos):
+            model, mapping, scaler = load_resources()
+
+        with etapa("conexion", tiempos):
+            client = get_client()
+        if client is None:
+            logger.error("Faltan SUPABASE_URL / SUPABASE_KEY.")
+            return EXIT_CONEXION
+
+        with etapa("descarga_consolidado", tiempos):
+            df = fetch_consolidado(COLUMNAS_MODELO)
+        if df is None or df.empty:
+            logger.error("La tabla 'consolidado' no devolvió filas.")
+            return EXIT_SIN_DATOS
+        logger.info("filas=%d", len(df))
+
+        with etapa("scoring", tiempos):
+            resultados = run_pipeline(df, model, mapping, scaler)
+
+        with etapa("persistencia", tiempos):
+            agregados = build_aggregates(resultados)
+            agregados["tiempos_etapas"] = {k: round(v, 3) for k, v in tiempos.items()}
+            save_results(resultados, agregados)
+            if not args.sin_snapshot:
+                save_snapshot(resultados)
+
+        logger.info("OK total=%.2fs", sum(tiempos.values()))
+        return EXIT_OK
+    except Exception:
+        logger.exception("Fallo del scoring nocturno")
+        return EXIT_ERROR
+
+if __name__ == "__main__":
+    sys.exit(main())
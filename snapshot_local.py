@@ -0,0 +1,209 @@
+import os
+import json
+import time
+import logging
+import threading
+from collections import defaultdict
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from acceso_datos import fetch_all, count_rows, fetch_max, COLUMNAS_MODELO, COLUMNAS_EMPLEADOS, COLUMNAS_ENCUESTAS
+
+# ==============================================================================
+# 1. CONFIGURACIÓN DEL SNAPSHOT LOCAL (PARQUET)
+# ==============================================================================
+# Copia columnar local de las tablas que leen las páginas. Se refresca de forma
+# incremental: filas nuevas por clave/marca de agua, y recarga completa si el
+# conteo remoto no cuadra o si la copia completa es demasiado antigua.
+# La sincronización corre en un hilo aparte: una lectura nunca espera a Supabase,
+# salvo la primera, cuando todavía no hay copia en disco.
+#
+# Límite conocido: 'empleados' no tiene columna de última modificación. Una edición
+# hecha fuera de la app (SQL, otra herramienta) no cambia clave ni conteo, así que
+# solo se ve en la recarga completa periódica (FULL_REFRESH_MAX_AGE). Las ediciones
+# desde la app no esperan: notify_write parchea la copia al momento.
+
+logger = logging.getLogger("snapshot_local")
+
+LOCAL_DIR = os.path.join("data", "local")
+
+TABLAS_LOCALES = {
+    # 'columnas': proyección que se descarga (unión de lo que leen las páginas de esa tabla)
+    # 'marca': columna creciente para traer solo lo nuevo (None = usar la clave primaria)
+    # 'fuentes': {tabla: columna creciente} de tablas que alteran filas ya existentes; si su
+    #            máximo cambió desde la última recarga, la copia se recarga completa.
+    #            'consolidado' une la última encuesta de cada empleado: una encuesta nueva
+    #            no cambia ni su clave ni su conteo.
+    "consolidado": {"pk": "EmployeeNumber", "marca": None, "fuentes": {"encuestas": "id"},
+                    "columnas": COLUMNAS_MODELO},
+    "empleados": {"pk": "EmployeeNumber", "marca": None, "columnas": COLUMNAS_EMPLEADOS},
+    "encuestas": {"pk": "id", "marca": "id", "columnas": ["id"] + COLUMNAS_ENCUESTAS},
+}
+
+SYNC_MIN_INTERVAL = 60          # segundos entre comprobaciones contra Supabase
+FULL_REFRESH_MAX_AGE = 6 * 3600 # recarga completa periódica (ediciones sin marca de agua)
+
+_locks = defaultdict(threading.Lock)
+_ultimo_check = {}
+_en_curso = set()               # tablas con una sincronización en segundo plano
+_guardia = threading.Lock()
+
+def _path(tabla: str) -> str:
+    return os.path.join(LOCAL_DIR, f"{tabla}.parquet")
+
+def _meta_path(tabla: str) -> str:
+    return os.path.join(LOCAL_DIR, f"{tabla}.meta.json")
+
+def _read_meta(tabla: str) -> dict:
+    try:
+        with open(_meta_path(tabla), encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+def _write_meta_only(tabla: str, meta: dict):
+    with open(_meta_path(tabla) + ".tmp", "w", encoding="utf-8") as fh:
+        json.dump(meta, fh)
+    os.replace(_meta_path(tabla) + ".tmp", _meta_path(tabla))
+
+def _write(tabla: str, df: pd.DataFrame, meta: dict):
+    """Escritura atómica: las sesiones que leen nunca ven un parquet a medias."""
+    os.makedirs(LOCAL_DIR, exist_ok=True)
+    df.to_parquet(_path(tabla) + ".tmp", index=False)
+    os.replace(_path(tabla) + ".tmp", _path(tabla))
+    _write_meta_only(tabla, meta)
+
+# ==============================================================================
+# 2. SINCRONIZACIÓN
+# ==============================================================================
+
+def _source_marks(tabla: str) -> dict:
+    return {fuente: fetch_max(fuente, col) for fuente, col in TABLAS_LOCALES[tabla].get("fuentes", {}).items()}
+
+def _full_refresh(tabla: str, marcas_fuentes: dict = None):
+    cfg = TABLAS_LOCALES[tabla]
+    # Las marcas se toman antes de descargar: lo que llegue durante la descarga se verá en la próxima
+    marcas_fuentes = _source_marks(tabla) if marcas_fuentes is None else marcas_fuentes
+    df = fetch_all(tabla, cfg["columnas"], orden=[cfg["pk"]])
+    _write(tabla, df, {"completo_en": time.time(), "filas": len(df), "fuentes": marcas_fuentes})
+    logger.info("tabla=%s recarga_completa filas=%d", tabla, len(df))
+
+def sync_table(tabla: str, forzar_completo: bool = False):
+    """Trae a disco los cambios de Supabase. Solo una sesión sincroniza cada tabla a la vez."""
+    cfg = TABLAS_LOCALES[tabla]
+    with _locks[tabla]:
+        meta = _read_meta(tabla)
+        marcas_fuentes = _source_marks(tabla)
+        if (forzar_completo or meta.get("obsoleto") or not os.path.exists(_path(tabla))
+                or time.time() - meta.get("completo_en", 0) > FULL_REFRESH_MAX_AGE
+                or marcas_fuentes != meta.get("fuentes", {})):
+            _full_refresh(tabla, marcas_fuentes)
+        else:
+            local = pd.read_parquet(_path(tabla))
+            marca = cfg["marca"] or cfg["pk"]
+            filtros = [("gt", marca, local[marca].max().item())] if not local.empty else None
+            nuevas = fetch_all(tabla, cfg["columnas"], orden=[cfg["pk"]], filtros=filtros)
+            if not nuevas.empty:
+                local = pd.concat([local, nuevas], ignore_index=True)
+            # Borrados (o altas con clave menor) no se ven por marca de agua: el conteo los delata
+            if count_rows(tabla, cfg["pk"]) != len(local):
+                _full_refresh(tabla, marcas_fuentes)
+            elif not nuevas.empty:
+                _write(tabla, local, {**meta, "filas": len(local)})
+                logger.info("tabla=%s incremental nuevas=%d", tabla, len(nuevas))
+        _ultimo_check[tabla] = time.time()
+
+def patch_rows(tabla: str, filas=None, borrar=None):
+    """Aplica altas/ediciones/bajas puntuales sobre la copia local sin volver a descargarla."""
+    cfg = TABLAS_LOCALES[tabla]
+    pk = cfg["pk"]
+    filas = filas or []
+    claves = set(borrar or []) | {f[pk] for f in filas}
+    with _locks[tabla]:
+        if not os.path.exists(_path(tabla)):
+            return
+        local = pd.read_parquet(_path(tabla))
+        if filas:
+            # Una edición puede traer solo algunas columnas: se fusiona sobre la fila guardada
+            previas = local[local[pk].isin([f[pk] for f in filas])].set_index(pk, drop=False)
+            filas = [{**(previas.loc[f[pk]].to_dict() if f[pk] in previas.index else {}),
+                      **{c: v for c, v in f.items() if c in cfg["columnas"]}} for f in filas]
+        local = local[~local[pk].isin(claves)]
+        if filas:
+            local = pd.concat([local, pd.DataFrame(filas)], ignore_index=True)
+        _write(tabla, local, {**_read_meta(tabla), "filas": len(local)})
+
+def refresh_rows(tabla: str, claves: list):
+    """Vuelve a leer de Supabase solo las filas indicadas (p. ej. de una vista derivada)."""
+    cfg = TABLAS_LOCALES[tabla]
+    filas = fetch_all(tabla, cfg["columnas"], orden=[cfg["pk"]], filtros=[("in_", cfg["pk"], list(claves))]).to_dict("records")
+    patch_rows(tabla, filas=filas, borrar=claves)
+
+def mark_stale(*tablas: str):
+    """Fuerza una recarga completa, que lanza la próxima lectura (p. ej. tras editar filas)."""
+    for tabla in tablas:
+        with _locks[tabla]:
+            meta = _read_meta(tabla)
+            if meta:
+                meta["obsoleto"] = True
+                _write_meta_only(tabla, meta)
+            _ultimo_check.pop(tabla, None)
+
+# ==============================================================================
+# 3. LECTURA
+# ==============================================================================
+
+def _sync_background(tabla: str):
+    antes = table_version(tabla)
+    try:
+        sync_table(tabla)
+    except Exception as e:
+        # Se reintenta tras SYNC_MIN_INTERVAL, no en cada lectura
+        _ultimo_check[tabla] = time.time()
+        logger.warning("tabla=%s sin sincronizar, se usa la copia local: %s", tabla, e)
+    else:
+        if table_version(tabla) != antes:
+            # Importación diferida: cache_dependencias importa este módulo
+            from cache_dependencias import invalidate
+            invalidate(tabla)
+    finally:
+        with _guardia:
+            _en_curso.discard(tabla)
+
+def _sync_if_due(tabla: str):
+    """Sin copia en disco sincroniza y espera; con copia, lanza (una vez) la sincronización en un hilo."""
+    if time.time() - _ultimo_check.get(tabla, 0) <= SYNC_MIN_INTERVAL:
+        return
+    if not os.path.exists(_path(tabla)):
+        sync_table(tabla)
+        return
+    with _guardia:
+        if tabla in _en_curso:
+            return
+        _en_curso.add(tabla)
+    threading.Thread(target=_sync_background, args=(tabla,), name=f"sync-{tabla}", daemon=True).start()
+
+def read_table(tabla: str, columnas=None, filtros=None) -> pd.DataFrame:
+    """Lee la copia local (y lanza su sincronización si toca) leyendo solo las columnas y filas pedidas."""
+    _sync_if_due(tabla)
+    if not os.path.exists(_path(tabla)):
+        return pd.DataFrame()
+    if columnas is None or isinstance(columnas, str):
+        return pd.read_parquet(_path(tabla), filters=filtros)
+    disponibles = set(pq.read_schema(_path(tabla)).names)
+    return pd.read_parquet(_path(tabla), columns=[c for c in columnas if c in disponibles], filters=filtros)
+
+def table_version(tabla: str) -> str:
+    """Cambia con cada escritura de la copia local; sirve de clave sin consultar Supabase."""
+    return str(os.stat(_path(tabla)).st_mtime_ns) if os.path.exists(_path(tabla)) else "0"
+
+def synced_version(tabla: str) -> str:
+    """Como table_version, pero lanzando antes la sincronización si toca (al terminar, invalida las cachés)."""
+    _sync_if_due(tabla)
+    return table_version(tabla)
+
+def read_records(tabla: str, columnas=None, filtros=None) -> list:
+    """Como read_table pero en lista de dicts, con None (no NaN) en los vacíos, igual que la API."""
+    df = read_table(tabla, columnas, filtros)
+    return df.astype(object).where(df.notna(), None).to_dict("records")
@@ -0,0 +1,82 @@
+import os
+import glob
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+
+# ==============================================================================
+# 1. ALMACÉN DE SNAPSHOTS DE RIESGO (APPEND-ONLY, PARTICIONADO POR MES)
+# ==============================================================================
+# Cada corrida de scoring se guarda como un .npz compacto:
+#   data/snapshots_riesgo/AAAA-MM/riesgo_AAAAMMDDTHHMMSS.npz
+# con EmployeeNumber (int32, ordenado), probabilidad (float16) y fecha de corrida.
+
+SNAPSHOT_DIR = os.path.join("data", "snapshots_riesgo")
+FORMATO_FECHA = "%Y%m%dT%H%M%S"
+
+def save_snapshot(df: pd.DataFrame, run_date: datetime = None, base_dir: str = SNAPSHOT_DIR) -> str:
+    """Persiste una corrida de scoring. Nunca sobrescribe corridas anteriores."""
+    run_date = run_date or datetime.now()
+    ids = pd.to_numeric(df['EmployeeNumber'], errors='coerce').to_numpy(dtype='float64')
+    probs = df['Probabilidad_Renuncia'].to_numpy(dtype='float32')
+    validos = ~np.isnan(ids)
+    ids, probs = ids[validos].astype(np.int32), probs[validos]
+
+    # Orden por EmployeeNumber para que los diffs sean un merge de arreglos ordenados
+    orden = np.argsort(ids, kind='stable')
+    ids, probs = ids[orden], probs[orden]
+    ids, idx_ultimo = np.unique(ids[::-1], return_index=True)
+    probs = probs[::-1][idx_ultimo]
+
+    carpeta = os.path.join(base_dir, run_date.strftime("%Y-%m"))
+    os.makedirs(carpeta, exist_ok=True)
+    path = os.path.join(carpeta, f"riesgo_{run_date.strftime(FORMATO_FECHA)}.npz")
+    sufijo = 1
+    while os.path.exists(path):
+        path = os.path.join(carpeta, f"riesgo_{run_date.strftime(FORMATO_FECHA)}_{sufijo}.npz")
+        sufijo += 1
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as fh:
+        np.savez(fh, ids=ids, probs=probs.astype(np.float16),
+                 run_date=np.datetime64(run_date, 's'))
+    os.replace(tmp, path)
+    return path
+
+def list_snapshots(base_dir: str = SNAPSHOT_DIR) -> pd.DataFrame:
+    """Lista las corridas disponibles leyendo solo los nombres de archivo."""
+    paths = glob.glob(os.path.join(base_dir, "*", "riesgo_*.npz"))
+    fechas = [datetime.strptime(os.path.basename(p)[len("riesgo_"):len("riesgo_") + 15], FORMATO_FECHA) for p in paths]
+    return pd.DataFrame({'run_date': fechas, 'path': paths}).sort_values(['run_date', 'path']).reset_index(drop=True)
+
+def load_snapshot(path: str):
+    with np.load(path) as data:
+        return data['ids'], data['probs'].astype(np.float32), pd.Timestamp(data['run_date'].item())
+
+# ==============================================================================
+# 2. COMPARACIÓN ENTRE CORRIDAS
+# ==============================================================================
+
+def diff_snapshots(path_anterior: str, path_actual: str) -> pd.DataFrame:
+    """Cambio de probabilidad (en puntos porcentuales) por empleado presente en ambas corridas."""
+    ids_a, probs_a, _ = load_snapshot(path_anterior)
+    ids_b, probs_b, _ = load_snapshot(path_actual)
+    comunes, idx_a, idx_b = np.intersect1d(ids_a, ids_b, assume_unique=True, return_indices=True)
+    return pd.DataFrame({
+        'EmployeeNumber': comunes,
+        'Prob_Anterior': probs_a[idx_a],
+        'Prob_Actual': probs_b[idx_b],
+        'Cambio_Puntos': (probs_b[idx_b] - probs_a[idx_a]) * 100
+    })
+
+def risk_increases(umbral_puntos: float = 15.0, dias: int = 30, base_dir: str = SNAPSHOT_DIR) -> pd.DataFrame:
+    """Empleados cuyo riesgo subió más de `umbral_puntos` respecto a la corrida de hace `dias` días o más."""
+    snaps = list_snapshots(base_dir)
+    if len(snaps) < 2:
+        return pd.DataFrame(columns=['EmployeeNumber', 'Prob_Anterior', 'Prob_Actual', 'Cambio_Puntos'])
+    actual = snaps.iloc[-1]
+    previas = snaps[snaps['run_date'] <= actual['run_date'] - timedelta(days=dias)]
+    if previas.empty:
+        return pd.DataFrame(columns=['EmployeeNumber', 'Prob_Anterior', 'Prob_Actual', 'Cambio_Puntos'])
+    diff = diff_snapshots(previas.iloc[-1]['path'], actual['path'])
+    return diff[diff['Cambio_Puntos'] > umbral_puntos].sort_values('Cambio_Puntos', ascending=False).reset_index(drop=True)
@@ -0,0 +1,61 @@
+-- ==============================================================================
+-- Vistas agregadas para el dashboard de rotación y la página de reconocimiento.
+-- Las páginas leen solo estas filas agregadas; si las vistas no existen (p. ej. con
+-- el backend local) agregados_kpi.py calcula lo mismo en pandas.
+-- security_invoker: las vistas se evalúan con los permisos (y el RLS de 'consolidado')
+-- de quien consulta, no con los del dueño; solo usuarios autenticados pueden leerlas.
+-- ==============================================================================
+
+CREATE OR REPLACE VIEW v_rotacion_base WITH (security_invoker = true) AS
+SELECT
+    "Gender",
+    COALESCE("Tipocontrato", 'No especificado') AS "Tipocontrato",
+    "Department",
+    "YearsSinceLastPromotion",
+    "FechaSalida"::date AS "FechaSalida",
+    ("FechaSalida" IS NOT NULL) AS salida,
+    (COALESCE("FechaSalida"::date, CURRENT_DATE) - "FechaIngreso"::date) / 30.0 AS antiguedad_meses
+FROM consolidado
+WHERE "FechaIngreso" IS NOT NULL;
+
+-- Cubo del dashboard: una fila por combinación de dimensiones. El mes de salida y los
+-- meses de antigüedad al salir solo se informan para quienes salieron, así los activos
+-- se agrupan en pocas celdas. Cualquier combinación de filtros se responde sumando celdas.
+CREATE OR REPLACE VIEW v_cubo_rotacion WITH (security_invoker = true) AS
+SELECT "Gender", "Tipocontrato", "Department", tramo, salida,
+       CASE WHEN salida THEN date_trunc('month', "FechaSalida")::date END AS mes_salida,
+       "YearsSinceLastPromotion" AS anios_sin_promocion,
+       CASE WHEN salida THEN trunc(antiguedad_meses)::int END AS meses_antiguedad,
+       COUNT(*) AS empleados,
+       COALESCE(SUM(antiguedad_meses), 0) AS suma_meses,
+       COUNT(*) FILTER (WHERE antiguedad_meses <= 12) AS primer_anio
+FROM (
+    SELECT *, CASE
+        WHEN antiguedad_meses > 0  AND antiguedad_meses <= 6    THEN '0–6 meses'
+        WHEN antiguedad_meses > 6  AND antiguedad_meses <= 12   THEN '6–12 meses'
+        WHEN antiguedad_meses > 12 AND antiguedad_meses <= 24   THEN '1–2 años'
+        WHEN antiguedad_meses > 24 AND antiguedad_meses <= 60   THEN '2–5 años'
+        WHEN antiguedad_meses > 60 AND antiguedad_meses <= 1000 THEN 'Más de 5 años'
+    END AS tramo
+    FROM v_rotacion_base
+) b
+GROUP BY "Gender", "Tipocontrato", "Department", tramo, salida, mes_salida, anios_sin_promocion, meses_antiguedad;
+
+-- Resumen de estancamiento (página de reconocimiento): sobre todo 'consolidado'
+CREATE OR REPLACE VIEW v_estancamiento_departamento WITH (security_invoker = true) AS
+SELECT "Department",
+       COUNT(*) FILTER (WHERE COALESCE("YearsSinceLastPromotion", 0) >= 3) AS critico,
+       COUNT(*) FILTER (WHERE COALESCE("YearsSinceLastPromotion", 0) >= 2
+                          AND COALESCE("YearsSinceLastPromotion", 0) < 3) AS moderado,
+       COUNT(*) AS total,
+       AVG(COALESCE("YearsSinceLastPromotion", 0)) AS promedio
+FROM consolidado
+GROUP BY "Department";
+
+-- Las vistas antiguas por gráfico quedan reemplazadas por el cubo
+DROP VIEW IF EXISTS v_rotacion_kpis, v_salidas_departamento, v_tasa_tramo, v_salidas_mensuales,
+                    v_salidas_sin_promocion, v_salidas_meses_antiguedad;
+
+REVOKE ALL ON v_rotacion_base, v_cubo_rotacion, v_estancamiento_departamento FROM PUBLIC, anon;
+-- v_rotacion_base también: con security_invoker el cubo la lee con los permisos de quien consulta
+GRANT SELECT ON v_rotacion_base, v_cubo_rotacion, v_estancamiento_departamento TO authenticated;
@@ -0,0 +1,33 @@
+-- ==============================================================================
+-- Asignación de EmployeeNumber por bloques (asignacion_ids.py).
+-- Cada proceso de la app reserva un bloque de IDs con un UPDATE atómico sobre una fila
+-- contador y los entrega desde memoria: el formulario no consulta la base en cada rerun
+-- y dos altas simultáneas nunca reciben el mismo ID.
+-- ==============================================================================
+
+CREATE TABLE IF NOT EXISTS contadores (
+    nombre text PRIMARY KEY,
+    valor  bigint NOT NULL
+);
+
+INSERT INTO contadores (nombre, valor)
+SELECT 'EmployeeNumber', COALESCE(MAX("EmployeeNumber"), 0) FROM empleados
+ON CONFLICT (nombre) DO NOTHING;
+
+-- Devuelve el último ID del bloque reservado: el bloque es (valor - cantidad, valor].
+-- GREATEST protege de altas hechas por fuera del asignador (p. ej. desde el editor SQL).
+CREATE OR REPLACE FUNCTION reservar_employee_numbers(cantidad integer)
+RETURNS bigint
+LANGUAGE sql
+VOLATILE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    UPDATE contadores
+    SET valor = GREATEST(valor, (SELECT COALESCE(MAX("EmployeeNumber"), 0) FROM empleados)) + cantidad
+    WHERE nombre = 'EmployeeNumber'
+    RETURNING valor;
+$$;
+
+REVOKE ALL ON FUNCTION reservar_employee_numbers(integer) FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION reservar_employee_numbers(integer) TO authenticated;
@@ -0,0 +1,17 @@
+-- ==============================================================================
+-- Índices para la grilla paginada de empleados (employees_crud.py).
+-- La paginación por clave pide "filas después de (valor, EmployeeNumber)" en el orden
+-- elegido; con estos índices cada página es un recorrido corto del índice, sin OFFSET.
+-- ==============================================================================
+
+-- Orden por ID entre activos (vista por defecto)
+CREATE INDEX IF NOT EXISTS empleados_activos_id_idx
+    ON empleados ("EmployeeNumber") WHERE "FechaSalida" IS NULL;
+
+-- Orden por sueldo y por edad (desempate por EmployeeNumber)
+CREATE INDEX IF NOT EXISTS empleados_sueldo_id_idx ON empleados ("MonthlyIncome", "EmployeeNumber");
+CREATE INDEX IF NOT EXISTS empleados_edad_id_idx ON empleados ("Age", "EmployeeNumber");
+
+-- Búsqueda por departamento y puesto
+CREATE INDEX IF NOT EXISTS empleados_departamento_idx ON empleados ("Department");
+CREATE INDEX IF NOT EXISTS empleados_puesto_idx ON empleados ("JobRole");
@@ -0,0 +1,93 @@
+import logging
+import warnings
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from lifelines import KaplanMeierFitter, CoxPHFitter
+
+from snapshot_local import read_table, synced_version
+from cache_dependencias import depends_on
+from cache_disco import persistent
+
+# ==============================================================================
+# 1. CURVAS DE PERMANENCIA (KAPLAN–MEIER) Y MODELO DE COX
+# ==============================================================================
+# Duración = meses de antigüedad (hasta la salida o hasta hoy); evento = tiene FechaSalida.
+# Se ajustan una vez por versión de 'consolidado' y se guardan como DataFrames: cambiar
+# filtros en el dashboard solo elige curvas ya calculadas, nunca reajusta.
+
+logger = logging.getLogger("supervivencia")
+
+COLUMNAS_SUPERVIVENCIA = ["Department", "Tipocontrato", "FechaIngreso", "FechaSalida"]
+
+# Segmento mostrado -> columna de 'consolidado'
+SEGMENTOS = {"Departamento": "Department", "Tipo de Contrato": "Tipocontrato"}
+
+# Grupos con menos empleados no tienen curva propia (intervalos demasiado anchos)
+MIN_EMPLEADOS_GRUPO = 20
+
+def _duraciones(df: pd.DataFrame, fecha_ref: date) -> pd.DataFrame:
+    ingreso = pd.to_datetime(df['FechaIngreso'], errors='coerce')
+    salida = pd.to_datetime(df['FechaSalida'], errors='coerce')
+    base = pd.DataFrame({
+        'Department': df['Department'].fillna('No especificado').astype(str),
+        'Tipocontrato': df['Tipocontrato'].fillna('No especificado').astype(str),
+        'AntiguedadMeses': (salida.fillna(pd.Timestamp(fecha_ref)) - ingreso).dt.days / 30,
+        'Salida': salida.notna().astype(int),
+    })
+    return base[ingreso.notna() & (base['AntiguedadMeses'] >= 0)]
+
+def _kaplan_meier(base: pd.DataFrame) -> pd.DataFrame:
+    """Curva por grupo de cada segmento sobre una grilla mensual común (payload acotado)."""
+    grilla = np.arange(0, int(np.ceil(base['AntiguedadMeses'].max())) + 1) if len(base) else np.array([0])
+    curvas = []
+    for segmento, columna in SEGMENTOS.items():
+        for grupo, filas in base.groupby(columna):
+            if len(filas) < MIN_EMPLEADOS_GRUPO:
+                continue
+            kmf = KaplanMeierFitter().fit(filas['AntiguedadMeses'], filas['Salida'], timeline=grilla)
+            ic = kmf.confidence_interval_survival_function_
+            curvas.append(pd.DataFrame({
+                'Segmento': segmento, 'Grupo': grupo, 'Meses': grilla,
+                'Supervivencia': kmf.survival_function_.iloc[:, 0].to_numpy(),
+                'IC inferior': ic.iloc[:, 0].to_numpy(), 'IC superior': ic.iloc[:, 1].to_numpy(),
+                'Empleados': len(filas), 'Mediana (meses)': kmf.median_survival_time_,
+            }))
+    return pd.concat(curvas, ignore_index=True) if curvas else pd.DataFrame()
+
+def _cox(base: pd.DataFrame) -> pd.DataFrame:
+    """Hazard ratios de departamento y contrato (referencia: la primera categoría de cada uno)."""
+    covariables = pd.get_dummies(base[['Department', 'Tipocontrato']], drop_first=True, dtype=float)
+    datos = pd.concat([base[['AntiguedadMeses', 'Salida']], covariables], axis=1)
+    if covariables.empty or base['Salida'].sum() == 0:
+        return pd.DataFrame()
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            cph = CoxPHFitter(penalizer=0.01).fit(datos, duration_col='AntiguedadMeses', event_col='Salida')
+    except Exception as e:
+        logger.warning("modelo de Cox no ajustó: %s", e)
+        return pd.DataFrame()
+    resumen = cph.summary
+    return pd.DataFrame({
+        'Variable': resumen.index.astype(str),
+        'Hazard ratio': resumen['exp(coef)'].to_numpy(),
+        'IC 95% inferior': resumen['exp(coef) lower 95%'].to_numpy(),
+        'IC 95% superior': resumen['exp(coef) upper 95%'].to_numpy(),
+        'p': resumen['p'].to_numpy(),
+    }).assign(concordancia=cph.concordance_index_)
+
+@depends_on("consolidado")
+@st.cache_data(max_entries=2)
+@persistent("supervivencia", tablas=("consolidado",))
+def _fit_survival(version: str, fecha_ref: date):
+    base = _duraciones(read_table("consolidado", COLUMNAS_SUPERVIVENCIA), fecha_ref)
+    logger.info("supervivencia version=%s filas=%d eventos=%d", version, len(base), int(base['Salida'].sum()))
+    return _kaplan_meier(base), _cox(base)
+
+def load_survival():
+    """(curvas Kaplan–Meier, resumen de Cox) de la versión actual de 'consolidado'."""
+    # La fecha entra en la clave: la antigüedad de los activos se mide hasta hoy
+    return _fit_survival(synced_version("consolidado"), date.today())
@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
-from supabase import create_client, Client
+import acceso_datos
+from cache_dependencias import depends_on, invalidate
 
 # =================================================================
 # 1. CONFIGURACIÓN Y MAPEOS
@@ -12,14 +13,6 @@ MAPEO_DEPTOS = {
     "Human Resources": "Recursos Humanos"
 }
 
-@st.cache_resource
-def get_supabase() -> Client:
-    url = st.secrets.get("SUPABASE_URL")
-    key = st.secrets.get("SUPABASE_KEY")
-    return create_client(url, key)
-
-supabase = get_supabase()
-
 def to_eng(mapeo, valor_esp):
     """Retorna la llave original (inglés) para la base de datos."""
     return [k for k, v in mapeo.items() if v == valor_esp][0]
@@ -28,20 +21,20 @@ def to_eng(mapeo, valor_esp):
 # 2. FUNCIONES DE CONFIGURACIÓN
 # =================================================================
 
-@st.cache_data(ttl=1, hash_funcs={Client: lambda _: None})
-def get_survey_config(supabase: Client):
+@depends_on("configuracion_encuesta")
+@st.cache_data(ttl=1)
+def get_survey_config():
     """Lee la tabla de configuración de la encuesta."""
     try:
-        response = supabase.table("configuracion_encuesta").select("*").execute()
-        return {item['clave']: item['valor'] for item in response.data}
+        return acceso_datos.fetch_survey_config()
     except Exception:
         return {'encuesta_habilitada_global': 'false', 'departamento_habilitado': 'NINGUNO'}
 
-def update_survey_config(supabase: Client, key: str, value: str):
+def update_survey_config(key: str, value: str):
     """Actualiza los parámetros de habilitación."""
     try:
-        supabase.table("configuracion_encuesta").update({"valor": value}).eq("clave", key).execute()
-        get_survey_config.clear()
+        acceso_datos.update_survey_config(key, value)
+        invalidate("configuracion_encuesta")
         return True
     except Exception as e:
         st.error(f"Error al actualizar: {e}")
@@ -51,21 +44,21 @@ def update_survey_config(supabase: Client, key: str, value: str):
 # 3. INTERFAZ: PANEL DE CONTROL (ADMINISTRADOR)
 # =================================================================
 
-def render_survey_control_panel(supabase: Client):
+def render_survey_control_panel():
     """
     Gestiona la habilitación de encuestas y muestra el link.
     """
     st.sidebar.markdown("---")
     st.sidebar.subheader("🔒 Control de Encuestas")
 
-    config = get_survey_config(supabase)
+    config = get_survey_config()
     
     # --- 1. Control Global ---
     global_enabled_db = config.get('encuesta_habilitada_global', 'false') == 'true'
     global_enabled = st.sidebar.toggle("Habilitar para TODOS", value=global_enabled_db)
     
     if global_enabled != global_enabled_db:
-        if update_survey_config(supabase, 'encuesta_habilitada_global', 'true' if global_enabled else 'false'):
+        if update_survey_config('encuesta_habilitada_global', 'true' if global_enabled else 'false'):
             st.rerun()
 
     # --- 2. Control por Departamento ---
@@ -83,7 +76,7 @@ def render_survey_control_panel(supabase: Client):
     
     if not global_enabled and selected_dept != val_actual_esp:
         val_to_save = to_eng(MAPEO_DEPTOS, selected_dept) if selected_dept != "NINGUNO (Deshabilitar)" else "NINGUNO"
-        if update_survey_config(supabase, 'departamento_habilitado', val_to_save):
+        if update_survey_config('departamento_habilitado', val_to_save):
             st.rerun()
 
     # --- 3. BLOQUE DEL LINK ---
@@ -104,7 +97,7 @@ def render_survey_control_panel(supabase: Client):
 # =================================================================
 
 if __name__ == "__main__":
-    render_survey_control_panel(supabase)
+    render_survey_control_panel()
     
     st.title("Panel de Administración")
     st.write("Utiliza la barra lateral para gestionar la disponibilidad de la encuesta externa.")
\ No newline at end of file
@@ -0,0 +1,30 @@
+import os
+import sys
+
+import pytest
+import streamlit as st
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import acceso_datos
+import snapshot_local
+from backend_local import LocalBackend, seed_synthetic
+
+# ==============================================================================
+# BACKEND LOCAL EN MEMORIA PARA LAS PRUEBAS
+# ==============================================================================
+# Cada prueba trabaja sobre su propia base SQLite sembrada con datos sintéticos y con
+# las copias locales (data/local) dentro de un directorio temporal.
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    local = LocalBackend(":memory:")
+    seed_synthetic(local, n_empleados=300, encuestas_por_empleado=2)
+    monkeypatch.setattr(acceso_datos, "get_client", lambda: local)
+    monkeypatch.setattr(snapshot_local, "_ultimo_check", {})
+    yield local
+    st.cache_data.clear()
+    st.cache_resource.clear()
@@ -0,0 +1,55 @@
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+from asignacion_ids import IdAllocator, get_id_allocator, next_employee_number
+from backend_local import LocalBackend
+
+PROCESOS, HILOS, ALTAS_POR_HILO = 6, 4, 25
+
+def _reservador(backend):
+    def reservar(cantidad):
+        ultimo = backend.rpc("reservar_employee_numbers", {"cantidad": cantidad}).execute().data
+        return range(ultimo - cantidad + 1, ultimo + 1)
+    return reservar
+
+def _altas_en_proceso(ruta):
+    """Un proceso de la app: su propio asignador compartido por varios hilos (sesiones)."""
+    asignador = IdAllocator(7, _reservador(LocalBackend(ruta)))
+    with ThreadPoolExecutor(HILOS) as pool:
+        ids = list(pool.map(lambda _: asignador.next(), range(HILOS * ALTAS_POR_HILO)))
+    return ids + asignador.take(13)
+
+def test_concurrent_processes_never_share_ids(tmp_path):
+    ruta = str(tmp_path / "ids.sqlite")
+    LocalBackend(ruta).table("empleados").insert({"EmployeeNumber": 500}).execute()
+    with multiprocessing.get_context("fork").Pool(PROCESOS) as pool:
+        todos = sum(pool.map(_altas_en_proceso, [ruta] * PROCESOS), [])
+    assert len(todos) == PROCESOS * (HILOS * ALTAS_POR_HILO + 13)
+    assert len(set(todos)) == len(todos)
+    assert min(todos) > 500
+
+def test_reservation_skips_ids_written_outside_the_allocator(tmp_path):
+    backend = LocalBackend(str(tmp_path / "ids.sqlite"))
+    reservar = _reservador(backend)
+    reservar(5)
+    backend.table("empleados").insert({"EmployeeNumber": 10_000}).execute()
+    assert list(reservar(3)) == [10_001, 10_002, 10_003]
+
+def test_released_id_is_reused_before_a_new_block(backend):
+    primero = next_employee_number()
+    get_id_allocator().release(primero)
+    assert next_employee_number() == primero
+    assert next_employee_number() == primero + 1
+
+def test_release_ignores_ids_not_handed_out_by_the_allocator(backend):
+    primero = next_employee_number()
+    get_id_allocator().release(primero + 100)
+    assert next_employee_number() == primero + 1
+
+def test_claim_rejects_ids_inside_reserved_blocks(tmp_path):
+    backend = LocalBackend(str(tmp_path / "ids.sqlite"))
+    otro, este = IdAllocator(10, _reservador(backend)), IdAllocator(10, _reservador(backend))
+    bloque_ajeno = otro.next()
+    assert este.claim([bloque_ajeno + 3, bloque_ajeno + 15]) == {bloque_ajeno + 15}
+    assert otro.next() == bloque_ajeno + 1
+    assert este.next() > bloque_ajeno + 15
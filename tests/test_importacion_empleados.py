@@ -0,0 +1,91 @@
+import pandas as pd
+
+import importacion_empleados
+from acceso_datos import fetch_empleado
+from employees_crud import MAPEOS_IMPORTACION
+from asignacion_ids import next_employee_number, get_id_allocator
+from importacion_empleados import prepare_import, import_employees
+
+def _fila(**cambios):
+    base = {"EmployeeNumber": None, "Age": 30, "Gender": "Masculino", "MonthlyIncome": 3000,
+            "Department": "Ventas", "JobRole": "Gerente", "BusinessTravel": "Sin Viajes",
+            "Tipocontrato": "Temporal", "FechaIngreso": "2024-01-10", "FechaSalida": None, "NumeroFaltas": None}
+    return {**base, **cambios}
+
+def test_validation_reports_each_error_on_its_spreadsheet_row():
+    df = pd.DataFrame([
+        _fila(),
+        _fila(Age=17),
+        _fila(Department="Marketing"),
+        _fila(FechaIngreso="xx"),
+        _fila(FechaSalida="2023-01-01"),
+        _fila(MonthlyIncome=10.5),
+        _fila(EmployeeNumber=900), _fila(EmployeeNumber=900),
+        _fila(JobRole="Manager", Department="Research & Development", FechaIngreso="25/12/2021"),
+    ])
+    validas, errores, faltantes, ignoradas = prepare_import(df, MAPEOS_IMPORTACION)
+    motivos = {(f, c): e for f, c, e in errores[["fila", "columna", "error"]].itertuples(index=False)}
+    assert motivos == {
+        (3, "Age"): "menor que 18",
+        (4, "Department"): "categoría desconocida",
+        (5, "FechaIngreso"): "fecha inválida",
+        (6, "FechaSalida"): "anterior a FechaIngreso",
+        (7, "MonthlyIncome"): "no entero",
+        (8, "EmployeeNumber"): "repetido en el archivo",
+        (9, "EmployeeNumber"): "repetido en el archivo",
+    }
+    assert faltantes == [] and ignoradas == []
+    assert validas.index.tolist() == [2, 10]
+    assert validas.loc[2, ["Gender", "Department", "JobRole", "BusinessTravel"]].tolist() == \
+        ["Male", "Sales", "Manager", "Non-Travel"]
+    assert validas.loc[10, "FechaIngreso"] == "2021-12-25"
+
+def test_missing_required_columns_block_the_whole_file():
+    df = pd.DataFrame([_fila()]).drop(columns=["FechaIngreso"]).assign(Extra=1)
+    validas, _, faltantes, ignoradas = prepare_import(df, MAPEOS_IMPORTACION)
+    assert validas.empty and faltantes == ["FechaIngreso"] and ignoradas == ["Extra"]
+
+def test_import_assigns_ids_and_keeps_stored_values_on_blank_cells(backend):
+    existente = next(f for f in backend.table("empleados").select("*").execute().data if f["FechaSalida"])
+    df = pd.DataFrame([
+        _fila(EmployeeNumber=existente["EmployeeNumber"], MonthlyIncome=7777, FechaIngreso=existente["FechaIngreso"]),
+        _fila(NumeroFaltas=3),
+        _fila(FechaSalida="2024-05-01"),
+    ])
+    validas, errores, _, _ = prepare_import(df, MAPEOS_IMPORTACION)
+    assert errores.empty
+    reporte = import_employees(validas, tamano_lote=500)
+
+    assert (reporte["escritas"], reporte["nuevas"], reporte["actualizadas"], reporte["ids_asignados"]) == (3, 2, 1, 2)
+    guardado = fetch_empleado(existente["EmployeeNumber"])
+    assert guardado["MonthlyIncome"] == 7777
+    assert guardado["FechaSalida"] == existente["FechaSalida"]
+    assert guardado["NumeroFaltas"] == existente["NumeroFaltas"]
+
+def test_rejected_batch_is_reported_and_the_rest_are_written(backend, monkeypatch):
+    real, llamadas = importacion_empleados.upsert_empleados, []
+    def upsert_con_falla(filas):
+        llamadas.append(len(filas))
+        if len(llamadas) == 2:
+            raise RuntimeError("payload too large")
+        return real(filas)
+    monkeypatch.setattr(importacion_empleados, "upsert_empleados", upsert_con_falla)
+
+    validas, _, _, _ = prepare_import(pd.DataFrame([_fila(Age=20 + i) for i in range(5)]), MAPEOS_IMPORTACION)
+    reporte = import_employees(validas, tamano_lote=2)
+
+    assert llamadas == [2, 2, 1]
+    assert (reporte["escritas"], reporte["lotes"], reporte["lotes_fallidos"]) == (3, 3, 1)
+    assert reporte["errores"]["fila"].tolist() == [4, 5]
+    assert set(reporte["errores"]["error"]) == {"payload too large"}
+
+def test_file_ids_inside_a_reserved_block_are_not_written(backend):
+    reservado = next_employee_number()
+    validas, _, _, _ = prepare_import(pd.DataFrame([_fila(EmployeeNumber=reservado + 1),
+                                                    _fila(EmployeeNumber=reservado + 500)]), MAPEOS_IMPORTACION)
+    reporte = import_employees(validas)
+    assert reporte["escritas"] == 1
+    assert reporte["errores"][["fila", "columna"]].values.tolist() == [[2, "EmployeeNumber"]]
+    assert fetch_empleado(reservado + 1) == {} and fetch_empleado(reservado + 500) != {}
+    assert next_employee_number() == reservado + 1
+    assert get_id_allocator().take(1)[0] > reservado + 500
@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+from acceso_datos import fetch_employees_page
+
+CASOS = [
+    ("EmployeeNumber", False, True, None),
+    ("EmployeeNumber", True, False, None),
+    ("MonthlyIncome", True, True, None),
+    ("MonthlyIncome", False, False, None),
+    ("Age", False, True, {"Department": ["Sales"], "JobRole": ["Research Director", 'Con "comillas", y coma']}),
+    ("Age", True, False, {"Department": [], "JobRole": ["Manager"], "EmployeeNumber": [12]}),
+]
+
+def _recorrer(orden, desc, solo_activos, coincidencias, limite=17):
+    vistos, cursor = [], None
+    while True:
+        filas, hay_mas = fetch_employees_page(cursor, limite, orden, desc, solo_activos, coincidencias)
+        assert len(filas) <= limite
+        vistos += [f["EmployeeNumber"] for f in filas]
+        if not hay_mas:
+            return vistos
+        cursor = (filas[-1][orden], filas[-1]["EmployeeNumber"])
+
+@pytest.mark.parametrize("orden,desc,solo_activos,coincidencias", CASOS)
+def test_keyset_pages_return_full_sorted_result(backend, orden, desc, solo_activos, coincidencias):
+    todos = pd.DataFrame(backend.table("empleados").select("*").execute().data)
+    esperado = todos[todos["FechaSalida"].isna()] if solo_activos else todos
+    if coincidencias:
+        mascara = pd.Series(False, index=esperado.index)
+        for col, valores in coincidencias.items():
+            mascara |= esperado[col].isin(valores)
+        esperado = esperado[mascara]
+    claves = [orden] if orden == "EmployeeNumber" else [orden, "EmployeeNumber"]
+    esperado = esperado.sort_values(claves, ascending=not desc)["EmployeeNumber"].tolist()
+
+    vistos = _recorrer(orden, desc, solo_activos, coincidencias)
+    assert vistos == esperado
+    assert len(set(vistos)) == len(vistos)
+
+def test_last_page_reports_no_more_rows(backend):
+    total = len(backend.table("empleados").select("EmployeeNumber").execute().data)
+    filas, hay_mas = fetch_employees_page(None, total, "EmployeeNumber", False, False)
+    assert len(filas) == total and not hay_mas
@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+
+from acceso_datos import insert_empleado, update_empleado, delete_empleado, fetch_empleado
+from cache_dependencias import notify_write
+from rollup_mensual import apply_employee_write, monthly_rollup, rebuild
+
+SEGMENTOS = [(None, None), ("Sales", None), (None, "Temporal"), ("Research & Development", "Indefinido")]
+
+def _series(hasta):
+    return {seg: monthly_rollup(*seg, hasta=hasta) for seg in SEGMENTOS}
+
+def _escribir(clave, fila=None, alta=False):
+    """Mismo recorrido que employees_crud: escritura, parche de copias locales y rollup."""
+    if fila is None:
+        delete_empleado(clave)
+    elif alta:
+        insert_empleado(fila)
+    else:
+        update_empleado(clave, fila)
+    notify_write("empleados", clave, fila)
+    apply_employee_write(clave, fila)
+
+def _alta():
+    return {"EmployeeNumber": 10_001, "Age": 30, "Gender": "Male", "MonthlyIncome": 3000,
+            "Department": "Sales", "JobRole": "Manager", "BusinessTravel": "Non-Travel",
+            "Tipocontrato": "Temporal", "FechaIngreso": "2021-03-15", "FechaSalida": None}
+
+def _edicion():
+    fila = fetch_empleado(5)
+    return {**fila, "Department": "Sales", "Tipocontrato": "Temporal", "FechaSalida": "2024-06-30",
+            "FechaIngreso": min(fila["FechaIngreso"], "2024-01-01")}
+
+@pytest.mark.parametrize("operacion", ["alta", "edicion", "baja", "secuencia"])
+def test_incremental_equals_full_rebuild(backend, operacion):
+    hasta = pd.Timestamp("2030-12-31")
+    monthly_rollup(hasta=hasta)  # rollup completo inicial
+    if operacion in ("alta", "secuencia"):
+        _escribir(10_001, _alta(), alta=True)
+    if operacion in ("edicion", "secuencia"):
+        _escribir(5, _edicion())
+    if operacion in ("baja", "secuencia"):
+        _escribir(7)
+
+    incremental = _series(hasta)
+    rebuild()
+    completo = _series(hasta)
+    for seg in SEGMENTOS:
+        pd.testing.assert_frame_equal(incremental[seg], completo[seg], check_dtype=False)
+
+def test_alta_suma_un_ingreso_en_su_mes(backend):
+    hasta = pd.Timestamp("2030-12-31")
+    antes = monthly_rollup("Sales", "Temporal", hasta=hasta).set_index("Mes")
+    _escribir(10_001, _alta(), alta=True)
+    despues = monthly_rollup("Sales", "Temporal", hasta=hasta).set_index("Mes")
+    mes = pd.Timestamp("2021-03-01")
+    assert despues.loc[mes, "Ingresos"] == antes["Ingresos"].get(mes, 0) + 1
+    assert despues["Plantilla final"].iloc[-1] == antes["Plantilla final"].iloc[-1] + 1
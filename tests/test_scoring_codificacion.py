@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from attrition_predictor import MODEL_COLS, CAT_COLS, load_resources, score_frame, validate_input
+
+def _fila(**cambios):
+    base = {col: 3 for col in MODEL_COLS if col not in CAT_COLS}
+    base.update({"Age": 35, "MonthlyIncome": 4000, "JobLevel": 2, "Education": 3, "PerformanceRating": 3,
+                 "BusinessTravel": "TRAVEL_RARELY", "Department": "SALES", "EducationField": "MEDICAL",
+                 "Gender": "MALE", "JobRole": "SALES_EXECUTIVE", "MaritalStatus": "SINGLE", "OverTime": "YES",
+                 "tipo_contrato": "indefinido"})
+    return {**base, **cambios}
+
+def _score_anterior(df, model, mapping, scaler):
+    """Codificación previa a validacion_datos: mayúsculas y mapping exacto, -1 si no coincide."""
+    df = df.copy()
+    for col in CAT_COLS:
+        df[col] = df[col].astype(str).str.strip().str.upper().map(mapping.get(col, {})).fillna(-1)
+    return model.predict_proba(scaler.transform(df[MODEL_COLS].fillna(0)))[:, 1]
+
+def test_canonical_values_score_as_before():
+    model, mapping, scaler = load_resources()
+    # tipo_contrato queda fuera: su mapping está en minúsculas y antes nunca coincidía (siempre -1)
+    df = pd.DataFrame([_fila(), _fila(Department="RESEARCH_AND_DEVELOPMENT", OverTime="NO"),
+                       _fila(BusinessTravel="TRAVEL_FREQUENTLY", MaritalStatus="MARRIED", Gender="FEMALE")]
+                      ).assign(tipo_contrato="sin dato")
+    np.testing.assert_allclose(score_frame(df, model, mapping, scaler), _score_anterior(df, model, mapping, scaler))
+
+def test_variants_now_score_like_their_canonical_value():
+    model, mapping, scaler = load_resources()
+    canonicas = pd.DataFrame([_fila(), _fila(Department="RESEARCH_AND_DEVELOPMENT", tipo_contrato="temporal"),
+                              _fila(), _fila(Department="HR")])
+    variantes = pd.DataFrame([_fila(Department="Sales", BusinessTravel="Travel_Rarely"),
+                              _fila(Department="Research & Development", tipo_contrato="Temporal"),
+                              _fila(tipo_contrato="Tiempo Completo"),
+                              _fila(Department="Human Resources")])
+    np.testing.assert_allclose(score_frame(variantes, model, mapping, scaler), score_frame(canonicas, model, mapping, scaler))
+    # Con la codificación anterior las variantes caían en -1 y cambiaban el puntaje
+    assert not np.allclose(_score_anterior(variantes, model, mapping, scaler), score_frame(canonicas, model, mapping, scaler))
+
+def test_full_time_contract_passes_validation():
+    _, mapping, _ = load_resources()
+    df = pd.DataFrame([_fila(tipo_contrato=c) for c in ["Indefinido", "Temporal", "Tiempo Completo", "Por horas"]])
+    validado, errores, faltantes = validate_input(df, mapping)
+    assert faltantes == []
+    assert errores[["fila", "columna"]].values.tolist() == [[3, "tipo_contrato"]]
+    assert validado["tipo_contrato"].tolist()[:3] == ["indefinido", "temporal", "indefinido"]
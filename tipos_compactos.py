@@ -0,0 +1,76 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+# ==============================================================================
+# 1. NORMALIZACIÓN DE TIPOS PARA LOS DATAFRAMES CACHEADOS
+# ==============================================================================
+# Texto repetido -> category, enteros pequeños (Likert, niveles, años) -> int8/int16,
+# montos -> float32. Las traducciones se aplican renombrando categorías, sin duplicar
+# la columna en texto.
+
+logger = logging.getLogger("tipos_compactos")
+
+COLUMNAS_MONETARIAS = ["MonthlyIncome"]
+
+# Proporción máxima de valores distintos para convertir texto a category
+UMBRAL_CATEGORIA = 0.5
+
+REPORTE_MEMORIA = {}
+
+def _es_entero(valores: np.ndarray) -> bool:
+    validos = valores[~np.isnan(valores)]
+    return validos.size > 0 and bool(np.all(validos == np.round(validos)))
+
+def compact_frame(df: pd.DataFrame, monetarias=COLUMNAS_MONETARIAS) -> pd.DataFrame:
+    """Copia de 'df' con tipos compactos. Fechas y booleanos no se tocan."""
+    out = df.copy()
+    for col in out.columns:
+        serie = out[col]
+        if col in monetarias and pd.api.types.is_numeric_dtype(serie):
+            out[col] = serie.astype("float32")
+        elif pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie):
+            if len(serie) and serie.nunique(dropna=True) <= UMBRAL_CATEGORIA * len(serie):
+                out[col] = serie.astype("category")
+        elif pd.api.types.is_integer_dtype(serie):
+            out[col] = pd.to_numeric(serie, downcast="integer")
+        elif pd.api.types.is_float_dtype(serie) and _es_entero(serie.to_numpy(dtype="float64")):
+            # Enteros con nulos (p. ej. Likert sin responder): float32 conserva NaN y la semántica de comparación
+            out[col] = pd.to_numeric(serie, downcast="integer") if serie.notna().all() else serie.astype("float32")
+    return out
+
+def translate_column(df: pd.DataFrame, col: str, nuevo: str, traducciones: dict, relleno: str = None):
+    """Reemplaza 'col' por 'nuevo' con las categorías traducidas (in place); 'relleno' ocupa los nulos."""
+    serie = df.pop(col).astype("category")
+    actuales = list(serie.cat.categories)
+    nuevas = [traducciones.get(c, c) for c in actuales]
+    if len(set(nuevas)) == len(nuevas):
+        serie = serie.cat.rename_categories(nuevas)
+    else:
+        # Dos valores con la misma traducción: se fusionan sus categorías
+        serie = serie.astype(object).map(lambda v: traducciones.get(v, v)).astype("category")
+    if relleno is not None and serie.isna().any():
+        if relleno not in serie.cat.categories:
+            serie = serie.cat.add_categories([relleno])
+        serie = serie.fillna(relleno)
+    df[nuevo] = serie
+    return df
+
+# ==============================================================================
+# 2. REPORTE DE MEMORIA POR DATASET CACHEADO
+# ==============================================================================
+
+def report_memory(nombre: str, original: pd.DataFrame, compacto: pd.DataFrame) -> pd.DataFrame:
+    """Registra bytes antes/después y devuelve 'compacto' para encadenar en el return del loader."""
+    antes = int(original.memory_usage(deep=True).sum())
+    despues = int(compacto.memory_usage(deep=True).sum())
+    REPORTE_MEMORIA[nombre] = {"filas": len(compacto), "bytes_antes": antes, "bytes_despues": despues}
+    logger.info("dataset=%s filas=%d antes=%.1fMB despues=%.1fMB", nombre, len(compacto), antes / 1e6, despues / 1e6)
+    return compacto
+
+def memory_report() -> pd.DataFrame:
+    reporte = pd.DataFrame.from_dict(REPORTE_MEMORIA, orient="index")
+    if not reporte.empty:
+        reporte["reduccion_%"] = (1 - reporte["bytes_despues"] / reporte["bytes_antes"]) * 100
+    return reporte
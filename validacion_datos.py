@@ -0,0 +1,113 @@
+import re
+import numpy as np
+import pandas as pd
+
+# ==============================================================================
+# 1. NORMALIZACIÓN DE CATEGORÍAS
+# ==============================================================================
+
+# Variantes habituales que no se resuelven solo normalizando el texto
+ALIAS_CATEGORIAS = {
+    "Department": {"HUMAN_RESOURCES": "HR"},
+    # El formulario ofrece "Tiempo Completo", que el modelo no vio al entrenar: es contrato indefinido
+    "tipo_contrato": {"TIEMPO_COMPLETO": "indefinido"},
+}
+
+def normalize_key(valor) -> str:
+    """'Research & Development' -> 'RESEARCH_AND_DEVELOPMENT', 'Non-Travel' -> 'NON_TRAVEL'."""
+    texto = str(valor).strip().upper().replace("&", " AND ")
+    return re.sub(r"[^A-Z0-9ÁÉÍÓÚÑ]+", "_", texto).strip("_")
+
+def build_category_lookup(valores_validos, alias: dict = None) -> dict:
+    """Clave normalizada -> valor canónico (tal como lo espera el modelo o la base)."""
+    lookup = {normalize_key(v): v for v in valores_validos}
+    for origen, destino in (alias or {}).items():
+        if normalize_key(destino) in lookup:
+            lookup[normalize_key(origen)] = lookup[normalize_key(destino)]
+    return lookup
+
+def coerce_categorical(serie: pd.Series, lookup: dict) -> pd.Series:
+    """Lleva cada valor a su forma canónica (NaN si es desconocido). Normaliza solo los valores únicos."""
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=True)
+    canonicos = np.array([lookup.get(normalize_key(u)) for u in unicos] + [None], dtype=object)
+    # El centinela -1 de los nulos indexa el None final
+    return pd.Series(canonicos[codigos], index=serie.index, dtype=object)
+
+def encode_categorical(serie: pd.Series, mapping_col: dict, alias: dict = None) -> pd.Series:
+    """Codifica con el mapping del modelo; -1 para categorías desconocidas."""
+    canonicos = coerce_categorical(serie, build_category_lookup(mapping_col.keys(), alias))
+    return canonicos.map(mapping_col).fillna(-1)
+
+# ==============================================================================
+# 2. VALIDACIÓN VECTORIZADA
+# ==============================================================================
+
+def validate_frame(df: pd.DataFrame, rangos: dict = None, categorias: dict = None,
+                   requeridas: list = None, permitir_nulos: bool = False):
+    """
+    Valida tipos, rangos y categorías columna a columna con máscaras booleanas.
+
+    rangos:     {columna: (mínimo|None, máximo|None)}
+    categorias: {columna: lookup de build_category_lookup}
+    Devuelve (df_coaccionado, errores, columnas_faltantes). 'errores' tiene una fila por
+    (fila, columna) inválida con el valor original y el motivo.
+    """
+    rangos, categorias = rangos or {}, categorias or {}
+    columnas_faltantes = [c for c in (requeridas or []) if c not in df.columns]
+    df_out = df.copy()
+    filas, columnas, valores, motivos = [], [], [], []
+
+    def registrar(mascara, col, original, motivo):
+        idx = np.flatnonzero(mascara)
+        if idx.size:
+            filas.append(idx)
+            columnas.append(np.full(idx.size, col, dtype=object))
+            valores.append(original.to_numpy(dtype=object)[idx])
+            motivos.append(np.full(idx.size, motivo, dtype=object))
+
+    for col, (minimo, maximo) in rangos.items():
+        if col not in df.columns:
+            continue
+        original = df[col]
+        numerico = pd.to_numeric(original, errors='coerce')
+        nulos = original.isna().to_numpy()
+        registrar(~nulos & numerico.isna().to_numpy(), col, original, "no numérico")
+        if not permitir_nulos:
+            registrar(nulos, col, original, "vacío")
+        valores_np = numerico.to_numpy(dtype='float64')
+        with np.errstate(invalid='ignore'):
+            if minimo is not None:
+                registrar(valores_np < minimo, col, original, f"menor que {minimo}")
+            if maximo is not None:
+                registrar(valores_np > maximo, col, original, f"mayor que {maximo}")
+        df_out[col] = numerico
+
+    for col, lookup in categorias.items():
+        if col not in df.columns:
+            continue
+        original = df[col]
+        canonicos = coerce_categorical(original, lookup)
+        nulos = original.isna().to_numpy()
+        registrar(~nulos & canonicos.isna().to_numpy(), col, original, "categoría desconocida")
+        if not permitir_nulos:
+            registrar(nulos, col, original, "vacío")
+        df_out[col] = canonicos.where(canonicos.notna(), original)
+
+    if filas:
+        posiciones = np.concatenate(filas)
+        errores = pd.DataFrame({
+            'fila': df.index.to_numpy()[posiciones],
+            'columna': np.concatenate(columnas),
+            'valor': np.concatenate(valores),
+            'error': np.concatenate(motivos),
+        }).sort_values(['fila', 'columna'], kind='stable').reset_index(drop=True)
+    else:
+        errores = pd.DataFrame(columns=['fila', 'columna', 'valor', 'error'])
+    return df_out, errores, columnas_faltantes
+
+def rows_with_errors(errores: pd.DataFrame) -> pd.DataFrame:
+    """Resumen de una línea por fila inválida."""
+    if errores.empty:
+        return pd.DataFrame(columns=['fila', 'errores'])
+    texto = errores['columna'].astype(str) + ": " + errores['error'].astype(str)
+    return texto.groupby(errores['fila']).agg(" | ".join).rename('errores').reset_index()